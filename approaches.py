@@ -0,0 +1,49 @@
+from dictionary.extended_dictionary import ExtendedDictionary
+from dictionary.list_dictionary import ListDictionary
+from dictionary.hashtable_dictionary import HashTableDictionary
+from dictionary.ternarysearchtree_dictionary import TernarySearchTreeDictionary
+from dictionary.array_ternarysearchtree_dictionary import ArrayTernarySearchTreeDictionary
+from dictionary.radix_ternarysearchtree_dictionary import RadixTernarySearchTreeDictionary
+from dictionary.dawg_dictionary import DawgDictionary
+
+
+# -------------------------------------------------------------------
+# Registry of the dictionary configurations, by name, shared by the driver, the query server,
+# empirical_analysis.py and the benchmarks.
+# The driver and the server take the plain backends of DRIVER_APPROACHES; the other names are variants of
+# them (prefix index, compact records, cached top-k, self-organizing lists) compared by the benchmarks.
+# -------------------------------------------------------------------
+
+APPROACHES = {
+    'list': lambda: ListDictionary(),
+    'list_index': lambda: ListDictionary(prefix_index=True),
+    'list_frequency': lambda: ListDictionary(organization='frequency'),
+    'list_move_to_front': lambda: ListDictionary(organization='move_to_front'),
+    'list_transpose': lambda: ListDictionary(organization='transpose'),
+    'hashtable': lambda: HashTableDictionary(),
+    'hashtable_index': lambda: HashTableDictionary(prefix_index=True),
+    'hashtable_compact': lambda: HashTableDictionary(compact=True),
+    'tst': lambda: TernarySearchTreeDictionary(),
+    'tst_topk': lambda: TernarySearchTreeDictionary(top_k=3),
+    'array_tst': lambda: ArrayTernarySearchTreeDictionary(),
+    'radix_tst': lambda: RadixTernarySearchTreeDictionary(),
+    'dawg': lambda: DawgDictionary(),
+}
+
+DRIVER_APPROACHES = ('list', 'hashtable', 'tst', 'array_tst', 'radix_tst', 'dawg')
+
+
+def select_approaches(names: [str]) -> dict:
+    """
+    @param names: names of APPROACHES
+    @return: name -> factory of an empty dictionary, in the order of 'names'
+    """
+    return {name: APPROACHES[name] for name in names}
+
+
+def create_dictionary(name: str) -> ExtendedDictionary:
+    """
+    @param name: name of one of APPROACHES
+    @return: a new, empty dictionary of that configuration
+    """
+    return APPROACHES[name]()
@@ -0,0 +1,4 @@
+# -------------------------------------------------
+# Benchmarks for the dictionary implementations.
+# Run from the repository root, e.g. python3 -m benchmarks.tst_autocomplete
+# -------------------------------------------------
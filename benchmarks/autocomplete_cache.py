@@ -0,0 +1,95 @@
+import argparse
+import random
+import time
+
+from benchmarks.common import read_word_frequencies, print_table
+from approaches import select_approaches
+from dictionary.cached_dictionary import CachedDictionary
+from dictionary.word_frequency import WordFrequency
+
+
+# -------------------------------------------------
+# Autocomplete throughput with and without the LRU result cache, on Zipf-distributed prefixes of 1 to 3
+# letters with a share of adds and deletes mixed in. Enumerating approaches (tst, array_tst) take seconds
+# per thousand uncached calls at 200k words, and the DAWG rebuilds after every write, so keep
+# --operations small for them.
+# -------------------------------------------------
+
+CONFIGURATIONS = select_approaches(['hashtable_index', 'tst', 'tst_topk', 'array_tst', 'radix_tst', 'dawg'])
+
+
+def generate_operations(words_frequencies: [WordFrequency], size: int, write_ratio: float, exponent: float,
+                        seed: int = 0) -> [tuple]:
+    """
+    draw ('AC', prefix) operations, prefixes ranked by the total frequency of their words and drawn with
+    weight 1 / rank ** exponent, with ('A', word, frequency) and ('D', word) operations mixed in
+    @return: list of operations
+    """
+    rng = random.Random(seed)
+    popularity = dict()
+    for wf in words_frequencies:
+        for length in range(1, min(3, len(wf.word)) + 1):
+            popularity[wf.word[:length]] = popularity.get(wf.word[:length], 0) + wf.frequency
+    prefixes = sorted(popularity, key=popularity.get, reverse=True)
+    weights = [1 / rank ** exponent for rank in range(1, len(prefixes) + 1)]
+    operations = list()
+    for prefix in rng.choices(prefixes, weights, k=size):
+        roll = rng.random()
+        if roll < write_ratio / 2:
+            operations.append(('D', rng.choice(words_frequencies).word))
+        elif roll < write_ratio:
+            operations.append(('A', rng.choice(words_frequencies).word + prefix, rng.randint(1, 10 ** 6)))
+        else:
+            operations.append(('AC', prefix))
+    return operations
+
+
+def replay(dictionary, operations: [tuple]) -> float:
+    """
+    @return: seconds taken to apply the operations
+    """
+    start_time = time.perf_counter()
+    for operation in operations:
+        if operation[0] == 'AC':
+            dictionary.autocomplete(operation[1])
+        elif operation[0] == 'A':
+            dictionary.add_word_frequency(WordFrequency(operation[1], operation[2]))
+        else:
+            dictionary.delete_word(operation[1])
+    return time.perf_counter() - start_time
+
+
+def run(data_filename: str, names: [str], size: int, write_ratio: float, exponent: float, capacity: int):
+    words_frequencies = read_word_frequencies(data_filename)
+    operations = generate_operations(words_frequencies, size, write_ratio, exponent)
+    rows = list()
+    for name in names:
+        plain = CONFIGURATIONS[name]()
+        plain.build_dictionary(words_frequencies)
+        cached = CachedDictionary(CONFIGURATIONS[name](), capacity)
+        cached.build_dictionary(words_frequencies)
+        # Lazily built structures, such as the prefix index, are built before timing.
+        plain.autocomplete(operations[0][1])
+        cached.dictionary.autocomplete(operations[0][1])
+        plain_time = replay(plain, operations)
+        cached_time = replay(cached, operations)
+        statistics = cached.cache_statistics()
+        rows.append([name, size / plain_time, size / cached_time, plain_time / cached_time,
+                     statistics['hit_rate'] * 100, statistics['evictions'], statistics['invalidations']])
+    print(f'{size} operations, {write_ratio:.0%} writes, Zipf exponent {exponent}, cache of {capacity} prefixes, '
+          f'{len(words_frequencies)} words')
+    print_table(['Approach', 'Uncached (op/s)', 'Cached (op/s)', 'Speedup', 'Hit rate (%)', 'Evictions',
+                 'Invalidations'], rows)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--data', default='sampleData200k.txt')
+    parser.add_argument('--approaches', nargs='+', choices=CONFIGURATIONS,
+                        default=['hashtable_index', 'tst_topk', 'radix_tst'])
+    parser.add_argument('--operations', type=int, default=10000)
+    parser.add_argument('--write-ratio', type=float, default=0.01)
+    parser.add_argument('--exponent', type=float, default=1.1)
+    parser.add_argument('--capacity', type=int, default=1024)
+    args = parser.parse_args()
+    run(args.data, args.approaches, args.operations, args.write_ratio, args.exponent, args.capacity)
@@ -0,0 +1,69 @@
+import argparse
+import random
+import string
+
+from benchmarks.common import read_word_frequencies, mean_call_ns, print_table
+from approaches import select_approaches
+from dictionary.word_frequency import WordFrequency
+from dictionary.filtered_dictionary import FilteredDictionary
+
+
+# -------------------------------------------------
+# Search latency of every backend with and without the counting Bloom filter in front, on hits and on
+# misses. Misses are words of the data set with one letter replaced, so they share long prefixes with
+# stored words, the costly case for the trees. The measured false positive rate of the filter is reported
+# next to its target. The list scans the whole list per miss, it only runs --list-queries queries.
+# -------------------------------------------------
+
+CONFIGURATIONS = select_approaches(['list', 'hashtable', 'tst', 'array_tst', 'radix_tst', 'dawg'])
+
+
+def generate_queries(words_frequencies: [WordFrequency], size: int, seed: int = 0) -> ([str], [str]):
+    """
+    @return: (words found in the dictionary, words missing from it)
+    """
+    rng = random.Random(seed)
+    stored = set(wf.word for wf in words_frequencies)
+    hits = [rng.choice(words_frequencies).word for _ in range(size)]
+    misses = list()
+    while len(misses) < size:
+        word = rng.choice(words_frequencies).word
+        index = rng.randrange(len(word))
+        word = word[:index] + rng.choice(string.ascii_lowercase) + word[index + 1:]
+        if word not in stored:
+            misses.append(word)
+    return hits, misses
+
+
+def run(data_filename: str, names: [str], size: int, list_size: int, false_positive_rate: float):
+    words_frequencies = read_word_frequencies(data_filename)
+    hits, misses = generate_queries(words_frequencies, size)
+    rows = list()
+    for name in names:
+        count = list_size if name == 'list' else size
+        dictionary = CONFIGURATIONS[name]()
+        dictionary.build_dictionary(words_frequencies)
+        filtered = FilteredDictionary(dictionary, false_positive_rate)
+        hit_ns = mean_call_ns(dictionary.search, hits[:count])
+        miss_ns = mean_call_ns(dictionary.search, misses[:count])
+        filtered_hit_ns = mean_call_ns(filtered.search, hits[:count])
+        filtered.lookups = filtered.rejections = filtered.false_positives = 0
+        filtered_miss_ns = mean_call_ns(filtered.search, misses[:count])
+        statistics = filtered.filter_statistics()
+        rows.append([name, hit_ns, filtered_hit_ns, miss_ns, filtered_miss_ns, miss_ns / filtered_miss_ns,
+                     f"{statistics['false_positive_rate']:.4f}"])
+    print(f'{size} hits and {size} misses ({list_size} for the list), {len(words_frequencies)} words, '
+          f'target false positive rate {false_positive_rate}, filter sized for twice the words')
+    print_table(['Approach', 'Hit (ns)', 'Hit filtered (ns)', 'Miss (ns)', 'Miss filtered (ns)', 'Miss speedup',
+                 'Measured FP rate'], rows)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--data', default='sampleData200k.txt')
+    parser.add_argument('--approaches', nargs='+', choices=CONFIGURATIONS, default=list(CONFIGURATIONS))
+    parser.add_argument('--queries', type=int, default=50000)
+    parser.add_argument('--list-queries', type=int, default=200)
+    parser.add_argument('--false-positive-rate', type=float, default=0.01)
+    args = parser.parse_args()
+    run(args.data, args.approaches, args.queries, args.list_queries, args.false_positive_rate)
@@ -0,0 +1,71 @@
+import argparse
+import random
+import time
+
+from benchmarks.common import read_word_frequencies, print_table
+from command_engine import run_serial, run_batched
+from approaches import select_approaches
+
+
+# -------------------------------------------------
+# Throughput of the serial vs batched command engines on a large mixed command workload.
+# Approaches that scan or enumerate on autocomplete take many minutes at 200k words and 100k commands,
+# compare them with --data sampleData.txt.
+# -------------------------------------------------
+
+CONFIGURATIONS = select_approaches(['list', 'hashtable', 'hashtable_index', 'tst', 'tst_topk', 'array_tst'])
+
+
+def generate_commands(words_frequencies, size: int, write_ratio: float, seed: int = 0) -> [str]:
+    """
+    generate S / AC commands on words drawn with a skew towards frequent words, with A / D mixed in
+    @return: command lines
+    """
+    rng = random.Random(seed)
+    ranked = sorted(words_frequencies, key=lambda wf: wf.frequency, reverse=True)
+    # Weight rank r by 1 / r, so popular words and prefixes repeat like real traffic.
+    words = [wf.word for wf in ranked]
+    weights = [1 / rank for rank in range(1, len(words) + 1)]
+    drawn = rng.choices(words, weights, k=size)
+    commands = list()
+    for word in drawn:
+        roll = rng.random()
+        if roll < write_ratio / 2:
+            commands.append(f'D {word}\n')
+        elif roll < write_ratio:
+            commands.append(f'A {word} {rng.randint(1, 10 ** 6)}\n')
+        elif roll < (1 + write_ratio) / 2:
+            commands.append(f'S {word if rng.random() < 0.5 else word + "x"}\n')
+        else:
+            commands.append(f'AC {word[:rng.randint(1, min(4, len(word)))]}\n')
+    return commands
+
+
+def run(data_filename: str, names: [str], size: int, write_ratio: float):
+    words_frequencies = read_word_frequencies(data_filename)
+    commands = generate_commands(words_frequencies, size, write_ratio)
+    rows = list()
+    for name in names:
+        timings, outputs = list(), list()
+        for engine in (run_serial, run_batched):
+            # Writes change the dictionary, so every engine gets a freshly built one.
+            agent = CONFIGURATIONS[name]()
+            agent.build_dictionary(words_frequencies)
+            start_time = time.perf_counter()
+            outputs.append(''.join(engine(agent, commands)))
+            timings.append(time.perf_counter() - start_time)
+        assert outputs[0] == outputs[1], name
+        rows.append([name, size / timings[0], size / timings[1], timings[0] / timings[1]])
+    print(f'{size} commands, {write_ratio:.0%} writes, over {len(words_frequencies)} words')
+    print_table(['Approach', 'Serial (cmd/s)', 'Batched (cmd/s)', 'Speedup'], rows)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--data', default='sampleData200k.txt')
+    parser.add_argument('--approaches', nargs='+', choices=CONFIGURATIONS,
+                        default=['hashtable_index', 'tst_topk'])
+    parser.add_argument('--commands', type=int, default=100000)
+    parser.add_argument('--write-ratio', type=float, default=0.02)
+    args = parser.parse_args()
+    run(args.data, args.approaches, args.commands, args.write_ratio)
@@ -0,0 +1,78 @@
+import random
+import resource
+import time
+
+from dictionary.word_frequency import WordFrequency
+from dictionary.loader import read_word_frequencies
+
+
+# -------------------------------------------------
+# Helpers shared by the benchmark scripts.
+# -------------------------------------------------
+
+def sample_prefixes(words_frequencies: [WordFrequency], count: int, seed: int = 0) -> [str]:
+    """
+    draw prefixes of 1 to 3 letters from random words of the data set
+    @param words_frequencies: data set to sample from
+    @param count: number of prefixes to draw
+    @param seed: seed of the random generator
+    @return: list of prefixes
+    """
+    rng = random.Random(seed)
+    prefixes = list()
+    while len(prefixes) < count:
+        word = rng.choice(words_frequencies).word
+        prefixes.append(word[:rng.randint(1, min(3, len(word)))])
+    return prefixes
+
+
+def resident_bytes() -> int:
+    """
+    @return: current resident set size, or the peak one where /proc is not available
+    """
+    try:
+        with open('/proc/self/statm', 'r') as statm:
+            return int(statm.read().split()[1]) * resource.getpagesize()
+    except OSError:
+        return peak_resident_bytes()
+
+
+def peak_resident_bytes() -> int:
+    """
+    @return: peak resident set size of this process
+    """
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def time_ns(func, *args) -> int:
+    """
+    time a single call
+    @return: elapsed nanoseconds
+    """
+    start_time = time.perf_counter_ns()
+    func(*args)
+    return time.perf_counter_ns() - start_time
+
+
+def mean_call_ns(func, inputs: list) -> float:
+    """
+    time func over every input
+    @return: average nanoseconds per call
+    """
+    start_time = time.perf_counter_ns()
+    for value in inputs:
+        func(value)
+    return (time.perf_counter_ns() - start_time) / max(len(inputs), 1)
+
+
+def print_table(headers: [str], rows: [list]) -> None:
+    """
+    print rows as a plain aligned table
+    """
+    cells = [[str(h) for h in headers]] + [[f'{v:.1f}' if isinstance(v, float) else str(v) for v in row]
+                                           for row in rows]
+    widths = [max(len(row[i]) for row in cells) for i in range(len(headers))]
+    for index, row in enumerate(cells):
+        print('  '.join(value.rjust(width) for value, width in zip(row, widths)))
+        if index == 0:
+            print('  '.join('-' * width for width in widths))
@@ -0,0 +1,55 @@
+import argparse
+
+from benchmarks.common import read_word_frequencies, sample_prefixes, time_ns, mean_call_ns, print_table
+from benchmarks.tst_memory import traced_size
+from benchmarks.tst_search import generate_workloads, per_lookup_ns
+from approaches import select_approaches
+from dictionary.array_ternarysearchtree_dictionary import ArrayTernarySearchTreeDictionary
+from dictionary.dawg_dictionary import DawgDictionary
+
+
+# -------------------------------------------------
+# Structure size, memory and query latency of the DAWG vs the pointer-based and array-backed TSTs.
+# -------------------------------------------------
+
+CONFIGURATIONS = select_approaches(['tst', 'tst_topk', 'array_tst', 'dawg'])
+
+
+def structure_size(dictionary) -> str:
+    """
+    @return: number of nodes of a TST, or states and edges of a DAWG
+    """
+    if isinstance(dictionary, DawgDictionary):
+        return f'{dictionary.state_count()} states, {dictionary.edge_count()} edges'
+    if isinstance(dictionary, ArrayTernarySearchTreeDictionary):
+        return f'{dictionary.node_count()} nodes'
+    return f"{dictionary.shape_statistics()['nodes']} nodes"
+
+
+def run(data_filename: str, names: [str], size: int, no_prefixes: int):
+    words_frequencies = read_word_frequencies(data_filename)
+    workloads = generate_workloads([wf.word for wf in words_frequencies], size)
+    prefixes = sample_prefixes(words_frequencies, no_prefixes)
+    rows = list()
+    for name in names:
+        memory = traced_size(CONFIGURATIONS[name], words_frequencies)
+        dictionary = CONFIGURATIONS[name]()
+        build_ns = time_ns(dictionary.build_dictionary, words_frequencies)
+        hit_ns = min(per_lookup_ns(dictionary.search, workloads['hits'], 3))
+        miss_ns = min(per_lookup_ns(dictionary.search, workloads['misses'], 3))
+        autocomplete_ns = mean_call_ns(dictionary.autocomplete, prefixes)
+        rows.append([name, structure_size(dictionary), memory / 2 ** 20, build_ns / 1e6, hit_ns, miss_ns,
+                     autocomplete_ns / 1e3])
+    print(f'{len(words_frequencies)} words')
+    print_table(['Approach', 'Structure', 'Memory (MiB)', 'Build (ms)', 'Search hit (ns)', 'Search miss (ns)',
+                 'Autocomplete (us)'], rows)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--data', default='sampleData200k.txt')
+    parser.add_argument('--approaches', nargs='+', choices=CONFIGURATIONS, default=list(CONFIGURATIONS))
+    parser.add_argument('--size', type=int, default=50000)
+    parser.add_argument('--prefixes', type=int, default=300)
+    args = parser.parse_args()
+    run(args.data, args.approaches, args.size, args.prefixes)
@@ -0,0 +1,88 @@
+import argparse
+import random
+import time
+
+from benchmarks.common import read_word_frequencies, print_table
+from approaches import select_approaches
+from dictionary import instrumentation
+from dictionary.list_dictionary import ListDictionary
+from dictionary.word_frequency import WordFrequency
+
+
+# -------------------------------------------------
+# Self-organizing list dictionaries on Zipf-distributed lookups: words ranked by frequency are searched with
+# weight 1 / rank ** exponent, and autocompleted on prefixes of 1 to 3 letters of such words. Comparisons
+# are counted by the instrumentation probes in a first pass, the throughput is timed in a second pass with
+# instrumentation off, each pass on a freshly built list.
+# -------------------------------------------------
+
+CONFIGURATIONS = select_approaches(['list', 'list_frequency', 'list_move_to_front', 'list_transpose'])
+
+
+def generate_queries(words_frequencies: [WordFrequency], size: int, exponent: float, miss_ratio: float,
+                     seed: int = 0) -> ([str], [str]):
+    """
+    draw words to search, a share of them missing from the dictionary, and prefixes to autocomplete
+    @return: (words, prefixes)
+    """
+    rng = random.Random(seed)
+    ranked = sorted(words_frequencies, key=lambda wf: wf.frequency, reverse=True)
+    weights = [1 / rank ** exponent for rank in range(1, len(ranked) + 1)]
+    words = [wf.word if rng.random() >= miss_ratio else wf.word + '#' for wf in rng.choices(ranked, weights, k=size)]
+    prefixes = [wf.word[:rng.randint(1, min(3, len(wf.word)))] for wf in rng.choices(ranked, weights, k=size)]
+    return words, prefixes
+
+
+def mean_comparisons(name: str, words_frequencies: [WordFrequency], operation: str, queries: [str]) -> float:
+    """
+    @return: mean comparisons per call of 'operation' over the queries
+    """
+    dictionary = CONFIGURATIONS[name]()
+    dictionary.build_dictionary(words_frequencies)
+    instrumentation.reset()
+    instrumentation.enable()
+    try:
+        method = getattr(dictionary, operation)
+        for query in queries:
+            method(query)
+    finally:
+        instrumentation.disable()
+    statistics = instrumentation.STATISTICS[f'ListDictionary.{operation}']
+    return statistics.work / statistics.calls
+
+
+def queries_per_second(name: str, words_frequencies: [WordFrequency], operation: str, queries: [str]) -> float:
+    dictionary = CONFIGURATIONS[name]()
+    dictionary.build_dictionary(words_frequencies)
+    method = getattr(dictionary, operation)
+    start_time = time.perf_counter()
+    for query in queries:
+        method(query)
+    return len(queries) / (time.perf_counter() - start_time)
+
+
+def run(data_filename: str, names: [str], words: int, size: int, exponent: float, miss_ratio: float):
+    words_frequencies = read_word_frequencies(data_filename)[:words]
+    searches, prefixes = generate_queries(words_frequencies, size, exponent, miss_ratio)
+    rows = list()
+    for name in names:
+        rows.append([name,
+                     mean_comparisons(name, words_frequencies, 'search', searches),
+                     queries_per_second(name, words_frequencies, 'search', searches),
+                     mean_comparisons(name, words_frequencies, 'autocomplete', prefixes),
+                     queries_per_second(name, words_frequencies, 'autocomplete', prefixes)])
+    print(f'{size} searches ({miss_ratio:.0%} misses) and {size} autocompletes, Zipf exponent {exponent}, '
+          f'{len(words_frequencies)} words')
+    print_table(['Approach', 'Search comparisons', 'Search (q/s)', 'AC comparisons', 'AC (q/s)'], rows)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--data', default='sampleData200k.txt')
+    parser.add_argument('--approaches', nargs='+', choices=CONFIGURATIONS, default=list(CONFIGURATIONS))
+    parser.add_argument('--words', type=int, default=20000, help='dictionary size, the first words of the file')
+    parser.add_argument('--queries', type=int, default=2000)
+    parser.add_argument('--exponent', type=float, default=1.0)
+    parser.add_argument('--miss-ratio', type=float, default=0.1)
+    args = parser.parse_args()
+    run(args.data, args.approaches, args.words, args.queries, args.exponent, args.miss_ratio)
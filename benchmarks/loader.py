@@ -0,0 +1,87 @@
+import argparse
+import subprocess
+import sys
+import time
+
+from benchmarks.common import peak_resident_bytes, print_table
+from dictionary.word_frequency import WordFrequency
+from dictionary.loader import iter_word_frequencies, read_word_frequencies
+from dictionary.hashtable_dictionary import HashTableDictionary
+
+
+# -------------------------------------------------
+# Load time and peak RSS of the data file loaders.
+# Every strategy runs in a fresh interpreter so that the peak RSS is its own.
+# -------------------------------------------------
+
+def driver_loop(filename: str):
+    # The line-by-line list building dictionary_file_based.py used to do.
+    words_frequencies = []
+    data_file = open(filename, 'r')
+    for line in data_file:
+        values = line.split()
+        words_frequencies.append(WordFrequency(values[0], int(values[1])))
+    data_file.close()
+    return words_frequencies
+
+
+def notebook_readlines(filename: str):
+    # The read_file of empirical_analysis.ipynb: readlines() and two split()s per line.
+    with open(filename, 'r') as f:
+        sample_data = [line.strip() for line in f.readlines()]
+        return [WordFrequency(word=line.split()[0], frequency=int(line.split()[1])) for line in sample_data]
+
+
+def stream_into_dictionary(filename: str):
+    # Build straight from the generator, no intermediate list is ever held.
+    dictionary = HashTableDictionary(compact=True)
+    dictionary.build_dictionary(iter_word_frequencies(filename))
+    return dictionary
+
+
+def list_into_dictionary(filename: str):
+    dictionary = HashTableDictionary(compact=True)
+    dictionary.build_dictionary(driver_loop(filename))
+    return dictionary
+
+
+STRATEGIES = {
+    'driver loop': driver_loop,
+    'notebook readlines': notebook_readlines,
+    'mmap stream': lambda filename: sum(1 for _ in iter_word_frequencies(filename)),
+    'mmap bulk': read_word_frequencies,
+    'build from list': list_into_dictionary,
+    'build from stream': stream_into_dictionary,
+}
+
+
+def measure(name: str, data_filename: str):
+    """
+    run one strategy and print 'peak resident bytes before, after, elapsed ns'
+    """
+    start_peak = peak_resident_bytes()
+    start_time = time.perf_counter_ns()
+    STRATEGIES[name](data_filename)
+    elapsed_ns = time.perf_counter_ns() - start_time
+    print(start_peak, peak_resident_bytes(), elapsed_ns)
+
+
+def run(data_filename: str):
+    rows = list()
+    for name in STRATEGIES:
+        output = subprocess.run([sys.executable, '-m', 'benchmarks.loader', '--data', data_filename,
+                                 '--measure', name], capture_output=True, text=True, check=True).stdout
+        start_peak, end_peak, elapsed_ns = map(int, output.split())
+        rows.append([name, elapsed_ns / 1e6, (end_peak - start_peak) / 2 ** 20])
+    print_table(['Strategy', 'Time (ms)', 'Peak RSS growth (MiB)'], rows)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--data', default='sampleData200k.txt')
+    parser.add_argument('--measure', choices=STRATEGIES, help='measure a single strategy in this process')
+    args = parser.parse_args()
+    if args.measure:
+        measure(args.measure, args.data)
+    else:
+        run(args.data)
@@ -0,0 +1,56 @@
+import argparse
+import os
+import time
+
+from benchmarks.common import read_word_frequencies, print_table
+from benchmarks.command_engine import CONFIGURATIONS, generate_commands
+from command_engine import run_batched, run_parallel
+
+
+# -------------------------------------------------
+# Throughput scaling of the parallel command engine with the number of worker processes,
+# on a read-only workload of S / AC commands. One worker is the in-process batched engine.
+# -------------------------------------------------
+
+def default_workers() -> [int]:
+    """
+    @return: 1, 2, 4, ... up to the number of cores, and at least up to 2
+    """
+    counts = [1]
+    while counts[-1] < max(2, os.cpu_count() or 1):
+        counts.append(counts[-1] * 2)
+    return counts
+
+
+def run(data_filename: str, names: [str], size: int, worker_counts: [int]):
+    words_frequencies = read_word_frequencies(data_filename)
+    commands = generate_commands(words_frequencies, size, 0)
+    rows = list()
+    for name in names:
+        agent = CONFIGURATIONS[name]()
+        agent.build_dictionary(words_frequencies)
+        # Warm lazily built structures in the parent, otherwise every worker would build its own copy.
+        agent.autocomplete('')
+        expected = None
+        base_time = None
+        for workers in worker_counts:
+            start_time = time.perf_counter()
+            output = run_parallel(agent, commands, workers) if workers > 1 else run_batched(agent, commands)
+            elapsed = time.perf_counter() - start_time
+            if expected is None:
+                expected, base_time = output, elapsed
+            assert output == expected, (name, workers)
+            rows.append([name, workers, size / elapsed, base_time / elapsed])
+    print(f'{size} read-only commands over {len(words_frequencies)} words, {os.cpu_count()} cores')
+    print_table(['Approach', 'Workers', 'Throughput (cmd/s)', 'Speedup'], rows)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--data', default='sampleData200k.txt')
+    parser.add_argument('--approaches', nargs='+', choices=CONFIGURATIONS,
+                        default=['hashtable_index', 'tst_topk', 'array_tst'])
+    parser.add_argument('--commands', type=int, default=200000)
+    parser.add_argument('--workers', type=int, nargs='+', default=default_workers())
+    args = parser.parse_args()
+    run(args.data, args.approaches, args.commands, args.workers)
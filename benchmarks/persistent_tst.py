@@ -0,0 +1,139 @@
+import argparse
+import gc
+import random
+import threading
+import time
+
+from benchmarks.common import read_word_frequencies, sample_prefixes, print_table
+from dictionary.word_frequency import WordFrequency
+from dictionary.ternarysearchtree_dictionary import TernarySearchTreeDictionary
+from dictionary.persistent_ternarysearchtree_dictionary import PersistentTernarySearchTreeDictionary
+
+
+# -------------------------------------------------
+# Thread stress test of readers against a writer applying batches of adds and deletes.
+#   'persistent'  readers pin the current version of a path-copying TST, no lock taken
+#   'locked'      readers and the writer share a lock around an in-place TST
+# Each reader query searches a word and autocompletes a prefix. Every batch also replaces a pair of
+# marker words ('~<batch>a', '~<batch>b') with the next pair; a reader seeing only one word of a pair
+# has seen a batch half applied, which fails the run. Reader latency is measured with and without the
+# writer running; the GIL interleaves the threads, so latencies include waiting for it.
+# -------------------------------------------------
+
+class Stress:
+    __slots__ = 'mode', 'dictionary', 'lock', 'stop', 'latencies', 'batches', 'violations'
+
+    def __init__(self, mode: str, words_frequencies: [WordFrequency], top_k: int):
+        self.mode = mode
+        if mode == 'persistent':
+            self.dictionary = PersistentTernarySearchTreeDictionary(top_k)
+        else:
+            self.dictionary = TernarySearchTreeDictionary(top_k)
+        self.dictionary.build_dictionary(words_frequencies + [WordFrequency('~0a', 1), WordFrequency('~0b', 1)])
+        self.lock = threading.Lock()
+        self.stop = threading.Event()
+        self.latencies = []     # seconds per reader query
+        self.batches = 0        # write batches applied
+        self.violations = 0     # pinned states holding a single marker word
+
+    def write(self, words: [str], batch_size: int, seed: int) -> None:
+        rng = random.Random(seed)
+        while not self.stop.is_set():
+            batch = self.batches
+            operations = [(rng.random() < 0.5, rng.choice(words)) for _ in range(batch_size)]
+            if self.mode == 'persistent':
+                with self.dictionary.write_batch() as version:
+                    self.apply(version, operations, batch)
+            else:
+                with self.lock:
+                    self.apply(self.dictionary, operations, batch)
+            self.batches += 1
+
+    @staticmethod
+    def apply(dictionary, operations: [(bool, str)], batch: int) -> None:
+        for add, word in operations:
+            if add:
+                dictionary.add_word_frequency(WordFrequency(word, 1))
+            else:
+                dictionary.delete_word(word)
+        dictionary.delete_word(f'~{batch}a')
+        dictionary.add_word_frequency(WordFrequency(f'~{batch + 1}a', 1))
+        dictionary.delete_word(f'~{batch}b')
+        dictionary.add_word_frequency(WordFrequency(f'~{batch + 1}b', 1))
+
+    def read(self, queries: [(str, str)]) -> None:
+        latencies = list()
+        perf_counter = time.perf_counter
+        for word, prefix in queries:
+            if self.stop.is_set():
+                break
+            start_time = perf_counter()
+            if self.mode == 'persistent':
+                version = self.dictionary.snapshot()
+                self.query(version, word, prefix)
+            else:
+                with self.lock:
+                    self.query(self.dictionary, word, prefix)
+            latencies.append(perf_counter() - start_time)
+        self.latencies.extend(latencies)
+
+    def query(self, dictionary, word: str, prefix: str) -> None:
+        dictionary.search(word)
+        dictionary.autocomplete(prefix)
+        # The pair written by the last batch this state holds: both words or neither.
+        pair = dictionary.autocomplete('~')
+        if len(pair) != 2 or pair[0].word[:-1] != pair[1].word[:-1]:
+            self.violations += 1
+
+
+def percentile(sorted_values: [float], fraction: float) -> float:
+    return sorted_values[min(int(fraction * len(sorted_values)), len(sorted_values) - 1)]
+
+
+def run(data_filename: str, modes: [str], readers: int, queries: int, batch_size: int, top_k: int):
+    words_frequencies = read_word_frequencies(data_filename)
+    words = [wf.word for wf in words_frequencies]
+    rng = random.Random(0)
+    prefixes = sample_prefixes(words_frequencies, queries)
+    rows = list()
+    for mode in modes:
+        for writing in (False, True):
+            stress = Stress(mode, words_frequencies, top_k)
+            reader_threads = [threading.Thread(target=stress.read,
+                                               args=([(rng.choice(words), prefix) for prefix in prefixes],))
+                              for _ in range(readers)]
+            writer_thread = threading.Thread(target=stress.write, args=(words, batch_size, 1))
+            start_time = time.perf_counter()
+            if writing:
+                writer_thread.start()
+            for thread in reader_threads:
+                thread.start()
+            for thread in reader_threads:
+                thread.join()
+            elapsed = time.perf_counter() - start_time
+            stress.stop.set()
+            if writing:
+                writer_thread.join()
+            assert stress.violations == 0, f'{mode}: readers saw {stress.violations} half applied batches'
+            latencies = sorted(stress.latencies)
+            live = '-'
+            if mode == 'persistent':
+                gc.collect()
+                live = stress.dictionary.live_versions()
+            rows.append([mode, 'yes' if writing else 'no', len(latencies) / elapsed, percentile(latencies, 0.5) * 1e6,
+                         percentile(latencies, 0.99) * 1e6, stress.batches / elapsed, live])
+    print(f'{readers} readers x {queries} queries, batches of {batch_size} writes, top_k {top_k}, '
+          f'{len(words_frequencies)} words')
+    print_table(['Mode', 'Writer', 'Reads (q/s)', 'p50 (us)', 'p99 (us)', 'Batches/s', 'Live versions'], rows)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--data', default='sampleData200k.txt')
+    parser.add_argument('--modes', nargs='+', choices=['persistent', 'locked'], default=['persistent', 'locked'])
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--queries', type=int, default=20000, help='queries per reader')
+    parser.add_argument('--batch-size', type=int, default=100)
+    parser.add_argument('--top-k', type=int, default=3)
+    args = parser.parse_args()
+    run(args.data, args.modes, args.readers, args.queries, args.batch_size, args.top_k)
@@ -0,0 +1,37 @@
+import argparse
+import string
+
+from benchmarks.common import read_word_frequencies, sample_prefixes, time_ns, mean_call_ns, print_table
+from approaches import create_dictionary
+
+
+# -------------------------------------------------
+# Linear startswith scan vs sorted-array prefix index for list and hashtable autocomplete.
+# -------------------------------------------------
+
+def run(data_filename: str, no_prefixes: int):
+    words_frequencies = read_word_frequencies(data_filename)
+    prefixes = list(string.ascii_lowercase) + sample_prefixes(words_frequencies, no_prefixes)
+    rows = list()
+    for name in ('list', 'hashtable'):
+        scanning, indexed = create_dictionary(name), create_dictionary(name + '_index')
+        scanning.build_dictionary(words_frequencies)
+        indexed.build_dictionary(words_frequencies)
+        # The first query pays for the lazy index build.
+        index_build_ns = time_ns(indexed.autocomplete, 'a')
+        for prefix in prefixes:
+            expected = [(wf.word, wf.frequency) for wf in scanning.autocomplete(prefix)]
+            assert [(wf.word, wf.frequency) for wf in indexed.autocomplete(prefix)] == expected, prefix
+        scanning_ns = mean_call_ns(scanning.autocomplete, prefixes)
+        indexed_ns = mean_call_ns(indexed.autocomplete, prefixes)
+        rows.append([name, index_build_ns / 1e6, scanning_ns / 1e3, indexed_ns / 1e3, scanning_ns / indexed_ns])
+    print(f'{len(prefixes)} prefixes over {len(words_frequencies)} words')
+    print_table(['Approach', 'Index build (ms)', 'Scan (us)', 'Index (us)', 'Speedup'], rows)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--data', default='sampleData200k.txt')
+    parser.add_argument('--prefixes', type=int, default=300)
+    args = parser.parse_args()
+    run(args.data, args.prefixes)
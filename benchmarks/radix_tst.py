@@ -0,0 +1,38 @@
+import argparse
+
+from benchmarks.common import read_word_frequencies, sample_prefixes, time_ns, mean_call_ns, print_table
+from benchmarks.tst_memory import traced_size
+from benchmarks.tst_search import generate_workloads, per_lookup_ns
+from approaches import APPROACHES
+
+
+# -------------------------------------------------
+# Node count, memory and query latency of the path-compressed TST vs the TST.
+# -------------------------------------------------
+
+def run(data_filename: str, size: int, no_prefixes: int):
+    words_frequencies = read_word_frequencies(data_filename)
+    workloads = generate_workloads([wf.word for wf in words_frequencies], size)
+    prefixes = sample_prefixes(words_frequencies, no_prefixes)
+    rows = list()
+    for name in ('tst', 'radix_tst'):
+        memory = traced_size(APPROACHES[name], words_frequencies)
+        dictionary = APPROACHES[name]()
+        build_ns = time_ns(dictionary.build_dictionary, words_frequencies)
+        nodes = dictionary.shape_statistics()['nodes'] if name == 'tst' else dictionary.node_count()
+        searches = [min(per_lookup_ns(dictionary.search, workloads[workload], 3))
+                    for workload in ('hits', 'misses', 'long hits (>= 10)')]
+        autocomplete_ns = mean_call_ns(dictionary.autocomplete, prefixes)
+        rows.append([name, nodes, memory / 2 ** 20, build_ns / 1e6, *searches, autocomplete_ns / 1e3])
+    print(f'{len(words_frequencies)} words')
+    print_table(['Approach', 'Nodes', 'Memory (MiB)', 'Build (ms)', 'Search hit (ns)', 'Search miss (ns)',
+                 'Long hit (ns)', 'Autocomplete (us)'], rows)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--data', default='sampleData200k.txt')
+    parser.add_argument('--size', type=int, default=50000)
+    parser.add_argument('--prefixes', type=int, default=300)
+    args = parser.parse_args()
+    run(args.data, args.size, args.prefixes)
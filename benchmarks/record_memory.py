@@ -0,0 +1,50 @@
+import argparse
+import subprocess
+import sys
+import time
+
+from benchmarks.common import resident_bytes, print_table
+from approaches import select_approaches
+from dictionary.loader import iter_word_frequencies
+
+
+# -------------------------------------------------
+# Resident memory and build time of the dictionaries at full data-set scale.
+# Every configuration is measured in a fresh interpreter so that earlier runs don't pollute the RSS.
+# -------------------------------------------------
+
+CONFIGURATIONS = select_approaches(['list', 'hashtable', 'hashtable_compact', 'tst'])
+
+
+def measure(name: str, data_filename: str):
+    """
+    build one configuration and print 'resident bytes before the build, after the build, build ns'
+    """
+    dictionary = CONFIGURATIONS[name]()
+    start_rss = resident_bytes()
+    start_time = time.perf_counter_ns()
+    dictionary.build_dictionary(iter_word_frequencies(data_filename))
+    build_ns = time.perf_counter_ns() - start_time
+    print(start_rss, resident_bytes(), build_ns)
+
+
+def run(data_filename: str, names: [str]):
+    rows = list()
+    for name in names:
+        output = subprocess.run([sys.executable, '-m', 'benchmarks.record_memory', '--data', data_filename,
+                                 '--measure', name], capture_output=True, text=True, check=True).stdout
+        start_rss, built_rss, build_ns = map(int, output.split())
+        rows.append([name, (built_rss - start_rss) / 2 ** 20, built_rss / 2 ** 20, build_ns / 1e6])
+    print_table(['Approach', 'RSS growth (MiB)', 'RSS total (MiB)', 'Build incl. parsing (ms)'], rows)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--data', default='sampleData200k.txt')
+    parser.add_argument('--measure', choices=CONFIGURATIONS, help='measure a single configuration in this process')
+    parser.add_argument('--approaches', nargs='+', default=list(CONFIGURATIONS), choices=CONFIGURATIONS)
+    args = parser.parse_args()
+    if args.measure:
+        measure(args.measure, args.data)
+    else:
+        run(args.data, args.approaches)
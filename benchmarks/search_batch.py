@@ -0,0 +1,79 @@
+import argparse
+import random
+import time
+
+from benchmarks.common import read_word_frequencies, print_table
+from approaches import select_approaches
+from dictionary.word_frequency import WordFrequency
+
+
+# -------------------------------------------------
+# Batch searches of document tokens: search_batch (vocabulary ids and one NumPy gather) compared with a
+# search call per token and with search_many. Tokens are drawn with weight 1 / rank ** exponent over the
+# words ranked by frequency, a share of them missing from the dictionary. The vocabulary index is built
+# once before timing, as it is by the first batch. The list scans the whole list per search, keep --sizes
+# small for it.
+# -------------------------------------------------
+
+CONFIGURATIONS = select_approaches(['list', 'hashtable', 'hashtable_compact', 'tst'])
+
+
+def generate_tokens(words_frequencies: [WordFrequency], size: int, exponent: float, miss_ratio: float,
+                    seed: int = 0) -> [str]:
+    """
+    @return: tokens to be searched
+    """
+    rng = random.Random(seed)
+    ranked = sorted(words_frequencies, key=lambda wf: wf.frequency, reverse=True)
+    weights = [1 / rank ** exponent for rank in range(1, len(ranked) + 1)]
+    return [wf.word if rng.random() >= miss_ratio else wf.word + '#' for wf in rng.choices(ranked, weights, k=size)]
+
+
+def search_each(dictionary, tokens: [str]) -> list:
+    search = dictionary.search
+    return [search(token) for token in tokens]
+
+
+def best_seconds(func, *args, repetitions: int) -> (float, object):
+    """
+    @return: (fastest of the timed calls in seconds, result of the last call)
+    """
+    best = float('inf')
+    for _ in range(repetitions):
+        start_time = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - start_time)
+    return best, result
+
+
+def run(data_filename: str, names: [str], sizes: [int], exponent: float, miss_ratio: float, repetitions: int):
+    words_frequencies = read_word_frequencies(data_filename)
+    rows = list()
+    for name in names:
+        dictionary = CONFIGURATIONS[name]()
+        dictionary.build_dictionary(words_frequencies)
+        dictionary.search_batch([])
+        for size in sizes:
+            tokens = generate_tokens(words_frequencies, size, exponent, miss_ratio)
+            each_time, expected = best_seconds(search_each, dictionary, tokens, repetitions=repetitions)
+            many_time, many = best_seconds(dictionary.search_many, tokens, repetitions=repetitions)
+            batch_time, batch = best_seconds(dictionary.search_batch, tokens, repetitions=repetitions)
+            assert many == expected and batch.tolist() == expected, f'{name}: batch searches disagree with search'
+            rows.append([name, size, size / each_time, size / many_time, size / batch_time, each_time / batch_time])
+    print(f'{miss_ratio:.0%} of unknown tokens, Zipf exponent {exponent}, {len(words_frequencies)} words, '
+          f'best of {repetitions}')
+    print_table(['Approach', 'Batch size', 'search (w/s)', 'search_many (w/s)', 'search_batch (w/s)', 'Speedup'],
+                rows)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--data', default='sampleData200k.txt')
+    parser.add_argument('--approaches', nargs='+', choices=CONFIGURATIONS,
+                        default=['hashtable', 'hashtable_compact', 'tst'])
+    parser.add_argument('--sizes', nargs='+', type=int, default=[100, 1000, 10000, 100000, 1000000])
+    parser.add_argument('--exponent', type=float, default=1.0)
+    parser.add_argument('--miss-ratio', type=float, default=0.05)
+    parser.add_argument('--repetitions', type=int, default=3)
+    args = parser.parse_args()
+    run(args.data, args.approaches, args.sizes, args.exponent, args.miss_ratio, args.repetitions)
@@ -0,0 +1,79 @@
+import argparse
+import asyncio
+import time
+
+from benchmarks.common import read_word_frequencies, print_table
+from benchmarks.command_engine import generate_commands
+
+
+# -------------------------------------------------
+# Load generator for dictionary_server.py, started beforehand, e.g.
+#     python3 dictionary_server.py tst sampleData200k.txt
+#     python3 -m benchmarks.server_load --connections 50 --depth 8
+# Every connection keeps up to --depth commands in flight, drawn as in benchmarks/command_engine.py
+# (words skewed towards the frequent ones, a share of A / D writes). The latency of a command runs from
+# the moment it is written to the moment its output line is read back.
+# -------------------------------------------------
+
+def percentile(sorted_values: [float], fraction: float) -> float:
+    return sorted_values[min(int(fraction * len(sorted_values)), len(sorted_values) - 1)]
+
+
+async def drive_connection(host: str, port: int, commands: [str], depth: int, latencies: [float]) -> None:
+    """
+    send the commands over one connection, at most 'depth' of them awaiting their output at any time
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    sent_times = list()
+    in_flight = asyncio.Semaphore(depth)
+
+    async def send():
+        for command in commands:
+            await in_flight.acquire()
+            sent_times.append(time.perf_counter())
+            writer.write(command.encode())
+            await writer.drain()
+
+    sender = asyncio.create_task(send())
+    for index in range(len(commands)):
+        if not await reader.readline():
+            raise ConnectionError('the server closed the connection')
+        latencies.append(time.perf_counter() - sent_times[index])
+        in_flight.release()
+    await sender
+    writer.close()
+    await writer.wait_closed()
+
+
+async def generate_load(host: str, port: int, commands: [str], connections: int, depth: int) -> ([float], float):
+    """
+    @return: (latency of every command in seconds, elapsed seconds)
+    """
+    latencies = list()
+    start_time = time.perf_counter()
+    await asyncio.gather(*(drive_connection(host, port, commands[i::connections], depth, latencies)
+                           for i in range(connections)))
+    return latencies, time.perf_counter() - start_time
+
+
+def run(host: str, port: int, data_filename: str, size: int, write_ratio: float, connections: int, depth: int):
+    commands = generate_commands(read_word_frequencies(data_filename), size, write_ratio)
+    latencies, elapsed = asyncio.run(generate_load(host, port, commands, connections, depth))
+    latencies.sort()
+    print(f'{size} commands ({write_ratio:.0%} writes) over {connections} connections, {depth} in flight each')
+    print_table(['QPS', 'p50 (ms)', 'p99 (ms)', 'max (ms)'],
+                [[size / elapsed, percentile(latencies, 0.5) * 1e3, percentile(latencies, 0.99) * 1e3,
+                  latencies[-1] * 1e3]])
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=7878)
+    parser.add_argument('--data', default='sampleData200k.txt', help='data file the commands are drawn from')
+    parser.add_argument('--commands', type=int, default=100000)
+    parser.add_argument('--write-ratio', type=float, default=0.02)
+    parser.add_argument('--connections', type=int, default=50)
+    parser.add_argument('--depth', type=int, default=8, help='commands in flight per connection')
+    args = parser.parse_args()
+    run(args.host, args.port, args.data, args.commands, args.write_ratio, args.connections, args.depth)
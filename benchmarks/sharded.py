@@ -0,0 +1,83 @@
+import argparse
+import random
+import time
+
+from benchmarks.common import read_word_frequencies, print_table
+from benchmarks.command_engine import CONFIGURATIONS, generate_commands
+from command_engine import run_batched
+from dictionary.sharded_dictionary import ShardedDictionary
+from dictionary.word_frequency import WordFrequency
+
+
+# -------------------------------------------------
+# Build time and mixed workload throughput of a single dictionary vs sharded ones, in process and with a
+# worker process per shard. The mixed workload is the one of benchmarks/command_engine.py, answered by the
+# batched command engine, so runs of reads reach the shards as batches.
+# Sizes beyond the data file are synthetic: words of the file followed by a suffix, with frequencies drawn
+# from those of the file. A TST of 5M words takes a few GB, more while a sharded build copies it to workers.
+# -------------------------------------------------
+
+def synthetic_words(words_frequencies: [WordFrequency], size: int, seed: int = 0) -> [WordFrequency]:
+    """
+    @return: 'size' distinct words, the words of the data set first
+    """
+    if size <= len(words_frequencies):
+        return words_frequencies[:size]
+    rng = random.Random(seed)
+    result = list(words_frequencies)
+    suffix = 0
+    while len(result) < size:
+        suffix += 1
+        for word_frequency in words_frequencies[:size - len(result)]:
+            result.append(WordFrequency(f'{word_frequency.word}{suffix}', rng.choice(words_frequencies).frequency))
+    return result
+
+
+def configurations(backend: str, shards: int) -> dict:
+    factory = CONFIGURATIONS[backend]
+    return {
+        backend: factory,
+        f'letter x{shards}': lambda: ShardedDictionary(factory, shards, 'letter'),
+        f'hash x{shards}': lambda: ShardedDictionary(factory, shards, 'hash'),
+        f'letter x{shards} workers': lambda: ShardedDictionary(factory, shards, 'letter', workers=True),
+    }
+
+
+def run(data_filename: str, backend: str, shards: int, sizes: [int], size: int, write_ratio: float):
+    words_frequencies = read_word_frequencies(data_filename)
+    rows = list()
+    for words in sizes:
+        data = synthetic_words(words_frequencies, words)
+        commands = generate_commands(data, size, write_ratio)
+        expected = None
+        for name, make in configurations(backend, shards).items():
+            dictionary = make()
+            start_time = time.perf_counter()
+            dictionary.build_dictionary(data)
+            build_time = time.perf_counter() - start_time
+            start_time = time.perf_counter()
+            output = run_batched(dictionary, commands)
+            elapsed = time.perf_counter() - start_time
+            if isinstance(dictionary, ShardedDictionary):
+                dictionary.close()
+            # Fan-outs may break frequency ties differently, searches and writes must agree.
+            answers = [line for line in output if not line.startswith('Autocomplete')]
+            if expected is None:
+                expected = answers
+            assert answers == expected, f'{name}: answers differ from the single dictionary'
+            rows.append([name, len(data), build_time, size / elapsed])
+            del dictionary
+    print(f'{size} commands, {write_ratio:.0%} writes')
+    print_table(['Approach', 'Words', 'Build (s)', 'Mixed (cmd/s)'], rows)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--data', default='sampleData200k.txt')
+    parser.add_argument('--backend', choices=CONFIGURATIONS, default='tst_topk')
+    parser.add_argument('--shards', type=int, default=4)
+    parser.add_argument('--words', nargs='+', type=int, default=[200000, 5000000])
+    parser.add_argument('--commands', type=int, default=100000)
+    parser.add_argument('--write-ratio', type=float, default=0.02)
+    args = parser.parse_args()
+    run(args.data, args.backend, args.shards, args.words, args.commands, args.write_ratio)
@@ -0,0 +1,58 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.common import print_table
+
+
+# -------------------------------------------------
+# Time to first query of dictionary_file_based.py: rebuild from the text file vs load a snapshot.
+# Each run is a fresh process answering a single 'S' command, so imports and start-up are included.
+# -------------------------------------------------
+
+APPROACHES = ['list', 'hashtable', 'tst', 'array_tst']
+
+
+def time_driver(approach: str, data_filename: str, command_filename: str, output_filename: str,
+                snapshot_filename: str = None) -> float:
+    """
+    @return: wall-clock seconds of one driver run
+    """
+    command = [sys.executable, 'dictionary_file_based.py', approach, data_filename, command_filename, output_filename]
+    if snapshot_filename is not None:
+        command += ['--snapshot', snapshot_filename]
+    start_time = time.perf_counter()
+    subprocess.run(command, check=True)
+    return time.perf_counter() - start_time
+
+
+def run(data_filename: str, repeat: int):
+    rows = list()
+    with tempfile.TemporaryDirectory() as directory:
+        command_filename = os.path.join(directory, 'first_query.in')
+        output_filename = os.path.join(directory, 'first_query.out')
+        with open(command_filename, 'w') as command_file:
+            command_file.write('S the\n')
+        for approach in APPROACHES:
+            snapshot_filename = os.path.join(directory, approach + '.snap')
+            # The first run writes the snapshot, the timed ones only load it.
+            time_driver(approach, data_filename, command_filename, output_filename, snapshot_filename)
+            rebuild = statistics.median(time_driver(approach, data_filename, command_filename, output_filename)
+                                        for _ in range(repeat))
+            load = statistics.median(time_driver(approach, data_filename, command_filename, output_filename,
+                                                 snapshot_filename) for _ in range(repeat))
+            rows.append([approach, os.path.getsize(snapshot_filename) / 2 ** 20, rebuild * 1e3, load * 1e3,
+                         rebuild / load])
+    print_table(['Approach', 'Snapshot (MiB)', 'Rebuild (ms)', 'Snapshot load (ms)', 'Speedup'], rows)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--data', default='sampleData200k.txt')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    run(args.data, args.repeat)
@@ -0,0 +1,85 @@
+import argparse
+import random
+import time
+
+from benchmarks.common import read_word_frequencies, print_table
+from approaches import select_approaches
+from dictionary.word_frequency import WordFrequency
+
+
+# -------------------------------------------------
+# Streaming ingest of observed words: every observation bumps the frequency of its word by one, adding the
+# word when it is new. increment() is compared with the search, delete and add sequence it replaces.
+# Observations are drawn with weight 1 / rank ** exponent over the words ranked by frequency, with a share
+# of words missing from the data file (drawn from a smaller pool, so they recur once added).
+# The list scans the whole list per update, keep --updates small for it.
+# -------------------------------------------------
+
+CONFIGURATIONS = select_approaches(['list', 'hashtable', 'hashtable_index', 'tst', 'tst_topk', 'array_tst',
+                                    'radix_tst', 'dawg'])
+
+
+def generate_stream(words_frequencies: [WordFrequency], size: int, exponent: float, new_ratio: float,
+                    seed: int = 0) -> [str]:
+    """
+    @return: observed words
+    """
+    rng = random.Random(seed)
+    ranked = sorted(words_frequencies, key=lambda wf: wf.frequency, reverse=True)
+    weights = [1 / rank ** exponent for rank in range(1, len(ranked) + 1)]
+    new_words = [f'{rng.choice(ranked).word}#{i}' for i in range(max(1, int(size * new_ratio) // 4))]
+    return [wf.word if rng.random() >= new_ratio else rng.choice(new_words)
+            for wf in rng.choices(ranked, weights, k=size)]
+
+
+def ingest_with_increment(dictionary, stream: [str]) -> float:
+    """
+    @return: seconds taken to count the stream with increment
+    """
+    increment = dictionary.increment
+    start_time = time.perf_counter()
+    for word in stream:
+        increment(word, 1)
+    return time.perf_counter() - start_time
+
+
+def ingest_with_delete_and_add(dictionary, stream: [str]) -> float:
+    """
+    @return: seconds taken to count the stream by deleting and adding the words again
+    """
+    start_time = time.perf_counter()
+    for word in stream:
+        frequency = dictionary.search(word)
+        if frequency:
+            dictionary.delete_word(word)
+        dictionary.add_word_frequency(WordFrequency(word, frequency + 1))
+    return time.perf_counter() - start_time
+
+
+def run(data_filename: str, names: [str], size: int, exponent: float, new_ratio: float):
+    words_frequencies = read_word_frequencies(data_filename)
+    stream = generate_stream(words_frequencies, size, exponent, new_ratio)
+    rows = list()
+    for name in names:
+        timings, counts = list(), list()
+        for ingest in (ingest_with_delete_and_add, ingest_with_increment):
+            dictionary = CONFIGURATIONS[name]()
+            dictionary.build_dictionary(words_frequencies)
+            timings.append(ingest(dictionary, stream))
+            counts.append(dict(dictionary.items()))
+        assert counts[0] == counts[1], f'{name}: increment and delete + add counted differently'
+        rows.append([name, size / timings[0], size / timings[1], timings[0] / timings[1]])
+    print(f'{size} updates, {new_ratio:.0%} of new words, Zipf exponent {exponent}, {len(words_frequencies)} words')
+    print_table(['Approach', 'Delete + add (upd/s)', 'Increment (upd/s)', 'Speedup'], rows)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--data', default='sampleData200k.txt')
+    parser.add_argument('--approaches', nargs='+', choices=CONFIGURATIONS,
+                        default=['hashtable', 'hashtable_index', 'tst', 'tst_topk', 'array_tst', 'radix_tst', 'dawg'])
+    parser.add_argument('--updates', type=int, default=1000000)
+    parser.add_argument('--exponent', type=float, default=1.0)
+    parser.add_argument('--new-ratio', type=float, default=0.02)
+    args = parser.parse_args()
+    run(args.data, args.approaches, args.updates, args.exponent, args.new_ratio)
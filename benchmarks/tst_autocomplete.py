@@ -0,0 +1,41 @@
+import argparse
+import string
+
+from benchmarks.common import read_word_frequencies, sample_prefixes, time_ns, mean_call_ns, print_table
+from dictionary.ternarysearchtree_dictionary import TernarySearchTreeDictionary
+
+
+# -------------------------------------------------
+# Full subtree enumeration vs cached top-k autocomplete on the TST.
+# -------------------------------------------------
+
+def run(data_filename: str, top_k: int, no_prefixes: int):
+    words_frequencies = read_word_frequencies(data_filename)
+    enumerating, cached = TernarySearchTreeDictionary(), TernarySearchTreeDictionary(top_k=top_k)
+    build_enumerating = time_ns(enumerating.build_dictionary, words_frequencies)
+    build_cached = time_ns(cached.build_dictionary, words_frequencies)
+    print(f'build (ms): enumerating {build_enumerating / 1e6:.0f}, top-{top_k} cached {build_cached / 1e6:.0f}')
+
+    workloads = {
+        'single letter': list(string.ascii_lowercase),
+        'sampled 1-3 letters': sample_prefixes(words_frequencies, no_prefixes),
+    }
+    rows = list()
+    for name, prefixes in workloads.items():
+        # Both modes must agree on the frequencies returned.
+        for prefix in prefixes:
+            expected = [wf.frequency for wf in enumerating.autocomplete(prefix)][:top_k]
+            assert [wf.frequency for wf in cached.autocomplete(prefix)][:len(expected)] == expected, prefix
+        enumerating_ns = mean_call_ns(enumerating.autocomplete, prefixes)
+        cached_ns = mean_call_ns(cached.autocomplete, prefixes)
+        rows.append([name, len(prefixes), enumerating_ns / 1e3, cached_ns / 1e3, enumerating_ns / cached_ns])
+    print_table(['Workload', 'Prefixes', 'Enumerating (us)', 'Cached (us)', 'Speedup'], rows)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--data', default='sampleData200k.txt')
+    parser.add_argument('--top-k', type=int, default=3)
+    parser.add_argument('--prefixes', type=int, default=500)
+    args = parser.parse_args()
+    run(args.data, args.top_k, args.prefixes)
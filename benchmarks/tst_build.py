@@ -0,0 +1,40 @@
+import argparse
+
+from benchmarks.common import read_word_frequencies, time_ns, print_table
+from benchmarks.tst_search import generate_workloads, per_lookup_ns
+from dictionary.ternarysearchtree_dictionary import TernarySearchTreeDictionary
+
+
+# -------------------------------------------------
+# One-by-one insertion in file order vs balanced bulk build of the TST.
+# -------------------------------------------------
+
+def insert_one_by_one(tst: TernarySearchTreeDictionary, words_frequencies):
+    for word_frequency in words_frequencies:
+        tst.add_word_frequency(word_frequency)
+
+
+def run(data_filename: str, size: int):
+    words_frequencies = read_word_frequencies(data_filename)
+    hits = generate_workloads([wf.word for wf in words_frequencies], size)['hits']
+    inserted, bulk = TernarySearchTreeDictionary(), TernarySearchTreeDictionary()
+    builds = {
+        'one by one': (inserted, time_ns(insert_one_by_one, inserted, words_frequencies)),
+        'balanced bulk': (bulk, time_ns(bulk.build_dictionary, words_frequencies)),
+    }
+    rows = list()
+    for name, (tst, build_ns) in builds.items():
+        shape = tst.shape_statistics()
+        search_ns = min(per_lookup_ns(tst.search, hits, 3))
+        rows.append([name, build_ns / 1e6, shape['nodes'], shape['height'], shape['mean_search_depth'],
+                     shape['max_search_depth'], search_ns])
+    print_table(['Build', 'Time (ms)', 'Nodes', 'Height', 'Mean search depth', 'Max search depth',
+                 'Search (ns/hit)'], rows)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--data', default='sampleData200k.txt')
+    parser.add_argument('--size', type=int, default=50000)
+    args = parser.parse_args()
+    run(args.data, args.size)
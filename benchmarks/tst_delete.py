@@ -0,0 +1,64 @@
+import argparse
+import math
+import random
+import statistics
+import time
+
+from benchmarks.common import read_word_frequencies, print_table
+from approaches import select_approaches
+
+
+# -------------------------------------------------
+# Delete-heavy workload modelled on the notebook's shrinking_analysis: dictionaries of growing sizes
+# are shrunk by deleting a share of their words at random, one timed delete at a time.
+# Every surviving word is searched afterwards, a delete must never take another word with it.
+# -------------------------------------------------
+
+CONFIGURATIONS = select_approaches(['tst', 'tst_topk', 'array_tst'])
+
+
+def shrink(agent, words: [str]) -> [int]:
+    """
+    @return: nanoseconds taken by each delete
+    """
+    timings = list()
+    for word in words:
+        start_time = time.perf_counter_ns()
+        agent.delete_word(word)
+        timings.append(time.perf_counter_ns() - start_time)
+    return timings
+
+
+def run(data_filename: str, names: [str], delete_share: float, smallest: int, seed: int):
+    words_frequencies = read_word_frequencies(data_filename)
+    sizes = list()
+    size = len(words_frequencies)
+    while size >= smallest:
+        sizes.insert(0, size)
+        size //= 2
+    rows = list()
+    for size in sizes:
+        data = words_frequencies[:size]
+        unique_words = list(dict.fromkeys(wf.word for wf in data))
+        deleted = random.Random(seed).sample(unique_words, math.ceil(len(unique_words) * delete_share))
+        deleted_set = set(deleted)
+        survivors = [word for word in unique_words if word not in deleted_set]
+        for name in names:
+            agent = CONFIGURATIONS[name]()
+            agent.build_dictionary(data)
+            timings = shrink(agent, deleted)
+            lost = sum(1 for word in survivors if agent.search(word) == 0)
+            rows.append([size, name, len(deleted), statistics.mean(timings), statistics.median(timings),
+                         max(timings) / 1000, lost])
+    print_table(['Size', 'Approach', 'Deletes', 'Mean (ns)', 'Median (ns)', 'Max (us)', 'Lost words'], rows)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--data', default='sampleData200k.txt')
+    parser.add_argument('--approaches', nargs='+', choices=CONFIGURATIONS, default=['tst', 'tst_topk', 'array_tst'])
+    parser.add_argument('--delete-share', type=float, default=0.3)
+    parser.add_argument('--smallest', type=int, default=3125)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    run(args.data, args.approaches, args.delete_share, args.smallest, args.seed)
@@ -0,0 +1,81 @@
+import argparse
+import random
+import statistics
+import string
+import time
+
+from benchmarks.common import read_word_frequencies, print_table
+from approaches import select_approaches
+
+
+# -------------------------------------------------
+# Latency of TST fuzzy_autocomplete on randomly perturbed prefixes. Without top-k mode the first query builds
+# the per-node caches of best words; it is timed on its own, as the warm-up, and left out of the statistics.
+# -------------------------------------------------
+
+CONFIGURATIONS = select_approaches(['tst', 'tst_topk'])
+
+
+def perturb(word: str, rng: random.Random) -> str:
+    """
+    apply one random typo to a word: substitute, delete, insert or swap adjacent letters
+    """
+    i = rng.randrange(len(word))
+    letter = rng.choice(string.ascii_lowercase)
+    typo = rng.randrange(4) if len(word) > 1 else 2
+    if typo == 0:
+        return word[:i] + letter + word[i + 1:]
+    elif typo == 1:
+        return word[:i] + word[i + 1:]
+    elif typo == 2:
+        return word[:i] + letter + word[i:]
+    i = min(i, len(word) - 2)
+    return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+
+
+def sample_typos(words: [str], count: int, seed: int = 0) -> [str]:
+    """
+    @return: prefixes of 2 to 6 letters of random words, each with one typo
+    """
+    rng = random.Random(seed)
+    prefixes = list()
+    while len(prefixes) < count:
+        word = rng.choice(words)
+        if len(word) >= 2:
+            prefixes.append(perturb(word[:rng.randint(2, min(6, len(word)))], rng))
+    return prefixes
+
+
+def run(data_filename: str, names: [str], count: int, edit_bounds: [int]):
+    words_frequencies = read_word_frequencies(data_filename)
+    prefixes = sample_typos([wf.word for wf in words_frequencies], count)
+    rows = list()
+    for name in names:
+        tst = CONFIGURATIONS[name]()
+        tst.build_dictionary(words_frequencies)
+        start_time = time.perf_counter_ns()
+        tst.fuzzy_autocomplete(prefixes[0])
+        warm_up = (time.perf_counter_ns() - start_time) / 1e6
+        for max_edits in edit_bounds:
+            timings = list()
+            hits = 0
+            for prefix in prefixes:
+                start_time = time.perf_counter_ns()
+                completions = tst.fuzzy_autocomplete(prefix, max_edits)
+                timings.append((time.perf_counter_ns() - start_time) / 1e6)
+                hits += 1 if completions else 0
+            timings.sort()
+            rows.append([name, max_edits, warm_up, statistics.mean(timings), statistics.median(timings),
+                         timings[int(0.95 * (len(timings) - 1))], hits / len(prefixes)])
+    print(f'{count} perturbed prefixes over {len(words_frequencies)} words')
+    print_table(['Approach', 'Max edits', 'Warm-up (ms)', 'Mean (ms)', 'Median (ms)', 'p95 (ms)', 'Answered'], rows)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--data', default='sampleData200k.txt')
+    parser.add_argument('--approaches', nargs='+', choices=CONFIGURATIONS, default=list(CONFIGURATIONS))
+    parser.add_argument('--count', type=int, default=2000)
+    parser.add_argument('--max-edits', type=int, nargs='+', default=[0, 1, 2])
+    args = parser.parse_args()
+    run(args.data, args.approaches, args.count, args.max_edits)
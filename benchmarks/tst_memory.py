@@ -0,0 +1,45 @@
+import argparse
+import tracemalloc
+
+from benchmarks.common import read_word_frequencies, time_ns, print_table
+from benchmarks.tst_search import generate_workloads, per_lookup_ns
+from approaches import APPROACHES
+
+
+# -------------------------------------------------
+# Memory footprint and timings of the pointer-based TST vs the array-backed TST.
+# -------------------------------------------------
+
+def traced_size(dictionary_class, words_frequencies) -> int:
+    """
+    @return: bytes still allocated by a built dictionary, measured with tracemalloc
+    """
+    tracemalloc.start()
+    dictionary = dictionary_class()
+    dictionary.build_dictionary(words_frequencies)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del dictionary
+    return size
+
+
+def run(data_filename: str, size: int):
+    words_frequencies = read_word_frequencies(data_filename)
+    workloads = generate_workloads([wf.word for wf in words_frequencies], size)
+    rows = list()
+    for name in ('tst', 'array_tst'):
+        memory = traced_size(APPROACHES[name], words_frequencies)
+        dictionary = APPROACHES[name]()
+        build_ns = time_ns(dictionary.build_dictionary, words_frequencies)
+        hit_ns = min(per_lookup_ns(dictionary.search, workloads['hits'], 3))
+        miss_ns = min(per_lookup_ns(dictionary.search, workloads['misses'], 3))
+        rows.append([name, memory / 2 ** 20, build_ns / 1e6, hit_ns, miss_ns])
+    print_table(['Approach', 'Memory (MiB)', 'Build (ms)', 'Search hit (ns)', 'Search miss (ns)'], rows)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--data', default='sampleData200k.txt')
+    parser.add_argument('--size', type=int, default=50000)
+    args = parser.parse_args()
+    run(args.data, args.size)
@@ -0,0 +1,73 @@
+import argparse
+import random
+import statistics
+import time
+
+from benchmarks.common import read_word_frequencies, print_table
+from dictionary.ternarysearchtree_dictionary import TernarySearchTreeDictionary
+
+
+# -------------------------------------------------
+# Per-lookup latency of TST search on test1.in-style 'S' workloads.
+# -------------------------------------------------
+
+def read_search_commands(command_filename: str) -> [str]:
+    """
+    @return: the words of the 'S' commands of a command file
+    """
+    with open(command_filename, 'r') as command_file:
+        return [values[1] for values in map(str.split, command_file) if values and values[0] == 'S']
+
+
+def generate_workloads(words: [str], size: int, seed: int = 0) -> dict:
+    """
+    build search workloads of hits, misses and word-length buckets
+    @return: workload name -> list of words to search
+    """
+    rng = random.Random(seed)
+    hits = [rng.choice(words) for _ in range(size)]
+    # A miss shares most of its path with a stored word, which is the expensive kind of miss.
+    misses = [word[:-1] + '#' for word in hits]
+    return {
+        'hits': hits,
+        'misses': misses,
+        'short hits (<= 5)': [w for w in hits if len(w) <= 5],
+        'long hits (>= 10)': [w for w in hits if len(w) >= 10],
+    }
+
+
+def per_lookup_ns(search, words: [str], repeat: int) -> [float]:
+    """
+    @return: mean nanoseconds per lookup of every repetition
+    """
+    timings = list()
+    for _ in range(repeat):
+        start_time = time.perf_counter_ns()
+        for word in words:
+            search(word)
+        timings.append((time.perf_counter_ns() - start_time) / len(words))
+    return timings
+
+
+def run(data_filename: str, command_filename: str, size: int, repeat: int):
+    words_frequencies = read_word_frequencies(data_filename)
+    tst = TernarySearchTreeDictionary()
+    tst.build_dictionary(words_frequencies)
+    workloads = generate_workloads([wf.word for wf in words_frequencies], size)
+    if command_filename:
+        workloads[command_filename] = read_search_commands(command_filename) * max(1, size // 10)
+    rows = list()
+    for name, words in workloads.items():
+        timings = per_lookup_ns(tst.search, words, repeat)
+        rows.append([name, len(words), statistics.median(timings), min(timings)])
+    print_table(['Workload', 'Lookups', 'Median (ns/lookup)', 'Best (ns/lookup)'], rows)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--data', default='sampleData200k.txt')
+    parser.add_argument('--commands', default='test1.in')
+    parser.add_argument('--size', type=int, default=50000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    run(args.data, args.commands, args.size, args.repeat)
@@ -0,0 +1,116 @@
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from benchmarks.common import read_word_frequencies, print_table
+from approaches import select_approaches
+from dictionary.word_frequency import WordFrequency
+from dictionary.hashtable_dictionary import HashTableDictionary
+from dictionary.write_ahead_log import WriteAheadLog, LoggedDictionary, read_log, replay_log
+
+
+# -------------------------------------------------
+# Write-ahead log costs:
+#   sustained add / delete throughput of a logged hashtable for several group commit sizes, fsync included
+#   (the time-based sync is switched off so that only the group size decides), against no log at all;
+#   replay time of a large log, decoding alone and applied on top of the data file by each backend.
+# Logs are written to a temporary directory, pass --directory to measure another disk; on a tmpfs fsync
+# costs nothing.
+# -------------------------------------------------
+
+CONFIGURATIONS = select_approaches(['hashtable', 'tst'])
+
+
+def generate_mutations(words_frequencies: [WordFrequency], size: int, seed: int = 0) -> [(bool, str, int)]:
+    """
+    @return: (add, word, frequency) mutations, alternating adds of new words and deletes of words added
+             earlier, so that every mutation succeeds and is logged
+    """
+    rng = random.Random(seed)
+    mutations = list()
+    added = list()
+    for i in range(size):
+        if i % 2 == 0 or not added:
+            added.append(f'{rng.choice(words_frequencies).word}#{i}')
+            mutations.append((True, added[-1], rng.randint(1, 10 ** 6)))
+        else:
+            index = rng.randrange(len(added))
+            added[index], added[-1] = added[-1], added[index]
+            mutations.append((False, added.pop(), 0))
+    return mutations
+
+
+def apply_mutations(dictionary, mutations: [(bool, str, int)]) -> float:
+    """
+    @return: seconds taken
+    """
+    start_time = time.perf_counter()
+    for add, word, frequency in mutations:
+        if add:
+            dictionary.add_word_frequency(WordFrequency(word, frequency))
+        else:
+            dictionary.delete_word(word)
+    return time.perf_counter() - start_time
+
+
+def run(data_filename: str, directory: str, size: int, group_sizes: [int], replay_size: int, names: [str]):
+    words_frequencies = read_word_frequencies(data_filename)
+    log_filename = os.path.join(directory, 'benchmark.wal')
+    rows = list()
+    mutations = generate_mutations(words_frequencies, size)
+    for group_size in [0] + group_sizes:
+        dictionary = HashTableDictionary()
+        dictionary.build_dictionary(words_frequencies)
+        syncs = 0
+        if group_size:
+            log = WriteAheadLog(log_filename, group_size, sync_interval=float('inf'))
+            dictionary = LoggedDictionary(dictionary, log)
+        elapsed = apply_mutations(dictionary, mutations)
+        if group_size:
+            start_time = time.perf_counter()
+            dictionary.close()
+            elapsed += time.perf_counter() - start_time
+            syncs = dictionary.log.syncs
+            os.remove(log_filename)
+        rows.append([group_size or 'no log', size / elapsed, syncs])
+    print(f'{size} adds and deletes on a hashtable of {len(words_frequencies)} words')
+    print_table(['Group size', 'Mutations/s', 'fsyncs'], rows)
+
+    # A large log, synced in big groups since only its replay is measured.
+    log = WriteAheadLog(log_filename, 4096, sync_interval=float('inf'))
+    logged = LoggedDictionary(HashTableDictionary(), log)
+    logged.build_dictionary(words_frequencies)
+    apply_mutations(logged, generate_mutations(words_frequencies, replay_size, seed=1))
+    logged.close()
+    log_size = os.path.getsize(log_filename) / 2 ** 20
+    rows = list()
+    start_time = time.perf_counter()
+    records, _ = read_log(log_filename)
+    rows.append(['decode only', len(records), time.perf_counter() - start_time, log_size])
+    for name in names:
+        dictionary = CONFIGURATIONS[name]()
+        dictionary.build_dictionary(words_frequencies)
+        start_time = time.perf_counter()
+        replayed = replay_log(dictionary, log_filename)
+        rows.append([name, replayed, time.perf_counter() - start_time, log_size])
+    os.remove(log_filename)
+    print(f'replay of {replay_size} logged adds and deletes')
+    print_table(['Replay', 'Records', 'Time (s)', 'Log (MiB)'], rows)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--data', default='sampleData200k.txt')
+    parser.add_argument('--directory', help='directory the logs are written to (default: a temporary one)')
+    parser.add_argument('--mutations', type=int, default=20000)
+    parser.add_argument('--group-sizes', nargs='+', type=int, default=[1, 8, 64, 512, 4096])
+    parser.add_argument('--replay', type=int, default=1000000)
+    parser.add_argument('--approaches', nargs='+', choices=CONFIGURATIONS, default=list(CONFIGURATIONS))
+    args = parser.parse_args()
+    if args.directory is not None:
+        run(args.data, args.directory, args.mutations, args.group_sizes, args.replay, args.approaches)
+    else:
+        with tempfile.TemporaryDirectory() as directory:
+            run(args.data, directory, args.mutations, args.group_sizes, args.replay, args.approaches)
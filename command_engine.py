@@ -0,0 +1,228 @@
+import gc
+import multiprocessing
+
+from dictionary.extended_dictionary import ExtendedDictionary
+from dictionary.word_frequency import WordFrequency
+
+
+# -------------------------------------------------------------------
+# Execution of command files against a dictionary.
+# Each line is one of 'S word', 'A word frequency', 'D word' or 'AC word'.
+# The batched engine groups runs of read-only commands (S, AC) and answers each run with a single
+# search_many / autocomplete_many call; A and D are ordering barriers that flush the pending run first.
+# The parallel engine also shards each large run across forked worker processes, which share the
+# dictionary copy-on-write; a write forks fresh workers for the next run, so they see it.
+# All engines produce exactly the same output.
+# -------------------------------------------------------------------
+
+READ_ONLY_COMMANDS = ('S', 'AC')
+# Runs shorter than this are answered in-process, forking workers would cost more than it saves.
+PARALLEL_MIN_BATCH = 2000
+# Dictionary answered by forked workers, set by the parent right before it forks them.
+SHARED_AGENT: ExtendedDictionary = None
+
+
+def format_search(word: str, frequency: int) -> str:
+    if frequency > 0:
+        return f"Found '{word}' with frequency {frequency}\n"
+    return f"NOT Found '{word}'\n"
+
+
+def format_add(word: str, succeeded: bool) -> str:
+    return f"Add '{word}' succeeded\n" if succeeded else f"Add '{word}' failed\n"
+
+
+def format_delete(word: str, succeeded: bool) -> str:
+    return f"Delete '{word}' succeeded\n" if succeeded else f"Delete '{word}' failed\n"
+
+
+def format_autocomplete(word: str, list_words: [WordFrequency]) -> str:
+    line = "Autocomplete for '" + word + "': [ "
+    for item in list_words:
+        line = line + item.word + ": " + str(item.frequency) + "  "
+    return line + ']\n'
+
+
+def execute(agent: ExtendedDictionary, command_values: [str], line: str):
+    """
+    run a single command
+    @param agent: dictionary to run the command against
+    @param command_values: the split command line
+    @param line: the raw command line, echoed for unknown commands
+    @return: the output line, None for an unknown command
+    """
+    command = command_values[0]
+    # search
+    if command == 'S':
+        return format_search(command_values[1], agent.search(command_values[1]))
+    # add
+    elif command == 'A':
+        word = command_values[1]
+        return format_add(word, agent.add_word_frequency(WordFrequency(word, int(command_values[2]))))
+    # delete
+    elif command == 'D':
+        return format_delete(command_values[1], agent.delete_word(command_values[1]))
+    # check
+    elif command == 'AC':
+        return format_autocomplete(command_values[1], agent.autocomplete(command_values[1]))
+    print('Unknown command.')
+    print(line)
+    return None
+
+
+def run_serial(agent: ExtendedDictionary, lines) -> [str]:
+    """
+    run commands one at a time
+    @param agent: dictionary to run the commands against
+    @param lines: command lines
+    @return: the output lines
+    """
+    output = list()
+    for line in lines:
+        command_values = line.split()
+        if not command_values:
+            continue
+        result = execute(agent, command_values, line)
+        if result is not None:
+            output.append(result)
+    return output
+
+
+def answer_batch(agent: ExtendedDictionary, batch: [(int, str, str)], output: [str]) -> None:
+    """
+    answer a run of read-only commands with one batch call per command type
+    @param agent: dictionary to run the commands against
+    @param batch: (output slot, command, word) of every pending command, emptied afterwards
+    @param output: output lines, the reserved slots are filled in
+    """
+    searches = [(slot, word) for slot, command, word in batch if command == 'S']
+    completions = [(slot, word) for slot, command, word in batch if command == 'AC']
+    if searches:
+        frequencies = agent.search_many([word for _, word in searches])
+        for (slot, word), frequency in zip(searches, frequencies):
+            output[slot] = format_search(word, frequency)
+    if completions:
+        lists_words = agent.autocomplete_many([word for _, word in completions])
+        for (slot, word), list_words in zip(completions, lists_words):
+            output[slot] = format_autocomplete(word, list_words)
+    batch.clear()
+
+
+def run_batched(agent: ExtendedDictionary, lines) -> [str]:
+    """
+    run commands, answering runs of read-only commands in batches
+    @param agent: dictionary to run the commands against
+    @param lines: command lines
+    @return: the output lines
+    """
+    output = list()
+    batch = list()
+    for line in lines:
+        command_values = line.split()
+        if not command_values:
+            continue
+        if command_values[0] in READ_ONLY_COMMANDS:
+            # Reserve the output slot, it is filled when the batch is answered.
+            batch.append((len(output), command_values[0], command_values[1]))
+            output.append(None)
+            continue
+        # Writes must see every earlier read answered first.
+        answer_batch(agent, batch, output)
+        result = execute(agent, command_values, line)
+        if result is not None:
+            output.append(result)
+    answer_batch(agent, batch, output)
+    return output
+
+
+def answer_chunk(commands: [(str, str)]) -> [str]:
+    """
+    answer a shard of read-only commands in a worker process
+    @param commands: (command, word) pairs
+    @return: the output lines, in the same order
+    """
+    output = [None] * len(commands)
+    answer_batch(SHARED_AGENT, [(slot, command, word) for slot, (command, word) in enumerate(commands)], output)
+    return output
+
+
+def answer_parallel(agent: ExtendedDictionary, batch: [(int, str, str)], output: [str], workers: int) -> None:
+    """
+    answer a run of read-only commands by sharding it across forked worker processes
+    @param agent: dictionary to run the commands against
+    @param batch: (output slot, command, word) of every pending command, emptied afterwards
+    @param output: output lines, the reserved slots are filled in
+    @param workers: number of worker processes
+    """
+    if len(batch) < PARALLEL_MIN_BATCH:
+        answer_batch(agent, batch, output)
+        return
+    global SHARED_AGENT
+    SHARED_AGENT = agent
+    # Contiguous shards, so merging the results back is a plain concatenation.
+    size = -(-len(batch) // workers)
+    chunks = [[(command, word) for _, command, word in batch[i:i + size]] for i in range(0, len(batch), size)]
+    # Frozen objects are never visited by the collector, so the workers do not copy the pages it would touch.
+    gc.freeze()
+    try:
+        with multiprocessing.get_context('fork').Pool(workers) as pool:
+            results = pool.map(answer_chunk, chunks)
+    finally:
+        gc.unfreeze()
+        SHARED_AGENT = None
+    lines = [line for result in results for line in result]
+    for (slot, _, _), line in zip(batch, lines):
+        output[slot] = line
+    batch.clear()
+
+
+def run_parallel(agent: ExtendedDictionary, lines, workers: int) -> [str]:
+    """
+    run commands, answering large runs of read-only commands in forked worker processes
+    @param agent: dictionary to run the commands against
+    @param lines: command lines
+    @param workers: number of worker processes
+    @return: the output lines
+    """
+    # Sharing the dictionary relies on fork; elsewhere every worker would have to rebuild it.
+    if workers <= 1 or 'fork' not in multiprocessing.get_all_start_methods():
+        return run_batched(agent, lines)
+    output = list()
+    batch = list()
+    for line in lines:
+        command_values = line.split()
+        if not command_values:
+            continue
+        if command_values[0] in READ_ONLY_COMMANDS:
+            batch.append((len(output), command_values[0], command_values[1]))
+            output.append(None)
+            continue
+        # Workers forked before a write would not see it, so the run is answered first.
+        answer_parallel(agent, batch, output, workers)
+        result = execute(agent, command_values, line)
+        if result is not None:
+            output.append(result)
+    answer_parallel(agent, batch, output, workers)
+    return output
+
+
+def run_command_file(agent: ExtendedDictionary, command_filename: str, output_filename: str, batched: bool = True,
+                     workers: int = 1):
+    """
+    run a command file and write all of its output at once
+    @param agent: dictionary to run the commands against
+    @param command_filename: file of commands, one per line
+    @param output_filename: file the results are written to
+    @param batched: whether read-only commands are answered in batches
+    @param workers: number of worker processes answering read-only commands, 1 answers them in-process
+    """
+    with open(command_filename, 'r') as command_file:
+        lines = command_file.readlines()
+    if not batched:
+        output = run_serial(agent, lines)
+    elif workers > 1:
+        output = run_parallel(agent, lines, workers)
+    else:
+        output = run_batched(agent, lines)
+    with open(output_filename, 'w') as output_file:
+        output_file.write(''.join(output))
@@ -0,0 +1,369 @@
+from array import array
+import bisect
+
+from dictionary.extended_dictionary import ExtendedDictionary
+from dictionary.word_frequency import WordFrequency
+from dictionary.prefix_index import LAST_CHAR
+from dictionary.instrumentation import instrumented
+
+
+# ------------------------------------------------------------------------
+# Ternary Search Tree stored in parallel arrays instead of Node objects.
+# Node i is described by letters[i], lefts[i], middles[i], rights[i], frequencies[i] and end_words[i].
+# Index 0 is a sentinel, a child index of 0 means there is no child.
+# ------------------------------------------------------------------------
+
+class ArrayTernarySearchTreeDictionary(ExtendedDictionary):
+    __slots__ = 'root_', 'letters', 'lefts', 'middles', 'rights', 'frequencies', 'end_words', 'free_nodes'
+
+    def __init__(self):
+        self.root_ = 0                      # index of the root node, 0 when the tree is empty
+        self.letters = array('I', [0])      # code point of the letter stored at each node
+        self.lefts = array('i', [0])        # index of the left child, which holds a smaller letter
+        self.middles = array('i', [0])      # index of the middle child
+        self.rights = array('i', [0])       # index of the right child, which holds a greater letter
+        self.frequencies = array('q', [0])  # frequency of the word ending at each node
+        self.end_words = array('b', [0])    # 1 if a word ends at each node
+        self.free_nodes = []                # indices of deleted nodes, reused before the arrays grow
+
+    def new_node(self, letter: int) -> int:
+        """
+        allocate a node
+        @param letter: code point of the letter
+        @return: index of the node
+        """
+        if self.free_nodes:
+            index = self.free_nodes.pop()
+            self.letters[index] = letter
+            self.lefts[index] = self.middles[index] = self.rights[index] = 0
+            self.frequencies[index] = self.end_words[index] = 0
+            return index
+        self.letters.append(letter)
+        self.lefts.append(0)
+        self.middles.append(0)
+        self.rights.append(0)
+        self.frequencies.append(0)
+        self.end_words.append(0)
+        return len(self.letters) - 1
+
+    def node_count(self) -> int:
+        """
+        @return: number of nodes in the tree
+        """
+        return len(self.letters) - 1 - len(self.free_nodes)
+
+    @instrumented()
+    def build_dictionary(self, words_frequencies: [WordFrequency]):
+        """
+        construct the data structure to store nodes
+        @param words_frequencies: list of (word, frequency) to be stored
+        """
+        # Words added to a tree that already holds words are inserted one by one.
+        if self.root_:
+            for word_frequency in words_frequencies:
+                self.add_word_frequency(word_frequency)
+            return
+        # Dedupe in a single pass, the first occurrence wins as it would with add_word_frequency.
+        frequencies = dict()
+        for word_frequency in words_frequencies:
+            if word_frequency.word != '':
+                frequencies.setdefault(word_frequency.word, word_frequency.frequency)
+        words = sorted(frequencies)
+        self.root_ = self.build_balanced(words, frequencies, 0, len(words), 0)
+
+    def build_balanced(self, words: [str], frequencies: dict, start: int, end: int, depth: int) -> int:
+        """
+        build a balanced subtree from sorted words sharing their first 'depth' letters
+        @param words: sorted unique words
+        @param frequencies: frequency of every word
+        @param start: first index of the words to be stored, inclusive
+        @param end: last index of the words to be stored, exclusive
+        @param depth: number of letters already consumed, every word in the range is longer than this
+        @return: index of the root of the subtree, 0 if the range is empty
+        """
+        if start >= end:
+            return 0
+        # The letter of the median word becomes the root, so both sides hold about half of the words.
+        prefix = words[(start + end) // 2][:depth + 1]
+        low = bisect.bisect_left(words, prefix, start, end)
+        high = bisect.bisect_left(words, prefix + LAST_CHAR, low, end)
+        curr = self.new_node(ord(prefix[-1]))
+        if start < low:
+            self.lefts[curr] = self.build_balanced(words, frequencies, start, low, depth)
+        # The shortest word of the letter's range may end right here.
+        if words[low] == prefix:
+            self.frequencies[curr] = frequencies[prefix]
+            self.end_words[curr] = 1
+            low += 1
+        if low < high:
+            self.middles[curr] = self.build_balanced(words, frequencies, low, high, depth + 1)
+        if high < end:
+            self.rights[curr] = self.build_balanced(words, frequencies, high, end, depth)
+        return curr
+
+    def find_node(self, word: str) -> int:
+        """
+        find the node holding the last letter of a word, whether or not a word ends there
+        @param word: the word (or prefix) to be searched
+        @return: index of the node, 0 if the tree has no such path
+        """
+        if word == '':
+            return 0
+        letters, lefts, middles, rights = self.letters, self.lefts, self.middles, self.rights
+        curr = self.root_
+        last_index = len(word) - 1
+        letter_index = 0
+        letter = ord(word[0])
+        while curr:
+            node_letter = letters[curr]
+            if letter < node_letter:
+                curr = lefts[curr]
+            elif letter > node_letter:
+                curr = rights[curr]
+            elif letter_index == last_index:
+                return curr
+            else:
+                letter_index += 1
+                letter = ord(word[letter_index])
+                curr = middles[curr]
+        return 0
+
+    @instrumented('nodes visited', lambda self, word: self.nodes_visited(word))
+    def search(self, word: str) -> int:
+        """
+        search for a word
+        @param word: the word to be searched
+        @return: frequency > 0 if found and 0 if NOT found
+        """
+        curr = self.find_node(word)
+        if curr and self.end_words[curr]:
+            return self.frequencies[curr]
+        return 0
+
+    @instrumented('nodes visited', lambda self, word_frequency: self.nodes_visited(word_frequency.word))
+    def add_word_frequency(self, word_frequency: WordFrequency) -> bool:
+        """
+        add a word and its frequency to the dictionary
+        @param word_frequency: (word, frequency) to be added
+        :return: True whether succeeded, False when word is already in the dictionary
+        """
+        if word_frequency.word == '':
+            return False
+        # Walk the word once, creating the missing nodes on the way, so no separate duplicate check is needed.
+        curr = self.insert_path(word_frequency.word)
+        if self.end_words[curr]:
+            return False
+        self.frequencies[curr] = word_frequency.frequency
+        self.end_words[curr] = 1
+        return True
+
+    def insert_path(self, word: str) -> int:
+        """
+        walk a non-empty word from the root, creating the nodes missing from its path
+        @param word: the word to be walked
+        @return: index of the node holding the last letter of the word
+        """
+        letters, lefts, middles, rights = self.letters, self.lefts, self.middles, self.rights
+        letter = ord(word[0])
+        if not self.root_:
+            self.root_ = self.new_node(letter)
+        curr = self.root_
+        last_index = len(word) - 1
+        letter_index = 0
+        while True:
+            node_letter = letters[curr]
+            if letter < node_letter:
+                if not lefts[curr]:
+                    lefts[curr] = self.new_node(letter)
+                curr = lefts[curr]
+            elif letter > node_letter:
+                if not rights[curr]:
+                    rights[curr] = self.new_node(letter)
+                curr = rights[curr]
+            elif letter_index == last_index:
+                return curr
+            else:
+                letter_index += 1
+                letter = ord(word[letter_index])
+                if not middles[curr]:
+                    middles[curr] = self.new_node(letter)
+                curr = middles[curr]
+
+    @instrumented('nodes visited', lambda self, word, delta=1: self.nodes_visited(word))
+    def increment(self, word: str, delta: int = 1) -> int:
+        """
+        add delta to the frequency of a word, adding the word with frequency delta if it is not in the dictionary
+        @param word: the word to be updated
+        @param delta: change of the frequency, a word whose frequency drops to 0 or below is deleted
+        @return: the new frequency, 0 if the word is not (or no longer) in the dictionary
+        """
+        if word == '':
+            return 0
+        if delta > 0:
+            # A single walk, creating the path of a new word.
+            curr = self.insert_path(word)
+            frequency = self.frequencies[curr] + delta if self.end_words[curr] else delta
+            self.frequencies[curr] = frequency
+            self.end_words[curr] = 1
+            return frequency
+        # A decrement never adds the word, so it must not create nodes.
+        curr = self.find_node(word)
+        if not curr or not self.end_words[curr]:
+            return 0
+        frequency = self.frequencies[curr] + delta
+        if frequency <= 0:
+            self.delete_word(word)
+            return 0
+        self.frequencies[curr] = frequency
+        return frequency
+
+    @instrumented('nodes visited', lambda self, word_frequency: self.nodes_visited(word_frequency.word))
+    def upsert(self, word_frequency: WordFrequency) -> bool:
+        """
+        set the frequency of a word, adding the word if it is not in the dictionary
+        @param word_frequency: (word, frequency) to be stored
+        @return: True if the word was added, False if its frequency was updated (or the word is empty)
+        """
+        if word_frequency.word == '':
+            return False
+        curr = self.insert_path(word_frequency.word)
+        added = not self.end_words[curr]
+        self.frequencies[curr] = word_frequency.frequency
+        self.end_words[curr] = 1
+        return added
+
+    @instrumented('nodes visited', lambda self, word: self.nodes_visited(word))
+    def delete_word(self, word: str) -> bool:
+        """
+        delete a word from the dictionary
+        @param word: word to be deleted
+        @return: whether succeeded, e.g. return False when point not found
+        """
+        if word == '':
+            return False
+        letters, lefts, middles, rights = self.letters, self.lefts, self.middles, self.rights
+        # Record the path as (node, array of the parent's pointer to it, parent).
+        path = list()
+        links, parent = None, 0
+        curr = self.root_
+        last_index = len(word) - 1
+        letter_index = 0
+        letter = ord(word[0])
+        while curr:
+            path.append((curr, links, parent))
+            node_letter = letters[curr]
+            parent = curr
+            if letter < node_letter:
+                links, curr = lefts, lefts[curr]
+            elif letter > node_letter:
+                links, curr = rights, rights[curr]
+            elif letter_index == last_index:
+                break
+            else:
+                letter_index += 1
+                letter = ord(word[letter_index])
+                links, curr = middles, middles[curr]
+        if not curr or not self.end_words[curr]:
+            return False
+        self.end_words[curr] = 0
+        self.frequencies[curr] = 0
+
+        # Prune bottom-up along the path; stop at the first node that is still needed.
+        for node, links, parent in reversed(path):
+            if self.end_words[node] or middles[node] or (lefts[node] and rights[node]):
+                break
+            # A node without a word below it is replaced by its only sibling subtree, if any.
+            replacement = lefts[node] or rights[node]
+            if links is None:
+                self.root_ = replacement
+            else:
+                links[parent] = replacement
+            self.free_nodes.append(node)
+        return True
+
+    @instrumented('nodes visited', lambda self, word: self.nodes_visited(word, True))
+    def autocomplete(self, word: str) -> [WordFrequency]:
+        """
+        return a list of 3 most-frequent words in the dictionary that have 'word' as a prefix
+        @param word: word to be autocompleted
+        @return: a list (could be empty) of (at most) 3 most-frequent words with prefix 'word'
+        """
+        return_list = list()
+        # Search for the prefix, return if it is not found.
+        prefixes_suffix = self.find_node(word)
+        if not prefixes_suffix:
+            return return_list
+        # If prefix is a word itself, add it to the list.
+        if self.end_words[prefixes_suffix]:
+            return_list.append(WordFrequency(word, self.frequencies[prefixes_suffix]))
+        # Pre-order walk of the subtree below the prefix: node, left, middle, right.
+        letters, lefts, middles, rights = self.letters, self.lefts, self.middles, self.rights
+        stack = [(middles[prefixes_suffix], word)]
+        while stack:
+            curr, w = stack.pop()
+            if not curr:
+                continue
+            node_word = w + chr(letters[curr])
+            if self.end_words[curr]:
+                return_list.append(WordFrequency(node_word, self.frequencies[curr]))
+            stack.append((rights[curr], w))
+            stack.append((middles[curr], node_word))
+            stack.append((lefts[curr], w))
+        # Sort the list by frequency and return top 3.
+        return_list.sort(key=lambda x: x.frequency, reverse=True)
+        return return_list[:3]
+
+    def items(self):
+        """
+        @return: iterator over the (word, frequency) pairs stored, in lexicographic order
+        """
+        letters, lefts, middles, rights = self.letters, self.lefts, self.middles, self.rights
+        # Entries are (node, prefix) to expand, or (0, (word, frequency)) to emit.
+        stack = [(self.root_, '')] if self.root_ else []
+        while stack:
+            curr, value = stack.pop()
+            if not curr:
+                yield value
+                continue
+            # In-order: left, the word ending here, middle, right.
+            node_word = value + chr(letters[curr])
+            if rights[curr]:
+                stack.append((rights[curr], value))
+            if middles[curr]:
+                stack.append((middles[curr], node_word))
+            if self.end_words[curr]:
+                stack.append((0, (node_word, self.frequencies[curr])))
+            if lefts[curr]:
+                stack.append((lefts[curr], value))
+
+    def nodes_visited(self, word: str, subtree: bool = False) -> int:
+        """
+        count the nodes visited by a walk down a word, the instrumentation probe of the tree operations
+        @param word: the word (or prefix) to be walked
+        @param subtree: also count the nodes below the end of the word, as autocomplete enumerates them; the
+                        count walks the subtree once more, so an instrumented autocomplete takes about twice as long
+        @return: number of nodes visited
+        """
+        letters, lefts, middles, rights = self.letters, self.lefts, self.middles, self.rights
+        visited = 0
+        curr = self.root_
+        letter_index = 0
+        while curr and letter_index < len(word):
+            visited += 1
+            letter = ord(word[letter_index])
+            if letter < letters[curr]:
+                curr = lefts[curr]
+            elif letter > letters[curr]:
+                curr = rights[curr]
+            elif letter_index == len(word) - 1:
+                stack = [middles[curr]] if subtree else []
+                while stack:
+                    node = stack.pop()
+                    if node:
+                        visited += 1
+                        stack.extend((lefts[node], middles[node], rights[node]))
+                break
+            else:
+                letter_index += 1
+                curr = middles[curr]
+        return visited
@@ -0,0 +1,80 @@
+import math
+
+
+# ------------------------------------------------------------------------
+# Counting Bloom filter over words.
+# Each word sets hash_count counters, picked by double hashing of its hash: position i is
+# (h1 + i * h2) mod size. Counters are bytes, so words can be removed again; a counter that reached 255
+# stays there, as decrementing it could drop words still counted on it. A word whose counters are not all
+# set was never added (or has been removed), the other way round it may be a false positive.
+# Python's str hash is salted per process, so a filter is never saved, only rebuilt from the words.
+# ------------------------------------------------------------------------
+
+MAX_COUNT = 255
+
+
+class CountingBloomFilter:
+    __slots__ = 'size', 'hash_count', 'capacity', 'false_positive_rate', 'counters', 'count'
+
+    def __init__(self, capacity: int, false_positive_rate: float = 0.01):
+        """
+        @param capacity: number of words the filter is sized for
+        @param false_positive_rate: expected false positive rate once 'capacity' words are in
+        """
+        capacity = max(capacity, 1)
+        self.capacity = capacity
+        self.false_positive_rate = false_positive_rate
+        # Optimal sizes: -n ln p / (ln 2)^2 counters and (size / n) ln 2 hashes.
+        self.size = max(8, math.ceil(-capacity * math.log(false_positive_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.counters = bytearray(self.size)
+        self.count = 0          # words added and not removed
+
+    def positions(self, word: str) -> [int]:
+        """
+        @return: counter indices of a word
+        """
+        h = hash(word)
+        h1 = h & 0xFFFFFFFF
+        # Forced odd, so the step between positions is never 0.
+        h2 = ((h >> 32) & 0xFFFFFFFF) | 1
+        size = self.size
+        return [(h1 + i * h2) % size for i in range(self.hash_count)]
+
+    def add(self, word: str) -> None:
+        counters = self.counters
+        for position in self.positions(word):
+            if counters[position] < MAX_COUNT:
+                counters[position] += 1
+        self.count += 1
+
+    def remove(self, word: str) -> None:
+        """
+        remove a word added earlier
+        """
+        counters = self.counters
+        for position in self.positions(word):
+            if 0 < counters[position] < MAX_COUNT:
+                counters[position] -= 1
+        self.count -= 1
+
+    def might_contain(self, word: str) -> bool:
+        """
+        @return: False if the word is definitely not in the filter, True if it may be
+        """
+        h = hash(word)
+        h1 = h & 0xFFFFFFFF
+        h2 = ((h >> 32) & 0xFFFFFFFF) | 1
+        size = self.size
+        counters = self.counters
+        # Inlined positions(), stopping at the first empty counter.
+        for i in range(self.hash_count):
+            if not counters[(h1 + i * h2) % size]:
+                return False
+        return True
+
+    def expected_false_positive_rate(self) -> float:
+        """
+        @return: false positive rate expected with the words currently in the filter
+        """
+        return (1 - math.exp(-self.hash_count * self.count / self.size)) ** self.hash_count
@@ -0,0 +1,175 @@
+from collections import OrderedDict
+
+from dictionary.extended_dictionary import ExtendedDictionary
+from dictionary.word_frequency import WordFrequency
+
+
+# ------------------------------------------------------------------------
+# Wrapper memoizing the autocomplete results of any dictionary in a bounded LRU cache.
+# A write can only change the completions of the prefixes of the written word, so a successful add,
+# delete or frequency update drops exactly those entries, the empty prefix included, and the rest of the cache stays valid.
+# ------------------------------------------------------------------------
+
+class CachedDictionary(ExtendedDictionary):
+    __slots__ = 'dictionary', 'capacity', 'cache', 'hits', 'misses', 'evictions', 'invalidations'
+
+    def __init__(self, dictionary: ExtendedDictionary, capacity: int = 1024):
+        self.dictionary = dictionary    # wrapped dictionary answering everything that is not cached
+        self.capacity = capacity        # maximum number of cached prefixes
+        self.cache = OrderedDict()      # prefix -> completions, least recently used first
+        self.hits = 0                   # autocomplete calls answered from the cache
+        self.misses = 0                 # autocomplete calls passed to the wrapped dictionary
+        self.evictions = 0              # entries dropped to make room
+        self.invalidations = 0          # entries dropped because a write changed them
+
+    def build_dictionary(self, words_frequencies: [WordFrequency]):
+        """
+        construct the data structure to store nodes
+        @param words_frequencies: list of (word, frequency) to be stored
+        """
+        self.dictionary.build_dictionary(words_frequencies)
+        self.invalidations += len(self.cache)
+        self.cache.clear()
+
+    def search(self, word: str) -> int:
+        """
+        search for a word
+        @param word: the word to be searched
+        @return: frequency > 0 if found and 0 if NOT found
+        """
+        return self.dictionary.search(word)
+
+    def search_many(self, words: [str]) -> [int]:
+        """
+        search for a batch of words
+        @param words: the words to be searched
+        @return: for each word, frequency > 0 if found and 0 if NOT found
+        """
+        return self.dictionary.search_many(words)
+
+    def search_batch(self, words: [str]):
+        """
+        search for a batch of words with NumPy
+        @param words: sequence of words to be searched
+        @return: numpy.ndarray of int64, for each word frequency > 0 if found and 0 if NOT found
+        """
+        return self.dictionary.search_batch(words)
+
+    def add_word_frequency(self, word_frequency: WordFrequency) -> bool:
+        """
+        add a word and its frequency to the dictionary
+        @param word_frequency: (word, frequency) to be added
+        :return: True whether succeeded, False when word is already in the dictionary
+        """
+        if self.dictionary.add_word_frequency(word_frequency):
+            self.invalidate(word_frequency.word)
+            return True
+        return False
+
+    def delete_word(self, word: str) -> bool:
+        """
+        delete a word from the dictionary
+        @param word: word to be deleted
+        @return: whether succeeded, e.g. return False when point not found
+        """
+        if self.dictionary.delete_word(word):
+            self.invalidate(word)
+            return True
+        return False
+
+    def increment(self, word: str, delta: int = 1) -> int:
+        """
+        add delta to the frequency of a word, adding the word with frequency delta if it is not in the dictionary
+        @param word: the word to be updated
+        @param delta: change of the frequency, a word whose frequency drops to 0 or below is deleted
+        @return: the new frequency, 0 if the word is not (or no longer) in the dictionary
+        """
+        frequency = self.dictionary.increment(word, delta)
+        self.invalidate(word)
+        return frequency
+
+    def upsert(self, word_frequency: WordFrequency) -> bool:
+        """
+        set the frequency of a word, adding the word if it is not in the dictionary
+        @param word_frequency: (word, frequency) to be stored
+        @return: True if the word was added, False if its frequency was updated (or the word is empty)
+        """
+        added = self.dictionary.upsert(word_frequency)
+        self.invalidate(word_frequency.word)
+        return added
+
+    def invalidate(self, word: str) -> None:
+        """
+        drop the cached completions of every prefix of a word that has been added or deleted
+        @param word: the changed word
+        """
+        for length in range(len(word) + 1):
+            if self.cache.pop(word[:length], None) is not None:
+                self.invalidations += 1
+
+    def autocomplete(self, prefix_word: str) -> [WordFrequency]:
+        """
+        return a list of 3 most-frequent words in the dictionary that have 'prefix_word' as a prefix
+        @param prefix_word: word to be autocompleted
+        @return: a list (could be empty) of (at most) 3 most-frequent words with prefix 'prefix_word'
+        """
+        completions = self.cache.get(prefix_word)
+        if completions is not None:
+            self.hits += 1
+            self.cache.move_to_end(prefix_word)
+        else:
+            self.misses += 1
+            completions = self.dictionary.autocomplete(prefix_word)
+            self.store(prefix_word, completions)
+        # A copy, so that callers cannot alter the cached list.
+        return list(completions)
+
+    def autocomplete_many(self, prefix_words: [str]) -> [[WordFrequency]]:
+        """
+        autocomplete a batch of prefixes, the uncached ones in a single call to the wrapped dictionary
+        @param prefix_words: words to be autocompleted
+        @return: for each prefix, the list autocomplete would return
+        """
+        found = dict()
+        missing = list()
+        for prefix_word in dict.fromkeys(prefix_words):
+            completions = self.cache.get(prefix_word)
+            if completions is None:
+                missing.append(prefix_word)
+            else:
+                self.cache.move_to_end(prefix_word)
+                found[prefix_word] = completions
+        if missing:
+            for prefix_word, completions in zip(missing, self.dictionary.autocomplete_many(missing)):
+                self.store(prefix_word, completions)
+                found[prefix_word] = completions
+        # Counted per call, as if each prefix had been autocompleted on its own.
+        self.misses += len(missing)
+        self.hits += len(prefix_words) - len(missing)
+        return [list(found[prefix_word]) for prefix_word in prefix_words]
+
+    def store(self, prefix_word: str, completions: [WordFrequency]) -> None:
+        """
+        cache the completions of a prefix, evicting the least recently used entries beyond the capacity
+        """
+        if self.capacity <= 0:
+            return
+        self.cache[prefix_word] = completions
+        while len(self.cache) > self.capacity:
+            self.cache.popitem(last=False)
+            self.evictions += 1
+
+    def items(self):
+        """
+        @return: iterator over the (word, frequency) pairs stored by the wrapped dictionary
+        """
+        return self.dictionary.items()
+
+    def cache_statistics(self) -> dict:
+        """
+        @return: counters of the cache and its current size
+        """
+        lookups = self.hits + self.misses
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                'invalidations': self.invalidations, 'size': len(self.cache),
+                'hit_rate': self.hits / lookups if lookups else 0.0}
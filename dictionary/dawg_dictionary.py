@@ -0,0 +1,395 @@
+from array import array
+import bisect
+import heapq
+
+from dictionary.extended_dictionary import ExtendedDictionary
+from dictionary.word_frequency import WordFrequency
+from dictionary.instrumentation import instrumented
+
+
+# ------------------------------------------------------------------------
+# Dictionary stored as a minimal acyclic automaton (DAWG): words sharing a suffix share its states, so the
+# structure grows with the distinct prefixes and suffixes rather than with the total number of letters.
+# The automaton is built incrementally from sorted words, registering each state once its last word is seen.
+# State s owns the edges first_edges[s] to first_edges[s + 1], sorted by letter, and counts[s] words below it.
+# Words are numbered by lexicographic rank (perfect hashing): walking a word adds up the offsets of the edges
+# taken, so frequencies live in an array indexed by rank and the words of a prefix form a contiguous range.
+# Writes are kept aside and the automaton is rebuilt lazily, before the next query that needs it.
+# ------------------------------------------------------------------------
+
+# Ranks are grouped in blocks; the best of each block is indexed by a sparse table, the ends are scanned.
+BLOCK_SIZE = 16
+
+
+class DawgDictionary(ExtendedDictionary):
+    __slots__ = ('root_', 'first_edges', 'finals', 'counts', 'edge_letters', 'edge_targets', 'edge_offsets',
+                 'frequencies', 'keys', 'block_table', 'added', 'deleted')
+
+    def __init__(self):
+        self.root_ = -1                     # index of the start state, -1 when the automaton is empty
+        self.first_edges = array('i')       # index of the first edge of each state, plus one past the last edge
+        self.finals = array('b')            # 1 if a word ends at each state
+        self.counts = array('i')            # number of words accepted from each state
+        self.edge_letters = array('I')      # code point of the letter of each edge
+        self.edge_targets = array('i')      # state each edge leads to
+        self.edge_offsets = array('i')      # ranks skipped by taking each edge instead of stopping at its state
+        self.frequencies = array('q')       # frequency of the word of each rank
+        self.keys = array('q')              # ranking key of each rank: frequency, then lexicographic order (a list if too large)
+        self.block_table = []               # block_table[j][b] is the best rank of blocks b to b + 2 ** j - 1
+        self.added = {}                     # words added since the last build -> frequency
+        self.deleted = set()                # words deleted since the last build
+
+    # ------------------------------------------------------------------------
+    # Construction
+    # ------------------------------------------------------------------------
+
+    @instrumented()
+    def build_dictionary(self, words_frequencies: [WordFrequency]):
+        """
+        construct the data structure to store nodes
+        @param words_frequencies: list of (word, frequency) to be stored
+        """
+        # The words already stored win over new occurrences, as they would with add_word_frequency.
+        frequencies = dict(self.items())
+        for word_frequency in words_frequencies:
+            if word_frequency.word != '':
+                frequencies.setdefault(word_frequency.word, word_frequency.frequency)
+        self.build_sorted(sorted(frequencies.items()))
+
+    def build_sorted(self, words_frequencies: [(str, int)]) -> None:
+        """
+        build the minimal automaton of lexicographically sorted unique words
+        @param words_frequencies: sorted (word, frequency) tuples
+        """
+        self.__init__()
+        # Path of the states of the last word that are not registered yet, as [letter, final, edges] where
+        # edges holds the (letter, state) of the registered children.
+        path = [['', 0, []]]
+        register = dict()
+        previous = ''
+        for word, _ in words_frequencies:
+            common = 0
+            while common < len(previous) and common < len(word) and previous[common] == word[common]:
+                common += 1
+            # The states below the common prefix can no longer change.
+            self.register_path(path, register, common)
+            for letter in word[common:]:
+                path.append([letter, 0, []])
+            path[-1][1] = 1
+            previous = word
+        self.register_path(path, register, 0)
+        if words_frequencies:
+            self.root_ = self.register_state(path[0], register)
+        self.first_edges.append(len(self.edge_letters))
+
+        size = len(words_frequencies)
+        self.frequencies = array('q', [frequency for _, frequency in words_frequencies])
+        # Equal frequencies rank in lexicographic order, like the TST's top-k mode.
+        keys = [frequency * (size + 1) + size - rank for rank, (_, frequency) in enumerate(words_frequencies)]
+        # Large frequencies overflow a signed 64-bit key, those stay in a list of Python ints.
+        self.keys = array('q', keys) if not keys or max(keys) < 2 ** 63 else keys
+        self.build_block_table()
+
+    def register_path(self, path: list, register: dict, depth: int) -> None:
+        """
+        register the states of the path deeper than 'depth', replacing each by an equivalent one if any
+        """
+        while len(path) - 1 > depth:
+            state = path.pop()
+            path[-1][2].append((state[0], self.register_state(state, register)))
+
+    def register_state(self, state: list, register: dict) -> int:
+        """
+        @param state: [letter, final, edges] whose children are all registered
+        @return: index of the equivalent registered state, created if there is none yet
+        """
+        signature = (state[1], tuple(state[2]))
+        index = register.get(signature)
+        if index is not None:
+            return index
+        index = len(self.finals)
+        register[signature] = index
+        self.first_edges.append(len(self.edge_letters))
+        self.finals.append(state[1])
+        # A word ending here ranks before the words below, and each edge skips the words of earlier edges.
+        offset = state[1]
+        for letter, target in state[2]:
+            self.edge_letters.append(ord(letter))
+            self.edge_targets.append(target)
+            self.edge_offsets.append(offset)
+            offset += self.counts[target]
+        self.counts.append(offset)
+        return index
+
+    def build_block_table(self) -> None:
+        keys = self.keys
+        level = [max(range(start, min(start + BLOCK_SIZE, len(keys))), key=keys.__getitem__)
+                 for start in range(0, len(keys), BLOCK_SIZE)]
+        self.block_table = [array('i', level)]
+        span = 1
+        while 2 * span <= len(level):
+            level = [a if keys[a] > keys[b] else b for a, b in zip(level, level[span:])]
+            self.block_table.append(array('i', level))
+            span *= 2
+
+    def flush(self) -> None:
+        """
+        rebuild the automaton with the writes kept aside
+        """
+        if not self.added and not self.deleted:
+            return
+        frequencies = {word: frequency for word, frequency in self.stored_items() if word not in self.deleted}
+        frequencies.update(self.added)
+        self.build_sorted(sorted(frequencies.items()))
+
+    # ------------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------------
+
+    def walk(self, word: str) -> (int, int):
+        """
+        follow a word (or prefix) from the start state
+        @return: (state reached, rank of the first word below it), state -1 if the automaton has no such path
+        """
+        if self.root_ < 0:
+            return -1, 0
+        first_edges, edge_letters = self.first_edges, self.edge_letters
+        state = self.root_
+        rank = 0
+        for letter in word:
+            code = ord(letter)
+            end = first_edges[state + 1]
+            edge = bisect.bisect_left(edge_letters, code, first_edges[state], end)
+            if edge == end or edge_letters[edge] != code:
+                return -1, 0
+            rank += self.edge_offsets[edge]
+            state = self.edge_targets[edge]
+        return state, rank
+
+    def stored_frequency(self, word: str) -> int:
+        """
+        @return: frequency of a word in the automaton, ignoring the writes kept aside; 0 if NOT found
+        """
+        state, rank = self.walk(word)
+        if state >= 0 and self.finals[state]:
+            return self.frequencies[rank]
+        return 0
+
+    @instrumented('edges followed', lambda self, word: self.edges_followed(word))
+    def search(self, word: str) -> int:
+        """
+        search for a word
+        @param word: the word to be searched
+        @return: frequency > 0 if found and 0 if NOT found
+        """
+        if word in self.added:
+            return self.added[word]
+        if word in self.deleted:
+            return 0
+        return self.stored_frequency(word)
+
+    @instrumented('edges followed', lambda self, word_frequency: self.edges_followed(word_frequency.word))
+    def add_word_frequency(self, word_frequency: WordFrequency) -> bool:
+        """
+        add a word and its frequency to the dictionary
+        @param word_frequency: (word, frequency) to be added
+        :return: True whether succeeded, False when word is already in the dictionary
+        """
+        if word_frequency.word == '' or self.search(word_frequency.word) > 0:
+            return False
+        self.added[word_frequency.word] = word_frequency.frequency
+        return True
+
+    @instrumented('edges followed', lambda self, word, delta=1: self.edges_followed(word))
+    def increment(self, word: str, delta: int = 1) -> int:
+        """
+        add delta to the frequency of a word, adding the word with frequency delta if it is not in the dictionary
+        @param word: the word to be updated
+        @param delta: change of the frequency, a word whose frequency drops to 0 or below is deleted
+        @return: the new frequency, 0 if the word is not (or no longer) in the dictionary
+        """
+        if word == '':
+            return 0
+        if word in self.added:
+            frequency = self.added[word] + delta
+        elif word in self.deleted:
+            frequency = delta
+        else:
+            stored = self.stored_frequency(word)
+            frequency = stored + delta
+            # The stored frequency is hidden, the new one is kept aside like an added word.
+            if stored:
+                self.deleted.add(word)
+        if frequency <= 0:
+            self.added.pop(word, None)
+            return 0
+        self.added[word] = frequency
+        return frequency
+
+    @instrumented('edges followed', lambda self, word_frequency: self.edges_followed(word_frequency.word))
+    def upsert(self, word_frequency: WordFrequency) -> bool:
+        """
+        set the frequency of a word, adding the word if it is not in the dictionary
+        @param word_frequency: (word, frequency) to be stored
+        @return: True if the word was added, False if its frequency was updated (or the word is empty)
+        """
+        word = word_frequency.word
+        if word == '':
+            return False
+        if word in self.added:
+            found = True
+        elif word in self.deleted:
+            found = False
+        else:
+            found = self.stored_frequency(word) > 0
+            if found:
+                self.deleted.add(word)
+        self.added[word] = word_frequency.frequency
+        return not found
+
+    @instrumented('edges followed', lambda self, word: self.edges_followed(word))
+    def delete_word(self, word: str) -> bool:
+        """
+        delete a word from the dictionary
+        @param word: word to be deleted
+        @return: whether succeeded, e.g. return False when point not found
+        """
+        if word in self.added:
+            del self.added[word]
+            # A word deleted and added again is also in 'deleted', so the stored one stays hidden.
+            return True
+        if word in self.deleted or self.stored_frequency(word) == 0:
+            return False
+        self.deleted.add(word)
+        return True
+
+    @instrumented('edges followed', lambda self, word: self.edges_followed(word))
+    def autocomplete(self, word: str) -> [WordFrequency]:
+        """
+        return a list of 3 most-frequent words in the dictionary that have 'word' as a prefix
+        @param word: word to be autocompleted
+        @return: a list (could be empty) of (at most) 3 most-frequent words with prefix 'word'
+        """
+        if word == '':
+            return []
+        self.flush()
+        state, rank = self.walk(word)
+        if state < 0:
+            return []
+        return [WordFrequency(self.word_at(state, word, best - rank), self.frequencies[best])
+                for best in self.top_in_range(rank, rank + self.counts[state], 3)]
+
+    def word_at(self, state: int, prefix: str, rank: int) -> str:
+        """
+        @param state: state reached by 'prefix'
+        @param prefix: word spelled from the start state to 'state'
+        @param rank: rank of the word among the words below 'state'
+        @return: the word of that rank
+        """
+        first_edges, edge_offsets = self.first_edges, self.edge_offsets
+        letters = [prefix]
+        while rank or not self.finals[state]:
+            # The edge to take is the last one whose offset does not exceed the rank.
+            edge = bisect.bisect_right(edge_offsets, rank, first_edges[state], first_edges[state + 1]) - 1
+            letters.append(chr(self.edge_letters[edge]))
+            rank -= edge_offsets[edge]
+            state = self.edge_targets[edge]
+        return ''.join(letters)
+
+    def range_max(self, start: int, end: int) -> int:
+        """
+        @return: best ranked word in the non-empty range [start, end)
+        """
+        keys = self.keys
+        first_block = -(-start // BLOCK_SIZE)
+        last_block = end // BLOCK_SIZE
+        if first_block >= last_block:
+            return max(range(start, end), key=keys.__getitem__)
+        # Whole blocks come from the sparse table, the partial blocks at both ends are scanned.
+        level = (last_block - first_block).bit_length() - 1
+        candidates = [self.block_table[level][first_block], self.block_table[level][last_block - (1 << level)]]
+        if start < first_block * BLOCK_SIZE:
+            candidates.append(max(range(start, first_block * BLOCK_SIZE), key=keys.__getitem__))
+        if last_block * BLOCK_SIZE < end:
+            candidates.append(max(range(last_block * BLOCK_SIZE, end), key=keys.__getitem__))
+        return max(candidates, key=keys.__getitem__)
+
+    def top_in_range(self, start: int, end: int, k: int) -> [int]:
+        """
+        @return: the (at most) k best ranked words in [start, end), best first
+        """
+        result = list()
+        heap = list()
+        if start < end:
+            best = self.range_max(start, end)
+            heap.append((-self.keys[best], best, start, end))
+        while heap and len(result) < k:
+            _, best, start, end = heapq.heappop(heap)
+            result.append(best)
+            # Split the range around the word just taken.
+            for sub_start, sub_end in ((start, best), (best + 1, end)):
+                if sub_start < sub_end:
+                    sub_best = self.range_max(sub_start, sub_end)
+                    heapq.heappush(heap, (-self.keys[sub_best], sub_best, sub_start, sub_end))
+        return result
+
+    # ------------------------------------------------------------------------
+    # Enumeration and statistics
+    # ------------------------------------------------------------------------
+
+    def stored_items(self):
+        """
+        @return: iterator over the (word, frequency) pairs of the automaton in lexicographic order,
+                 ignoring the writes kept aside
+        """
+        if self.root_ < 0:
+            return
+        first_edges, edge_letters, edge_targets = self.first_edges, self.edge_letters, self.edge_targets
+        rank = 0
+        # Depth-first, edges in letter order, a word being emitted when its final state is entered.
+        stack = [(self.root_, '')]
+        while stack:
+            state, word = stack.pop()
+            if self.finals[state]:
+                yield word, self.frequencies[rank]
+                rank += 1
+            for edge in range(first_edges[state + 1] - 1, first_edges[state] - 1, -1):
+                stack.append((edge_targets[edge], word + chr(edge_letters[edge])))
+
+    def items(self):
+        """
+        @return: iterator over the (word, frequency) pairs stored, in lexicographic order
+        """
+        self.flush()
+        return self.stored_items()
+
+    def state_count(self) -> int:
+        """
+        @return: number of states of the automaton
+        """
+        return len(self.finals)
+
+    def edge_count(self) -> int:
+        """
+        @return: number of edges of the automaton
+        """
+        return len(self.edge_letters)
+
+    def edges_followed(self, word: str) -> int:
+        """
+        @return: number of edges a walk down a word follows, the instrumentation probe of the automaton operations
+        """
+        if self.root_ < 0:
+            return 0
+        first_edges, edge_letters = self.first_edges, self.edge_letters
+        state = self.root_
+        followed = 0
+        for letter in word:
+            code = ord(letter)
+            end = first_edges[state + 1]
+            edge = bisect.bisect_left(edge_letters, code, first_edges[state], end)
+            if edge == end or edge_letters[edge] != code:
+                break
+            followed += 1
+            state = self.edge_targets[edge]
+        return followed
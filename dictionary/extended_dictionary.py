@@ -0,0 +1,66 @@
+from dictionary.base_dictionary import BaseDictionary
+from dictionary.word_frequency import WordFrequency
+
+
+# -------------------------------------------------
+# Operations every dictionary of this package offers beyond the assignment's BaseDictionary, which is left
+# as it was given: frequency updates (increment, upsert) and batch queries (search_many, search_batch,
+# autocomplete_many). The fallbacks below are written in terms of the BaseDictionary methods; backends
+# override them where they can do better.
+# -------------------------------------------------
+
+class ExtendedDictionary(BaseDictionary):
+    def increment(self, word: str, delta: int = 1) -> int:
+        """
+        add delta to the frequency of a word, adding the word with frequency delta if it is not in the dictionary
+        @param word: the word to be updated
+        @param delta: change of the frequency, a word whose frequency drops to 0 or below is deleted
+        @return: the new frequency, 0 if the word is not (or no longer) in the dictionary
+        """
+        if word == '':
+            return 0
+        frequency = self.search(word) + delta
+        if frequency <= 0:
+            self.delete_word(word)
+            return 0
+        self.upsert(WordFrequency(word, frequency))
+        return frequency
+
+    def upsert(self, word_frequency: WordFrequency) -> bool:
+        """
+        set the frequency of a word, adding the word if it is not in the dictionary
+        @param word_frequency: (word, frequency) to be stored
+        @return: True if the word was added, False if its frequency was updated (or the word is empty)
+        """
+        if word_frequency.word == '':
+            return False
+        found = self.delete_word(word_frequency.word)
+        self.add_word_frequency(word_frequency)
+        return not found
+
+    def search_many(self, words: [str]) -> [int]:
+        """
+        search for a batch of words, each distinct word is searched once
+        @param words: the words to be searched
+        @return: for each word, frequency > 0 if found and 0 if NOT found
+        """
+        found = {word: self.search(word) for word in set(words)}
+        return [found[word] for word in words]
+
+    def search_batch(self, words: [str]):
+        """
+        search for a batch of words with NumPy
+        @param words: sequence of words to be searched
+        @return: numpy.ndarray of int64, for each word frequency > 0 if found and 0 if NOT found
+        """
+        import numpy
+        return numpy.array(self.search_many(words), dtype=numpy.int64)
+
+    def autocomplete_many(self, prefix_words: [str]) -> [[WordFrequency]]:
+        """
+        autocomplete a batch of prefixes, each distinct prefix is autocompleted once
+        @param prefix_words: words to be autocompleted
+        @return: for each prefix, the list autocomplete would return
+        """
+        completions = {prefix_word: self.autocomplete(prefix_word) for prefix_word in set(prefix_words)}
+        return [completions[prefix_word] for prefix_word in prefix_words]
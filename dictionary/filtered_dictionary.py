@@ -0,0 +1,183 @@
+from dictionary.extended_dictionary import ExtendedDictionary
+from dictionary.word_frequency import WordFrequency
+from dictionary.bloom_filter import CountingBloomFilter
+
+
+# ------------------------------------------------------------------------
+# Wrapper answering searches for missing words from a counting Bloom filter of the words stored, without
+# reaching the wrapped dictionary. Found words and false positives still search the dictionary, so the
+# answers are unchanged; only definite misses are cut short.
+# Every successful add and delete updates the filter. The filter is rebuilt from the dictionary's words
+# once the number of words leaves [capacity / 4, capacity], so the false positive rate stays near its target
+# as words come and go, and saturated counters are cleared.
+# ------------------------------------------------------------------------
+
+# Smallest capacity a filter is built with.
+MIN_CAPACITY = 1024
+
+
+class FilteredDictionary(ExtendedDictionary):
+    __slots__ = 'dictionary', 'false_positive_rate', 'filter', 'lookups', 'rejections', 'false_positives', \
+        'rebuilds'
+
+    def __init__(self, dictionary: ExtendedDictionary, false_positive_rate: float = 0.01):
+        """
+        @param dictionary: dictionary answering the searches the filter lets through, built or empty
+        @param false_positive_rate: target false positive rate of the filter
+        """
+        self.dictionary = dictionary            # wrapped dictionary
+        self.false_positive_rate = false_positive_rate
+        self.filter = None                      # CountingBloomFilter of the stored words
+        self.lookups = 0                        # searched words checked against the filter
+        self.rejections = 0                     # searched words the filter proved missing
+        self.false_positives = 0                # searched words let through by the filter but not found
+        self.rebuilds = 0                       # times the filter has been built
+        self.rebuild()
+
+    def rebuild(self) -> None:
+        """
+        build the filter from the words of the dictionary, sized for twice their number
+        """
+        words = set(word for word, _ in self.dictionary.items())
+        self.filter = CountingBloomFilter(max(MIN_CAPACITY, 2 * len(words)), self.false_positive_rate)
+        for word in words:
+            self.filter.add(word)
+        self.rebuilds += 1
+
+    def check_load(self) -> None:
+        """
+        rebuild the filter once the number of words has drifted out of its range
+        """
+        count, capacity = self.filter.count, self.filter.capacity
+        if count > capacity or (count < capacity // 4 and capacity > MIN_CAPACITY):
+            self.rebuild()
+
+    def build_dictionary(self, words_frequencies: [WordFrequency]):
+        """
+        construct the data structure to store nodes
+        @param words_frequencies: list of (word, frequency) to be stored
+        """
+        self.dictionary.build_dictionary(words_frequencies)
+        self.rebuild()
+
+    def search(self, word: str) -> int:
+        """
+        search for a word
+        @param word: the word to be searched
+        @return: frequency > 0 if found and 0 if NOT found
+        """
+        self.lookups += 1
+        if not self.filter.might_contain(word):
+            self.rejections += 1
+            return 0
+        frequency = self.dictionary.search(word)
+        if frequency == 0:
+            self.false_positives += 1
+        return frequency
+
+    def search_many(self, words: [str]) -> [int]:
+        """
+        search for a batch of words, the ones the filter lets through in a single call to the dictionary
+        @param words: the words to be searched
+        @return: for each word, frequency > 0 if found and 0 if NOT found
+        """
+        might_contain = self.filter.might_contain
+        passed = [word for word in dict.fromkeys(words) if might_contain(word)]
+        found = dict(zip(passed, self.dictionary.search_many(passed))) if passed else {}
+        # Counted per word, as if each had been searched on its own.
+        self.lookups += len(words)
+        self.rejections += sum(1 for word in words if word not in found)
+        self.false_positives += sum(1 for word in words if found.get(word) == 0)
+        return [found.get(word, 0) for word in words]
+
+    def add_word_frequency(self, word_frequency: WordFrequency) -> bool:
+        """
+        add a word and its frequency to the dictionary
+        @param word_frequency: (word, frequency) to be added
+        :return: True whether succeeded, False when word is already in the dictionary
+        """
+        if self.dictionary.add_word_frequency(word_frequency):
+            self.filter.add(word_frequency.word)
+            self.check_load()
+            return True
+        return False
+
+    def delete_word(self, word: str) -> bool:
+        """
+        delete a word from the dictionary
+        @param word: word to be deleted
+        @return: whether succeeded, e.g. return False when point not found
+        """
+        if self.dictionary.delete_word(word):
+            self.updated(word, True, False)
+            return True
+        return False
+
+    def increment(self, word: str, delta: int = 1) -> int:
+        """
+        add delta to the frequency of a word, adding the word with frequency delta if it is not in the dictionary
+        @param word: the word to be updated
+        @param delta: change of the frequency, a word whose frequency drops to 0 or below is deleted
+        @return: the new frequency, 0 if the word is not (or no longer) in the dictionary
+        """
+        # The filter only changes when the word comes in or goes out.
+        found = self.filter.might_contain(word) and self.dictionary.search(word) > 0
+        frequency = self.dictionary.increment(word, delta)
+        self.updated(word, found, frequency > 0)
+        return frequency
+
+    def upsert(self, word_frequency: WordFrequency) -> bool:
+        """
+        set the frequency of a word, adding the word if it is not in the dictionary
+        @param word_frequency: (word, frequency) to be stored
+        @return: True if the word was added, False if its frequency was updated (or the word is empty)
+        """
+        added = self.dictionary.upsert(word_frequency)
+        if added:
+            self.updated(word_frequency.word, False, True)
+        return added
+
+    def updated(self, word: str, found_before: bool, found_after: bool) -> None:
+        """
+        keep the filter in step with a write that may have added or removed a word
+        """
+        if found_after and not found_before:
+            self.filter.add(word)
+            self.check_load()
+        # A list built with a duplicate word still finds its next occurrence once the first one is gone.
+        elif found_before and not found_after and self.dictionary.search(word) == 0:
+            self.filter.remove(word)
+            self.check_load()
+
+    def autocomplete(self, prefix_word: str) -> [WordFrequency]:
+        """
+        return a list of 3 most-frequent words in the dictionary that have 'prefix_word' as a prefix
+        @param prefix_word: word to be autocompleted
+        @return: a list (could be empty) of (at most) 3 most-frequent words with prefix 'prefix_word'
+        """
+        return self.dictionary.autocomplete(prefix_word)
+
+    def autocomplete_many(self, prefix_words: [str]) -> [[WordFrequency]]:
+        """
+        autocomplete a batch of prefixes
+        @param prefix_words: words to be autocompleted
+        @return: for each prefix, the list autocomplete would return
+        """
+        return self.dictionary.autocomplete_many(prefix_words)
+
+    def items(self):
+        """
+        @return: iterator over the (word, frequency) pairs stored by the wrapped dictionary
+        """
+        return self.dictionary.items()
+
+    def filter_statistics(self) -> dict:
+        """
+        @return: counters of the filter, with its measured and expected false positive rates
+        """
+        negatives = self.rejections + self.false_positives
+        return {'lookups': self.lookups, 'rejections': self.rejections, 'false_positives': self.false_positives,
+                'false_positive_rate': self.false_positives / negatives if negatives else 0.0,
+                'expected_false_positive_rate': self.filter.expected_false_positive_rate(),
+                'words': self.filter.count, 'capacity': self.filter.capacity, 'counters': self.filter.size,
+                'hash_count': self.filter.hash_count, 'rebuilds': self.rebuilds}
@@ -1,7 +1,8 @@
-import time
-from termcolor import colored as c, cprint
 from dictionary.word_frequency import WordFrequency
-from dictionary.base_dictionary import BaseDictionary
+from dictionary.extended_dictionary import ExtendedDictionary
+from dictionary.prefix_index import PrefixIndex, scan_autocomplete_many
+from dictionary.instrumentation import instrumented
+from dictionary.vocabulary_index import VocabularyIndex
 
 
 # ------------------------------------------------------------------------
@@ -11,24 +12,19 @@ from dictionary.base_dictionary import BaseDictionary
 # __copyright__ = 'Copyright 2022, RMIT University'
 # ------------------------------------------------------------------------
 
-def log_computation_time(func):
-    def wrapper(*args, **kwargs):
-        start = time.perf_counter()
-        result = func(*args, **kwargs)
-        end = time.perf_counter()
-        cprint(f"{c(' HASH ', 'cyan', attrs=['bold', 'reverse'])} {c('Computation time', 'magenta')} of"
-               f" '{c(func.__name__, 'yellow')}': {c(str(end - start), 'green')}", attrs=['bold'])
-        return result
-    return wrapper
+class HashTableDictionary(ExtendedDictionary):
+    __slots__ = 'dictionary', 'prefix_index', 'compact', 'vocabulary'
 
-
-class HashTableDictionary(BaseDictionary):
-    __slots__ = 'dictionary'
-
-    def __init__(self):
+    def __init__(self, prefix_index: bool = False, compact: bool = False):
         self.dictionary = {}
+        # Optional sorted-array index serving autocomplete, kept up to date by every write.
+        self.prefix_index = PrefixIndex() if prefix_index else None
+        # When True the table maps words to plain int frequencies instead of WordFrequency objects.
+        self.compact = compact
+        # Word ids and frequencies answering search_batch, None until the first batch.
+        self.vocabulary = None
 
-    # @log_computation_time
+    @instrumented()
     def build_dictionary(self, words_frequencies: [WordFrequency]):
         """
         construct the data structure to store nodes
@@ -37,7 +33,7 @@ class HashTableDictionary(BaseDictionary):
         for word_frequency in words_frequencies:
             self.add_word_frequency(word_frequency)
 
-    # @log_computation_time
+    @instrumented()
     def search(self, word: str) -> int:
         """
         search for a word
@@ -45,9 +41,10 @@ class HashTableDictionary(BaseDictionary):
         @return: frequency > 0 if found and 0 if NOT found
         """
         if word in self.dictionary:
-            return self.dictionary[word].frequency
+            return self.dictionary[word] if self.compact else self.dictionary[word].frequency
         return 0
 
+    @instrumented()
     def add_word_frequency(self, word_frequency: WordFrequency) -> bool:
         """
         add a word and its frequency to the dictionary
@@ -55,11 +52,67 @@ class HashTableDictionary(BaseDictionary):
         :return: True whether succeeded, False when word is already in the dictionary
         """
         if word_frequency.word not in self.dictionary:
-            self.dictionary[word_frequency.word] = word_frequency
+            self.dictionary[word_frequency.word] = word_frequency.frequency if self.compact else word_frequency
+            if self.prefix_index is not None:
+                self.prefix_index.add(word_frequency.word, word_frequency.frequency)
+            if self.vocabulary is not None:
+                self.vocabulary.set(word_frequency.word, word_frequency.frequency)
             return True
         return False
 
-    # @log_computation_time
+    @instrumented()
+    def increment(self, word: str, delta: int = 1) -> int:
+        """
+        add delta to the frequency of a word, adding the word with frequency delta if it is not in the dictionary
+        @param word: the word to be updated
+        @param delta: change of the frequency, a word whose frequency drops to 0 or below is deleted
+        @return: the new frequency, 0 if the word is not (or no longer) in the dictionary
+        """
+        if word == '':
+            return 0
+        entry = self.dictionary.get(word)
+        if entry is None:
+            if delta <= 0:
+                return 0
+            self.dictionary[word] = delta if self.compact else WordFrequency(word, delta)
+            if self.prefix_index is not None:
+                self.prefix_index.add(word, delta)
+            if self.vocabulary is not None:
+                self.vocabulary.set(word, delta)
+            return delta
+        frequency = (entry if self.compact else entry.frequency) + delta
+        if frequency <= 0:
+            self.delete_word(word)
+            return 0
+        # Storing into an existing key keeps its place in the table, so ties keep ranking as before.
+        self.dictionary[word] = frequency if self.compact else WordFrequency(word, frequency)
+        if self.prefix_index is not None:
+            self.prefix_index.update(word, frequency)
+        if self.vocabulary is not None:
+            self.vocabulary.set(word, frequency)
+        return frequency
+
+    @instrumented()
+    def upsert(self, word_frequency: WordFrequency) -> bool:
+        """
+        set the frequency of a word, adding the word if it is not in the dictionary
+        @param word_frequency: (word, frequency) to be stored
+        @return: True if the word was added, False if its frequency was updated (or the word is empty)
+        """
+        if word_frequency.word == '':
+            return False
+        found = word_frequency.word in self.dictionary
+        self.dictionary[word_frequency.word] = word_frequency.frequency if self.compact else word_frequency
+        if self.prefix_index is not None:
+            if found:
+                self.prefix_index.update(word_frequency.word, word_frequency.frequency)
+            else:
+                self.prefix_index.add(word_frequency.word, word_frequency.frequency)
+        if self.vocabulary is not None:
+            self.vocabulary.set(word_frequency.word, word_frequency.frequency)
+        return not found
+
+    @instrumented()
     def delete_word(self, word: str) -> bool:
         """
         delete a word from the dictionary
@@ -68,16 +121,73 @@ class HashTableDictionary(BaseDictionary):
         """
         if word in self.dictionary:
             self.dictionary.pop(word)
+            if self.prefix_index is not None:
+                self.prefix_index.remove(word)
+            if self.vocabulary is not None:
+                self.vocabulary.remove(word)
             return True
         return False
 
-    # @log_computation_time
+    @instrumented('comparisons', lambda self, word: 0 if self.prefix_index is not None else len(self.dictionary))
     def autocomplete(self, word: str) -> [WordFrequency]:
         """
         return a list of 3 most-frequent words in the dictionary that have 'word' as a prefix
         @param word: word to be autocompleted
         @return: a list (could be empty) of (at most) 3 most-frequent words with prefix 'word'
         """
-        frequency_list = [self.dictionary[w] for w in self.dictionary if w.startswith(word)]
+        # Answer from the prefix index when enabled.
+        if self.prefix_index is not None:
+            if self.prefix_index.dirty:
+                self.prefix_index.build(self.items())
+            return self.prefix_index.autocomplete(word)
+        if self.compact:
+            frequency_list = [WordFrequency(w, f) for w, f in self.dictionary.items() if w.startswith(word)]
+        else:
+            frequency_list = [self.dictionary[w] for w in self.dictionary if w.startswith(word)]
         frequency_list.sort(key=lambda x: x.frequency, reverse=True)
         return frequency_list[:3]
+
+    @instrumented()
+    def search_many(self, words: [str]) -> [int]:
+        """
+        search for a batch of words
+        @param words: the words to be searched
+        @return: for each word, frequency > 0 if found and 0 if NOT found
+        """
+        get = self.dictionary.get
+        if self.compact:
+            return [get(word, 0) for word in words]
+        return [word_frequency.frequency if word_frequency is not None else 0 for word_frequency in map(get, words)]
+
+    @instrumented()
+    def search_batch(self, words: [str]):
+        """
+        search for a batch of words with NumPy
+        @param words: sequence of words to be searched
+        @return: numpy.ndarray of int64, for each word frequency > 0 if found and 0 if NOT found
+        """
+        # The vocabulary index is built by the first batch, then kept up to date by every write.
+        if self.vocabulary is None:
+            self.vocabulary = VocabularyIndex(self.items())
+        return self.vocabulary.search_batch(words)
+
+    @instrumented()
+    def autocomplete_many(self, prefix_words: [str]) -> [[WordFrequency]]:
+        """
+        autocomplete a batch of prefixes with a single scan of the table
+        @param prefix_words: words to be autocompleted
+        @return: for each prefix, the list autocomplete would return
+        """
+        distinct = set(prefix_words)
+        if self.prefix_index is not None or len(distinct) < 2:
+            return super().autocomplete_many(prefix_words)
+        completions = scan_autocomplete_many(self.items(), distinct)
+        return [completions[prefix_word] for prefix_word in prefix_words]
+
+    def items(self):
+        """
+        @return: iterator over the (word, frequency) pairs stored, in insertion order
+        """
+        if self.compact:
+            return iter(self.dictionary.items())
+        return ((w, wf.frequency) for w, wf in self.dictionary.items())
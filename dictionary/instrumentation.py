@@ -0,0 +1,158 @@
+import threading
+import time
+
+
+# ------------------------------------------------------------------------
+# Shared instrumentation of the dictionary operations.
+# Methods marked with @instrumented are registered when their class is created and left untouched, so
+# instrumentation costs nothing while it is off. enable() swaps in wrappers counting calls, adding each
+# latency to a power-of-two histogram and, for methods given a 'work' probe, the amount of work done
+# (nodes visited, comparisons). The probe re-walks the structure before the call and outside the timing,
+# which keeps the hot loops free of counters; a probe counting a whole prefix subtree costs as much as the
+# autocomplete enumerating it. disable() puts the original methods back.
+# Only the outermost instrumented call of a thread is recorded: the searches an add makes internally are
+# part of the add, not searches of their own.
+# Statistics are kept per process: forked workers do not report theirs.
+# ------------------------------------------------------------------------
+
+# Latencies of 2 ** (b - 1) to 2 ** b - 1 nanoseconds fall in bucket b.
+BUCKET_COUNT = 64
+
+REGISTRY = []           # (owner class, method name, original function, work name, work probe)
+STATISTICS = {}         # 'Class.method' -> OperationStatistics
+enabled = False
+calls_in_progress = threading.local()  # depth: instrumented calls running in the thread
+
+
+class OperationStatistics:
+    __slots__ = 'calls', 'total_ns', 'latencies', 'work_name', 'work'
+
+    def __init__(self, work_name: str = None):
+        self.calls = 0                          # number of calls
+        self.total_ns = 0                       # total time spent in the calls
+        self.latencies = [0] * BUCKET_COUNT     # histogram of the call latencies, see BUCKET_COUNT
+        self.work_name = work_name              # what the probe counts, None without probe
+        self.work = 0                           # total work counted by the probe
+
+    def latency_percentile(self, fraction: float) -> int:
+        """
+        @param fraction: between 0 and 1
+        @return: upper bound in nanoseconds of the histogram bucket holding the percentile
+        """
+        rank = fraction * self.calls
+        seen = 0
+        for bucket, count in enumerate(self.latencies):
+            seen += count
+            if count and seen >= rank:
+                return (1 << bucket) - 1
+        return 0
+
+
+class InstrumentedMethod:
+    __slots__ = 'function', 'work_name', 'work'
+
+    def __init__(self, function, work_name: str, work):
+        self.function = function        # the method itself
+        self.work_name = work_name      # what the probe counts, None without probe
+        self.work = work                # probe called as work(self, *args) before the method
+
+    def __set_name__(self, owner, name):
+        # Register the method and leave the plain function in the class.
+        REGISTRY.append((owner, name, self.function, self.work_name, self.work))
+        setattr(owner, name, self.function)
+        if enabled:
+            setattr(owner, name, wrap(owner, name, self.function, self.work_name, self.work))
+
+
+def instrumented(work_name: str = None, work=None):
+    """
+    mark a dictionary method for instrumentation
+    @param work_name: name of the work counted by the probe, e.g. 'nodes visited'
+    @param work: probe called as work(self, *args) before the method, returning the work it will do
+    @return: decorator registering the method when its class is created
+    """
+    return lambda function: InstrumentedMethod(function, work_name, work)
+
+
+def wrap(owner, name: str, function, work_name: str, work):
+    """
+    @return: function recording its calls into the statistics of 'owner.name'
+    """
+    statistics = STATISTICS.setdefault(f'{owner.__name__}.{name}', OperationStatistics(work_name))
+    latencies = statistics.latencies
+    perf_counter_ns = time.perf_counter_ns
+
+    def wrapper(self, *args, **kwargs):
+        if getattr(calls_in_progress, 'depth', 0):
+            return function(self, *args, **kwargs)
+        if work is not None:
+            statistics.work += work(self, *args, **kwargs)
+        calls_in_progress.depth = 1
+        start_time = perf_counter_ns()
+        try:
+            result = function(self, *args, **kwargs)
+        finally:
+            elapsed = perf_counter_ns() - start_time
+            calls_in_progress.depth = 0
+        statistics.calls += 1
+        statistics.total_ns += elapsed
+        latencies[min(elapsed.bit_length(), BUCKET_COUNT - 1)] += 1
+        return result
+
+    wrapper.__name__ = function.__name__
+    wrapper.__doc__ = function.__doc__
+    wrapper.__wrapped__ = function
+    return wrapper
+
+
+def enable() -> None:
+    """
+    start recording the instrumented methods of every dictionary
+    """
+    global enabled
+    if enabled:
+        return
+    enabled = True
+    for owner, name, function, work_name, work in REGISTRY:
+        setattr(owner, name, wrap(owner, name, function, work_name, work))
+
+
+def disable() -> None:
+    """
+    stop recording, the statistics gathered so far are kept
+    """
+    global enabled
+    if not enabled:
+        return
+    enabled = False
+    for owner, name, function, _, _ in REGISTRY:
+        setattr(owner, name, function)
+
+
+def reset() -> None:
+    """
+    clear the statistics gathered so far
+    """
+    for statistics in STATISTICS.values():
+        statistics.__init__(statistics.work_name)
+
+
+def report() -> str:
+    """
+    @return: plain text table of the operations called at least once
+    """
+    headers = ['Operation', 'Calls', 'Total (ms)', 'Mean (us)', 'p50 (us) <=', 'p99 (us) <=', 'Work', 'Mean work']
+    rows = list()
+    for label, statistics in sorted(STATISTICS.items()):
+        if statistics.calls == 0:
+            continue
+        rows.append([label, str(statistics.calls), f'{statistics.total_ns / 1e6:.1f}',
+                     f'{statistics.total_ns / statistics.calls / 1e3:.1f}',
+                     f'{statistics.latency_percentile(0.5) / 1e3:.1f}',
+                     f'{statistics.latency_percentile(0.99) / 1e3:.1f}',
+                     statistics.work_name or '-',
+                     f'{statistics.work / statistics.calls:.1f}' if statistics.work_name else '-'])
+    widths = [max(len(row[i]) for row in [headers] + rows) for i in range(len(headers))]
+    lines = ['  '.join(cell.rjust(width) for cell, width in zip(row, widths)) for row in [headers] + rows]
+    lines.insert(1, '  '.join('-' * width for width in widths))
+    return '\n'.join(lines) + '\n'
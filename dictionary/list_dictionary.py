@@ -1,7 +1,12 @@
-import time
-from termcolor import colored as c, cprint
+import bisect
+import heapq
+import itertools
+
 from dictionary.word_frequency import WordFrequency
-from dictionary.base_dictionary import BaseDictionary
+from dictionary.extended_dictionary import ExtendedDictionary
+from dictionary.prefix_index import PrefixIndex, scan_autocomplete_many
+from dictionary.instrumentation import instrumented
+from dictionary.vocabulary_index import VocabularyIndex
 
 
 # ------------------------------------------------------------------------
@@ -11,58 +16,208 @@ from dictionary.base_dictionary import BaseDictionary
 # __copyright__ = 'Copyright 2022, RMIT University'
 # ------------------------------------------------------------------------
 
-def log_computation_time(func):
-    def wrapper(*args, **kwargs):
-        start = time.perf_counter()
-        result = func(*args, **kwargs)
-        end = time.perf_counter()
-        cprint(f"{c(' LIST ', 'cyan', attrs=['bold', 'reverse'])} {c('Computation time', 'magenta')} of"
-               f" '{c(func.__name__, 'yellow')}': {c(str(end - start), 'green')}", attrs=['bold'])
-        return result
-    return wrapper
+# Self-organizing orders of the list:
+#   'frequency'      entries sorted by descending frequency, so autocomplete stops at the third match
+#   'move_to_front'  a word found by search moves to the head of the list
+#   'transpose'      a word found by search swaps places with the entry before it
+# In these modes a side set of the words answers duplicate checks and misses without scanning.
+ORGANIZATIONS = ('frequency', 'move_to_front', 'transpose')
 
 
-class ListDictionary(BaseDictionary):
-    __slots__ = 'dictionary'
+class ListDictionary(ExtendedDictionary):
+    __slots__ = 'dictionary', 'prefix_index', 'organization', 'words', 'vocabulary'
 
-    def __init__(self):
+    def __init__(self, prefix_index: bool = False, organization: str = None):
+        if organization is not None and organization not in ORGANIZATIONS:
+            raise ValueError(f"unknown list organization '{organization}'")
         self.dictionary = []
+        # Optional sorted-array index serving autocomplete, kept up to date by every write.
+        self.prefix_index = PrefixIndex() if prefix_index else None
+        # One of ORGANIZATIONS, None keeps the entries in insertion order.
+        self.organization = organization
+        # Words stored, only kept when the list is organized.
+        self.words = set() if organization is not None else None
+        # Word ids and frequencies answering search_batch, None until the first batch.
+        self.vocabulary = None
 
-    # @log_computation_time
+    @instrumented()
     def build_dictionary(self, words_frequencies: [WordFrequency]):
         """
         construct the data structure to store nodes
         @param words_frequencies: list of (word, frequency) to be stored
         """
-        for word_frequency in words_frequencies:
-            self.dictionary.append(word_frequency)
+        if self.organization is None:
+            for word_frequency in words_frequencies:
+                self.dictionary.append(word_frequency)
+        else:
+            # The first occurrence of a word wins, as it would with add_word_frequency.
+            for word_frequency in words_frequencies:
+                if word_frequency.word not in self.words:
+                    self.words.add(word_frequency.word)
+                    self.dictionary.append(word_frequency)
+            if self.organization == 'frequency':
+                # Stable, so equal frequencies stay in insertion order.
+                self.dictionary.sort(key=lambda wf: wf.frequency, reverse=True)
+        if self.prefix_index is not None:
+            self.prefix_index.invalidate()
+        self.vocabulary = None
 
-    # @log_computation_time
+    @instrumented('comparisons', lambda self, word: self.comparisons(word))
     def search(self, word: str) -> int:
         """
         search for a word
         @param word: the word to be searched
         @return: frequency > 0 if found and 0 if NOT found
         """
+        if self.organization is not None:
+            return self.organized_search(word)
         for word_frequency in self.dictionary:
             if word_frequency.word == word:
                 return word_frequency.frequency
         return 0
 
+    def organized_search(self, word: str) -> int:
+        """
+        search for a word in an organized list, moving it towards the head if the organization says so
+        @param word: the word to be searched
+        @return: frequency > 0 if found and 0 if NOT found
+        """
+        if word not in self.words:
+            return 0
+        dictionary = self.dictionary
+        for word_frequency in dictionary:
+            if word_frequency.word == word:
+                break
+        if self.organization != 'frequency':
+            # Finding the position again by identity runs in C, cheaper than counting in the loop above.
+            index = dictionary.index(word_frequency)
+            if index > 0 and self.organization == 'move_to_front':
+                del dictionary[index]
+                dictionary.insert(0, word_frequency)
+            elif index > 0:
+                dictionary[index - 1], dictionary[index] = word_frequency, dictionary[index - 1]
+        return word_frequency.frequency
+
+    @instrumented('comparisons', lambda self, word_frequency: self.comparisons(word_frequency.word))
     def add_word_frequency(self, word_frequency: WordFrequency) -> bool:
         """
         add a word and its frequency to the dictionary
         @param word_frequency: (word, frequency) to be added
         :return: True whether succeeded, False when word is already in the dictionary
         """
-        # TO BE IMPLEMENTED
         # If word is not in the dictionary than add it to the dictionary.
-        if self.search(word_frequency.word) == 0:
+        if self.organization is None:
+            if self.search(word_frequency.word) != 0:
+                return False
+        elif word_frequency.word in self.words:
+            return False
+        self.insert_entry(word_frequency)
+        return True
+
+    @instrumented('comparisons', lambda self, word, delta=1: self.comparisons(word))
+    def increment(self, word: str, delta: int = 1) -> int:
+        """
+        add delta to the frequency of a word, adding the word with frequency delta if it is not in the dictionary
+        @param word: the word to be updated
+        @param delta: change of the frequency, a word whose frequency drops to 0 or below is deleted
+        @return: the new frequency, 0 if the word is not (or no longer) in the dictionary
+        """
+        if word == '':
+            return 0
+        index = self.locate(word)
+        frequency = delta if index < 0 else self.dictionary[index].frequency + delta
+        if frequency <= 0:
+            if index >= 0:
+                self.remove_entry(index)
+            return 0
+        self.store_entry(index, WordFrequency(word, frequency))
+        return frequency
+
+    @instrumented('comparisons', lambda self, word_frequency: self.comparisons(word_frequency.word))
+    def upsert(self, word_frequency: WordFrequency) -> bool:
+        """
+        set the frequency of a word, adding the word if it is not in the dictionary
+        @param word_frequency: (word, frequency) to be stored
+        @return: True if the word was added, False if its frequency was updated (or the word is empty)
+        """
+        if word_frequency.word == '':
+            return False
+        index = self.locate(word_frequency.word)
+        self.store_entry(index, word_frequency)
+        return index < 0
+
+    def locate(self, word: str) -> int:
+        """
+        @return: index of the entry of a word, -1 if NOT found
+        """
+        if self.words is not None and word not in self.words:
+            return -1
+        for word_frequency in self.dictionary:
+            if word_frequency.word == word:
+                # Finding the position again by identity runs in C, cheaper than counting in the loop.
+                return self.dictionary.index(word_frequency)
+        return -1
+
+    def insert_entry(self, word_frequency: WordFrequency) -> None:
+        """
+        insert the entry of a word that is not in the dictionary where the organization puts new words
+        """
+        if self.organization is None:
             self.dictionary.append(word_frequency)
-            return True
-        return False
+        else:
+            self.words.add(word_frequency.word)
+            if self.organization == 'frequency':
+                # After the entries of equal frequency, as if it had been in the list when it was sorted.
+                index = bisect.bisect_right(self.dictionary, -word_frequency.frequency, key=lambda wf: -wf.frequency)
+                self.dictionary.insert(index, word_frequency)
+            elif self.organization == 'move_to_front':
+                self.dictionary.insert(0, word_frequency)
+            else:
+                self.dictionary.append(word_frequency)
+        if self.prefix_index is not None:
+            self.prefix_index.add(word_frequency.word, word_frequency.frequency)
+        if self.vocabulary is not None:
+            self.vocabulary.set(word_frequency.word, word_frequency.frequency)
+
+    def remove_entry(self, index: int) -> None:
+        """
+        remove the entry at an index of the list
+        """
+        word = self.dictionary.pop(index).word
+        if self.words is not None:
+            self.words.discard(word)
+        if self.prefix_index is not None:
+            self.prefix_index.remove(word)
+        if self.vocabulary is not None:
+            # An unorganized list may hold a later occurrence of the word, which searches now find.
+            index = self.locate(word) if self.organization is None else -1
+            if index >= 0:
+                self.vocabulary.set(word, self.dictionary[index].frequency)
+            else:
+                self.vocabulary.remove(word)
 
-    # @log_computation_time
+    def store_entry(self, index: int, word_frequency: WordFrequency) -> None:
+        """
+        store a new entry for a word, replacing its entry at 'index' unless index is -1
+        """
+        # An updated word keeps its place, so it keeps hiding any later duplicate and ranks among the words of
+        # equal frequency as before; transpose treats the update as an access. The frequency and move-to-front
+        # orders place it as a new word. New WordFrequency objects are stored, so lists returned earlier are
+        # left unchanged.
+        if index >= 0 and self.organization in (None, 'transpose'):
+            self.dictionary[index] = word_frequency
+            if index > 0 and self.organization == 'transpose':
+                self.dictionary[index - 1], self.dictionary[index] = word_frequency, self.dictionary[index - 1]
+            if self.prefix_index is not None:
+                self.prefix_index.update(word_frequency.word, word_frequency.frequency)
+            if self.vocabulary is not None:
+                self.vocabulary.set(word_frequency.word, word_frequency.frequency)
+            return
+        if index >= 0:
+            self.remove_entry(index)
+        self.insert_entry(word_frequency)
+
+    @instrumented('comparisons', lambda self, word: self.comparisons(word))
     def delete_word(self, word: str) -> bool:
         """
         delete a word from the dictionary
@@ -70,22 +225,113 @@ class ListDictionary(BaseDictionary):
         @return: whether succeeded, e.g. return False when point not found
         """
         # If word is in the dictionary than delete it from the dictionary.
-        for word_frequency in self.dictionary:
-            if word_frequency.word == word:
-                self.dictionary.remove(word_frequency)
-                return True
-        return False
+        index = self.locate(word)
+        if index < 0:
+            return False
+        self.remove_entry(index)
+        return True
 
-    # @log_computation_time
+    @instrumented('comparisons', lambda self, prefix_word: self.autocomplete_comparisons(prefix_word))
     def autocomplete(self, prefix_word: str) -> [WordFrequency]:
         """
         return a list of 3 most-frequent words in the dictionary that have 'prefix_word' as a prefix
         @param prefix_word: word to be autocompleted
         @return: a list (could be empty) of (at most) 3 most-frequent words with prefix 'prefix_word'
         """
+        # Answer from the prefix index when enabled.
+        if self.prefix_index is not None:
+            if self.prefix_index.dirty:
+                self.prefix_index.build(self.items())
+            return self.prefix_index.autocomplete(prefix_word)
+        if self.organization == 'frequency':
+            # Sorted by frequency, the first 3 words with the prefix are the most frequent ones.
+            return list(itertools.islice((word_frequency for word_frequency in self.dictionary
+                                          if word_frequency.word.startswith(prefix_word)), 3))
+        if self.organization is not None:
+            # Searches reorder the list, so ties are broken by the words rather than by the list order.
+            return heapq.nsmallest(3, (word_frequency for word_frequency in self.dictionary
+                                       if word_frequency.word.startswith(prefix_word)),
+                                   key=lambda wf: (-wf.frequency, wf.word))
         # Add words to the frequency_list that have 'prefix_word' as a prefix.
         frequency_list = [word_frequency for word_frequency in self.dictionary
                           if word_frequency.word.startswith(prefix_word)]
         # Sort the list by frequency and return the top 3.
         frequency_list.sort(key=lambda x: x.frequency, reverse=True)
         return frequency_list[:3]
+
+    @instrumented()
+    def search_many(self, words: [str]) -> [int]:
+        """
+        search for a batch of words with a single scan of the list
+        @param words: the words to be searched
+        @return: for each word, frequency > 0 if found and 0 if NOT found
+        """
+        # Organized lists answer each search on its own, so that the searches reorder them.
+        if self.organization is not None:
+            return super().search_many(words)
+        wanted = set(words)
+        found = dict()
+        for word_frequency in self.dictionary:
+            if word_frequency.word in wanted and word_frequency.word not in found:
+                found[word_frequency.word] = word_frequency.frequency
+                if len(found) == len(wanted):
+                    break
+        return [found.get(word, 0) for word in words]
+
+    @instrumented()
+    def search_batch(self, words: [str]):
+        """
+        search for a batch of words with NumPy
+        @param words: sequence of words to be searched
+        @return: numpy.ndarray of int64, for each word frequency > 0 if found and 0 if NOT found
+        """
+        # The vocabulary index is built by the first batch, then kept up to date by every write.
+        if self.vocabulary is None:
+            self.vocabulary = VocabularyIndex(self.items())
+        return self.vocabulary.search_batch(words)
+
+    @instrumented()
+    def autocomplete_many(self, prefix_words: [str]) -> [[WordFrequency]]:
+        """
+        autocomplete a batch of prefixes with a single scan of the list
+        @param prefix_words: words to be autocompleted
+        @return: for each prefix, the list autocomplete would return
+        """
+        distinct = set(prefix_words)
+        if self.prefix_index is not None or self.organization is not None or len(distinct) < 2:
+            return super().autocomplete_many(prefix_words)
+        completions = scan_autocomplete_many(self.items(), distinct)
+        return [completions[prefix_word] for prefix_word in prefix_words]
+
+    def comparisons(self, word: str) -> int:
+        """
+        @return: number of words compared by a scan for 'word', the instrumentation probe of the list scans
+        """
+        if self.words is not None and word not in self.words:
+            return 0
+        for index, word_frequency in enumerate(self.dictionary):
+            if word_frequency.word == word:
+                return index + 1
+        return len(self.dictionary)
+
+    def autocomplete_comparisons(self, prefix_word: str) -> int:
+        """
+        @return: number of words compared by autocomplete, the instrumentation probe of autocomplete
+        """
+        if self.prefix_index is not None:
+            return 0
+        if self.organization != 'frequency':
+            return len(self.dictionary)
+        matches = 0
+        for index, word_frequency in enumerate(self.dictionary):
+            if word_frequency.word.startswith(prefix_word):
+                matches += 1
+                if matches == 3:
+                    return index + 1
+        return len(self.dictionary)
+
+    def items(self):
+        """
+        @return: iterator over the (word, frequency) pairs stored, in list order
+        """
+        return ((wf.word, wf.frequency) for wf in self.dictionary)
@@ -0,0 +1,59 @@
+from contextlib import contextmanager
+import gc
+import mmap
+import os
+
+from dictionary.word_frequency import WordFrequency
+
+
+# ------------------------------------------------------------------------
+# Loaders for data files of 'word frequency' lines.
+# Both memory-map the file: iter_word_frequencies parses one line at a time so a dictionary can be
+# built while the file is read, read_word_frequencies parses the whole buffer in a single split.
+# ------------------------------------------------------------------------
+
+def iter_word_frequencies(filename: str):
+    """
+    lazily parse a data file
+    @param filename: data file to be read
+    @return: generator of (word, frequency), one per non-empty line
+    """
+    with open(filename, 'rb') as data_file:
+        if os.fstat(data_file.fileno()).st_size == 0:
+            return
+        with mmap.mmap(data_file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            for line in iter(buffer.readline, b''):
+                values = line.split()
+                if values:
+                    yield WordFrequency(values[0].decode(), int(values[1]))
+
+
+def read_word_frequencies(filename: str) -> [WordFrequency]:
+    """
+    parse a whole data file at once
+    @param filename: data file to be read
+    @return: list of (word, frequency) in file order
+    """
+    with open(filename, 'rb') as data_file:
+        if os.fstat(data_file.fileno()).st_size == 0:
+            return []
+        with mmap.mmap(data_file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            values = buffer.read().decode().split()
+    with paused_gc():
+        # Words and frequencies alternate in the flat list of values.
+        return list(map(WordFrequency, values[0::2], map(int, values[1::2])))
+
+
+@contextmanager
+def paused_gc():
+    """
+    pause the cyclic garbage collector while a large number of acyclic objects is allocated;
+    otherwise it repeatedly rescans the growing set of young objects
+    """
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if gc_enabled:
+            gc.enable()
@@ -7,6 +7,7 @@
 # DON'T CHANGE THIS FILE
 # Class representing a node in the Ternary Search Tree
 class Node:
+    __slots__ = 'letter', 'frequency', 'end_word', 'left', 'middle', 'right', 'best'
 
     def __init__(self, letter=None, frequency=None, end_word=False):
         self.letter = letter            # letter stored at this node
@@ -15,3 +16,4 @@ class Node:
         self.left = None    # pointing to the left child Node, which holds a letter < self.letter
         self.middle = None  # pointing to the middle child Node
         self.right = None   # pointing to the right child Node, which holds a letter > self.letter
+        self.best = None    # cached (-frequency, word) pairs of the best words in this subtree (top-k mode)
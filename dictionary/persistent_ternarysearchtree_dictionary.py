@@ -0,0 +1,271 @@
+from contextlib import contextmanager
+import threading
+import weakref
+
+from dictionary.extended_dictionary import ExtendedDictionary
+from dictionary.word_frequency import WordFrequency
+from dictionary.node import Node
+from dictionary.ternarysearchtree_dictionary import TernarySearchTreeDictionary
+
+
+# ------------------------------------------------------------------------
+# Persistent (path-copying) ternary search tree.
+# Every published version is an immutable tree. A write batch starts from the current root and, before
+# each write, copies the nodes on the search path of the written word; the in-place TST algorithms then
+# only ever touch these copies, as they only change nodes on that path. Nodes copied earlier in the same
+# batch are changed in place. The new root is published with a single assignment once the batch is done.
+# Readers pin a version by holding it (snapshot()) and read it without taking any lock; they never see a
+# batch half applied. Unchanged subtrees are shared between versions, and the nodes of an old version
+# are freed as soon as no version referencing them is held any more.
+# Writers are serialized by a lock that readers never take.
+# ------------------------------------------------------------------------
+
+class TreeVersion(TernarySearchTreeDictionary):
+    __slots__ = 'number', 'copied'
+
+    def __init__(self, top_k: int = None, root: Node = None, number: int = 0):
+        super().__init__(top_k)
+        self.root_ = root
+        self.number = number    # version number, increasing with every published batch
+        self.copied = set()     # nodes copied by the batch writing this version, None once published
+
+    def build_dictionary(self, words_frequencies: [WordFrequency]):
+        """
+        construct the data structure to store nodes
+        @param words_frequencies: list of (word, frequency) to be stored
+        """
+        self.check_writable()
+        super().build_dictionary(words_frequencies)
+
+    def add_word_frequency(self, word_frequency: WordFrequency) -> bool:
+        """
+        add a word and its frequency to the dictionary
+        @param word_frequency: (word, frequency) to be added
+        :return: True whether succeeded, False when word is already in the dictionary
+        """
+        self.check_writable()
+        if word_frequency.word == '' or self.search(word_frequency.word) > 0:
+            return False
+        self.copy_path(word_frequency.word)
+        return super().add_word_frequency(word_frequency)
+
+    def delete_word(self, word: str) -> bool:
+        """
+        delete a word from the dictionary
+        @param word: word to be deleted
+        @return: whether succeeded, e.g. return False when point not found
+        """
+        self.check_writable()
+        if self.search(word) == 0:
+            return False
+        self.copy_path(word)
+        return super().delete_word(word)
+
+    def increment(self, word: str, delta: int = 1) -> int:
+        """
+        add delta to the frequency of a word, adding the word with frequency delta if it is not in the dictionary
+        @param word: the word to be updated
+        @param delta: change of the frequency, a word whose frequency drops to 0 or below is deleted
+        @return: the new frequency, 0 if the word is not (or no longer) in the dictionary
+        """
+        self.check_writable()
+        frequency = self.search(word)
+        # Nothing to copy when the tree stays as it is: a missing word not added, or a zero delta.
+        if word == '' or delta == 0 or (frequency == 0 and delta < 0):
+            return frequency
+        self.copy_path(word)
+        return super().increment(word, delta)
+
+    def upsert(self, word_frequency: WordFrequency) -> bool:
+        """
+        set the frequency of a word, adding the word if it is not in the dictionary
+        @param word_frequency: (word, frequency) to be stored
+        @return: True if the word was added, False if its frequency was updated (or the word is empty)
+        """
+        self.check_writable()
+        frequency = self.search(word_frequency.word)
+        # Nothing to copy when the word already has this frequency.
+        if word_frequency.word == '' or (frequency > 0 and frequency == word_frequency.frequency):
+            return False
+        self.copy_path(word_frequency.word)
+        return super().upsert(word_frequency)
+
+    def check_writable(self) -> None:
+        if self.copied is None:
+            raise RuntimeError(f'version {self.number} is published and read-only')
+
+    def copy_path(self, word: str) -> None:
+        """
+        replace the nodes on the search path of a word by copies, unless this batch already copied them
+        @param word: the word about to be written
+        """
+        if word == '':
+            return
+        copied = self.copied
+        parent = None
+        branch = None           # child link of the parent followed to reach curr
+        curr = self.root_
+        last_index = len(word) - 1
+        letter_index = 0
+        letter = word[0]
+        while curr is not None:
+            if curr not in copied:
+                curr = self.copy_node(curr)
+                # Relink the parent, itself a copy by now.
+                if parent is None:
+                    self.root_ = curr
+                elif branch == 'left':
+                    parent.left = curr
+                elif branch == 'right':
+                    parent.right = curr
+                else:
+                    parent.middle = curr
+            parent = curr
+            if letter < curr.letter:
+                branch, curr = 'left', curr.left
+            elif letter > curr.letter:
+                branch, curr = 'right', curr.right
+            elif letter_index == last_index:
+                return
+            else:
+                letter_index += 1
+                letter = word[letter_index]
+                branch, curr = 'middle', curr.middle
+
+    def copy_node(self, node: Node) -> Node:
+        """
+        @return: a copy of a node, owned by this batch
+        """
+        copy = Node(node.letter, node.frequency, node.end_word)
+        copy.left, copy.middle, copy.right = node.left, node.middle, node.right
+        # The cached top-k is updated in place, so the copy gets a list of its own.
+        copy.best = list(node.best) if node.best is not None else None
+        self.copied.add(copy)
+        return copy
+
+
+class PersistentTernarySearchTreeDictionary(ExtendedDictionary):
+    __slots__ = 'version', 'write_lock', 'versions'
+
+    def __init__(self, top_k: int = None):
+        """
+        @param top_k: cache the top_k best words of every subtree, as TernarySearchTreeDictionary does
+        """
+        self.version = TreeVersion(top_k)
+        self.version.copied = None
+        self.write_lock = threading.Lock()
+        # number -> version, for every version still held by someone
+        self.versions = weakref.WeakValueDictionary({0: self.version})
+
+    def snapshot(self) -> TreeVersion:
+        """
+        @return: the current version, unchanged by later writes and readable without locks for as long as it is held
+        """
+        return self.version
+
+    @contextmanager
+    def write_batch(self):
+        """
+        apply a batch of writes atomically: the writes are made on the yielded version, published once the
+        block exits without raising and dropped otherwise
+        """
+        with self.write_lock:
+            current = self.version
+            version = TreeVersion(current.top_k, current.root_, current.number + 1)
+            # Caches built by a fuzzy query on an earlier version are kept up to date from then on.
+            version.cache_k = current.cache_k
+            yield version
+            version.copied = None
+            # Every write copies or replaces the root, a batch that wrote nothing publishes nothing.
+            if version.root_ is not current.root_:
+                self.versions[version.number] = version
+                self.version = version
+
+    def live_versions(self) -> int:
+        """
+        @return: number of versions still held, the current one included
+        """
+        return len(self.versions)
+
+    def build_dictionary(self, words_frequencies: [WordFrequency]):
+        """
+        construct the data structure to store nodes
+        @param words_frequencies: list of (word, frequency) to be stored
+        """
+        with self.write_batch() as version:
+            version.build_dictionary(words_frequencies)
+
+    def search(self, word: str) -> int:
+        """
+        search for a word
+        @param word: the word to be searched
+        @return: frequency > 0 if found and 0 if NOT found
+        """
+        return self.version.search(word)
+
+    def add_word_frequency(self, word_frequency: WordFrequency) -> bool:
+        """
+        add a word and its frequency to the dictionary
+        @param word_frequency: (word, frequency) to be added
+        :return: True whether succeeded, False when word is already in the dictionary
+        """
+        with self.write_batch() as version:
+            return version.add_word_frequency(word_frequency)
+
+    def delete_word(self, word: str) -> bool:
+        """
+        delete a word from the dictionary
+        @param word: word to be deleted
+        @return: whether succeeded, e.g. return False when point not found
+        """
+        with self.write_batch() as version:
+            return version.delete_word(word)
+
+    def increment(self, word: str, delta: int = 1) -> int:
+        """
+        add delta to the frequency of a word, adding the word with frequency delta if it is not in the dictionary
+        @param word: the word to be updated
+        @param delta: change of the frequency, a word whose frequency drops to 0 or below is deleted
+        @return: the new frequency, 0 if the word is not (or no longer) in the dictionary
+        """
+        with self.write_batch() as version:
+            return version.increment(word, delta)
+
+    def upsert(self, word_frequency: WordFrequency) -> bool:
+        """
+        set the frequency of a word, adding the word if it is not in the dictionary
+        @param word_frequency: (word, frequency) to be stored
+        @return: True if the word was added, False if its frequency was updated (or the word is empty)
+        """
+        with self.write_batch() as version:
+            return version.upsert(word_frequency)
+
+    def autocomplete(self, prefix_word: str) -> [WordFrequency]:
+        """
+        return a list of 3 most-frequent words in the dictionary that have 'prefix_word' as a prefix
+        @param prefix_word: word to be autocompleted
+        @return: a list (could be empty) of (at most) 3 most-frequent words with prefix 'prefix_word'
+        """
+        return self.version.autocomplete(prefix_word)
+
+    def search_many(self, words: [str]) -> [int]:
+        """
+        search for a batch of words, all in the same version
+        @param words: the words to be searched
+        @return: for each word, frequency > 0 if found and 0 if NOT found
+        """
+        return self.version.search_many(words)
+
+    def autocomplete_many(self, prefix_words: [str]) -> [[WordFrequency]]:
+        """
+        autocomplete a batch of prefixes, all in the same version
+        @param prefix_words: words to be autocompleted
+        @return: for each prefix, the list autocomplete would return
+        """
+        return self.version.autocomplete_many(prefix_words)
+
+    def items(self):
+        """
+        @return: iterator over the (word, frequency) pairs of the current version, in lexicographic order
+        """
+        return self.version.items()
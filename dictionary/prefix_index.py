@@ -0,0 +1,219 @@
+import bisect
+import heapq
+
+from dictionary.word_frequency import WordFrequency
+
+
+# ------------------------------------------------------------------------
+# Secondary index answering autocomplete in O(log n + k).
+# The words are kept in a lexicographically sorted array, so the words sharing a prefix form one
+# contiguous range found with bisect. A sparse table over the frequencies gives the maximum of any
+# range in O(1), and the k best words of the range are peeled off with a small heap of sub-ranges.
+# Writes are applied as a small delta (removed indices and added words) merged into every answer;
+# the arrays are only rebuilt, lazily, once the delta outgrows a fraction of the index.
+# ------------------------------------------------------------------------
+
+# Sorts after every character, so prefix + LAST_CHAR bounds the range of words starting with prefix.
+LAST_CHAR = chr(0x10FFFF)
+
+
+class PrefixIndex:
+    __slots__ = ('words', 'frequencies', 'keys', 'positions', 'sparse_table', 'dirty',
+                 'removed', 'added', 'added_words', 'added_count')
+
+    def __init__(self):
+        self.words = []         # words in lexicographic order
+        self.frequencies = []   # frequency of words[i]
+        self.keys = []          # ranking key of words[i], unique so that every range has a single maximum
+        self.positions = []     # position of words[i] in the dictionary's own order at build time
+        self.sparse_table = []  # sparse_table[j][i] is the index of the best key in keys[i:i + 2 ** j]
+        self.dirty = True       # True when the index must be rebuilt before the next query
+        self.removed = set()    # indices of deleted words, skipped by queries
+        self.added = {}         # word -> (frequency, tier, tie-break) of words added or updated since the build
+        self.added_words = []   # the added words in lexicographic order
+        self.added_count = 0    # sequence number of the next added word
+
+    def invalidate(self) -> None:
+        """
+        mark the index as stale, it is rebuilt lazily by the next query
+        """
+        self.dirty = True
+        self.removed.clear()
+        self.added.clear()
+        self.added_words.clear()
+
+    def check_delta(self) -> None:
+        # Queries scan the delta, so past a fraction of the index a full rebuild is cheaper.
+        if len(self.added) + len(self.removed) > 256 + len(self.words) // 64:
+            self.invalidate()
+
+    def add(self, word: str, frequency: int) -> None:
+        """
+        record a word appended to the dictionary, it ranks after every stored word of equal frequency
+        @param word: word added, not currently in the dictionary
+        @param frequency: its frequency
+        """
+        if self.dirty:
+            return
+        # Tier 0 ranks after the indexed words of equal frequency, earlier additions first.
+        self.added[word] = (frequency, 0, -self.added_count)
+        self.added_count += 1
+        bisect.insort(self.added_words, word)
+        self.check_delta()
+
+    def update(self, word: str, frequency: int) -> None:
+        """
+        record a change of frequency of the first occurrence of a word, which keeps its place in the dictionary
+        @param word: word updated, currently in the dictionary
+        @param frequency: its new frequency
+        """
+        if self.dirty:
+            return
+        if word in self.added:
+            _, tier, tie_break = self.added[word]
+            self.added[word] = (frequency, tier, tie_break)
+            return
+        index = self.first_live(word)
+        if index is None:
+            return
+        # Tier 1 competes with the indexed words, ties broken by position as in build.
+        self.removed.add(index)
+        self.added[word] = (frequency, 1, -self.positions[index])
+        bisect.insort(self.added_words, word)
+        self.check_delta()
+
+    def remove(self, word: str) -> None:
+        """
+        record the deletion of the first occurrence of a word in the dictionary's own order
+        @param word: word deleted
+        """
+        if self.dirty:
+            return
+        if word in self.added:
+            del self.added[word]
+            del self.added_words[bisect.bisect_left(self.added_words, word)]
+            return
+        index = self.first_live(word)
+        if index is not None:
+            self.removed.add(index)
+            self.check_delta()
+
+    def first_live(self, word: str) -> int:
+        """
+        @return: index of the first occurrence of a word in the dictionary's own order, among the indexed
+                 words not removed; None if there is none
+        """
+        # Equal words are adjacent; the live one with the smallest position is the first occurrence.
+        start = bisect.bisect_left(self.words, word)
+        end = bisect.bisect_right(self.words, word, start)
+        live = [i for i in range(start, end) if i not in self.removed]
+        return min(live, key=self.positions.__getitem__) if live else None
+
+    def build(self, words_frequencies) -> None:
+        """
+        rebuild the index
+        @param words_frequencies: (word, frequency) tuples in the dictionary's own order, which breaks frequency ties
+        """
+        entries = list(words_frequencies)
+        size = len(entries)
+        # Rank by frequency, then by original position, so ties come out in the same order as a stable sort.
+        ranked = sorted((word, frequency * (size + 1) + size - position, frequency, position)
+                        for position, (word, frequency) in enumerate(entries))
+        self.words = [word for word, _, _, _ in ranked]
+        self.keys = [key for _, key, _, _ in ranked]
+        self.frequencies = [frequency for _, _, frequency, _ in ranked]
+        self.positions = [position for _, _, _, position in ranked]
+
+        keys = self.keys
+        level = list(range(size))
+        self.sparse_table = [level]
+        span = 1
+        while 2 * span <= size:
+            level = [a if keys[a] > keys[b] else b for a, b in zip(level, level[span:])]
+            self.sparse_table.append(level)
+            span *= 2
+        self.removed.clear()
+        self.added.clear()
+        self.added_words.clear()
+        self.dirty = False
+
+    def prefix_range(self, prefix: str) -> (int, int):
+        """
+        @param prefix: prefix to look up
+        @return: [start, end) range of the indexed words that have 'prefix' as a prefix
+        """
+        return bisect.bisect_left(self.words, prefix), bisect.bisect_left(self.words, prefix + LAST_CHAR)
+
+    def range_max(self, start: int, end: int) -> int:
+        """
+        @return: index of the best ranked word in the non-empty range [start, end)
+        """
+        level = (end - start).bit_length() - 1
+        a = self.sparse_table[level][start]
+        b = self.sparse_table[level][end - (1 << level)]
+        return a if self.keys[a] > self.keys[b] else b
+
+    def top_in_range(self, start: int, end: int, k: int) -> [int]:
+        """
+        @return: indices of the (at most) k best ranked words in [start, end), best first, deleted words skipped
+        """
+        removed = self.removed
+        result = list()
+        heap = list()
+        if start < end:
+            best = self.range_max(start, end)
+            heap.append((-self.keys[best], best, start, end))
+        while heap and len(result) < k:
+            _, best, start, end = heapq.heappop(heap)
+            if best not in removed:
+                result.append(best)
+            # Split the range around the word just taken.
+            for sub_start, sub_end in ((start, best), (best + 1, end)):
+                if sub_start < sub_end:
+                    sub_best = self.range_max(sub_start, sub_end)
+                    heapq.heappush(heap, (-self.keys[sub_best], sub_best, sub_start, sub_end))
+        return result
+
+    def autocomplete(self, prefix_word: str, k: int = 3) -> [WordFrequency]:
+        """
+        return a list of k most-frequent words in the index that have 'prefix_word' as a prefix
+        @param prefix_word: word to be autocompleted
+        @param k: number of words to return
+        @return: a list (could be empty) of (at most) k most-frequent words with prefix 'prefix_word'
+        """
+        start, end = self.prefix_range(prefix_word)
+        indices = self.top_in_range(start, end, k)
+        if not self.added:
+            return [WordFrequency(self.words[i], self.frequencies[i]) for i in indices]
+        # Ranked by frequency, then indexed and updated words by position, then added words by insertion.
+        candidates = [(self.frequencies[i], 1, -self.positions[i], self.words[i]) for i in indices]
+        low = bisect.bisect_left(self.added_words, prefix_word)
+        high = bisect.bisect_left(self.added_words, prefix_word + LAST_CHAR, low)
+        for word in self.added_words[low:high]:
+            candidates.append((*self.added[word], word))
+        return [WordFrequency(word, frequency) for frequency, _, _, word in heapq.nlargest(k, candidates)]
+
+
+def scan_autocomplete_many(words_frequencies, prefix_words, k: int = 3) -> dict:
+    """
+    autocomplete several prefixes with a single linear scan, for dictionaries without an index
+    @param words_frequencies: (word, frequency) tuples in the dictionary's own order, which breaks frequency ties
+    @param prefix_words: distinct words to be autocompleted
+    @param k: number of words to return per prefix
+    @return: prefix -> list (could be empty) of (at most) k most-frequent words with that prefix
+    """
+    tops = {prefix_word: [] for prefix_word in prefix_words}
+    lengths = sorted({len(prefix_word) for prefix_word in tops})
+    for word, frequency in words_frequencies:
+        for length in lengths:
+            if length > len(word):
+                break
+            top = tops.get(word[:length])
+            # Earlier words win ties, as in a stable sort, so a word only moves ahead of smaller frequencies.
+            if top is not None and (len(top) < k or frequency > top[-1][1]):
+                position = len(top)
+                while position and top[position - 1][1] < frequency:
+                    position -= 1
+                top.insert(position, (word, frequency))
+                del top[k:]
+    return {prefix_word: [WordFrequency(w, f) for w, f in top] for prefix_word, top in tops.items()}
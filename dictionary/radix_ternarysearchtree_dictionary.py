@@ -0,0 +1,413 @@
+import bisect
+import heapq
+
+from dictionary.extended_dictionary import ExtendedDictionary
+from dictionary.word_frequency import WordFrequency
+from dictionary.prefix_index import LAST_CHAR
+from dictionary.instrumentation import instrumented
+
+
+# ------------------------------------------------------------------------
+# Path-compressed (radix) Ternary Search Tree.
+# A node holds a non-empty segment of letters instead of a single letter: siblings are ordered by the first
+# letter of their segment, and going down the middle consumes the whole segment. A node that ends no word
+# always has at least two alternatives below it, otherwise it is merged with its middle child, so chains of
+# single-child middle nodes collapse into one node. Segments split on insert and merge back on delete.
+# ------------------------------------------------------------------------
+
+class RadixNode:
+    __slots__ = 'segment', 'frequency', 'end_word', 'left', 'middle', 'right'
+
+    def __init__(self, segment: str, frequency: int = None, end_word: bool = False):
+        self.segment = segment          # letters stored at this node, segment[0] orders the siblings
+        self.frequency = frequency      # frequency of the word if the segment is the end of a word
+        self.end_word = end_word        # True if the segment is the end of a word
+        self.left = None    # sibling subtree whose segments start with a letter < segment[0]
+        self.middle = None  # subtree of the letters following the segment
+        self.right = None   # sibling subtree whose segments start with a letter > segment[0]
+
+
+class RadixTernarySearchTreeDictionary(ExtendedDictionary):
+    __slots__ = 'root_'
+
+    def __init__(self):
+        self.root_ = None
+
+    @instrumented()
+    def build_dictionary(self, words_frequencies: [WordFrequency]):
+        """
+        construct the data structure to store nodes
+        @param words_frequencies: list of (word, frequency) to be stored
+        """
+        # Words added to a tree that already holds words are inserted one by one.
+        if self.root_ is not None:
+            for word_frequency in words_frequencies:
+                self.add_word_frequency(word_frequency)
+            return
+        # Dedupe in a single pass, the first occurrence wins as it would with add_word_frequency.
+        frequencies = dict()
+        for word_frequency in words_frequencies:
+            if word_frequency.word != '':
+                frequencies.setdefault(word_frequency.word, word_frequency.frequency)
+        words = sorted(frequencies)
+        self.root_ = self.build_balanced(words, frequencies, 0, len(words), 0)
+
+    def build_balanced(self, words: [str], frequencies: dict, start: int, end: int, depth: int) -> RadixNode:
+        """
+        build a balanced subtree from sorted words sharing their first 'depth' letters
+        @param words: sorted unique words
+        @param frequencies: frequency of every word
+        @param start: first index of the words to be stored, inclusive
+        @param end: last index of the words to be stored, exclusive
+        @param depth: number of letters already consumed, every word in the range is longer than this
+        @return: root of the subtree, None if the range is empty
+        """
+        if start >= end:
+            return None
+        # The letter of the median word starts the segment, so both sides hold about half of the words.
+        prefix = words[(start + end) // 2][:depth + 1]
+        low = bisect.bisect_left(words, prefix, start, end)
+        high = bisect.bisect_left(words, prefix + LAST_CHAR, low, end)
+        # The segment runs to the longest prefix shared by the letter's words, the first and last of the range.
+        first, last = words[low], words[high - 1]
+        segment_end = depth + 1
+        while segment_end < len(first) and segment_end < len(last) and first[segment_end] == last[segment_end]:
+            segment_end += 1
+        curr = RadixNode(first[depth:segment_end])
+        if start < low:
+            curr.left = self.build_balanced(words, frequencies, start, low, depth)
+        # Only the shortest word of the range may end at the segment end.
+        if len(first) == segment_end:
+            curr.frequency = frequencies[first]
+            curr.end_word = True
+            low += 1
+        if low < high:
+            curr.middle = self.build_balanced(words, frequencies, low, high, segment_end)
+        if high < end:
+            curr.right = self.build_balanced(words, frequencies, high, end, depth)
+        return curr
+
+    def find_node(self, word: str) -> (RadixNode, str):
+        """
+        find the node whose segment holds the last letter of a word (or prefix)
+        @param word: the word (or prefix) to be searched
+        @return: (node, word spelled down to the end of its segment), (None, '') if the tree has no such path
+        """
+        if word == '':
+            return None, ''
+        curr = self.root_
+        letter_index = 0
+        while curr is not None:
+            letter = word[letter_index]
+            segment = curr.segment
+            if letter < segment[0]:
+                curr = curr.left
+            elif letter > segment[0]:
+                curr = curr.right
+            else:
+                end_index = letter_index + len(segment)
+                # The word may stop inside the segment, which must then continue it.
+                if end_index >= len(word):
+                    if segment.startswith(word[letter_index:]):
+                        return curr, word[:letter_index] + segment
+                    return None, ''
+                if not word.startswith(segment, letter_index):
+                    return None, ''
+                letter_index = end_index
+                curr = curr.middle
+        return None, ''
+
+    @instrumented('nodes visited', lambda self, word: self.nodes_visited(word))
+    def search(self, word: str) -> int:
+        """
+        search for a word
+        @param word: the word to be searched
+        @return: frequency > 0 if found and 0 if NOT found
+        """
+        if word == '':
+            return 0
+        curr = self.root_
+        letter_index = 0
+        last_index = len(word)
+        # Same walk as find_node, without spelling the node word.
+        while curr is not None:
+            letter = word[letter_index]
+            segment = curr.segment
+            first_letter = segment[0]
+            if letter < first_letter:
+                curr = curr.left
+            elif letter > first_letter:
+                curr = curr.right
+            else:
+                # Most segments are a single letter, which already matched.
+                segment_length = len(segment)
+                if segment_length > 1 and not word.startswith(segment, letter_index):
+                    return 0
+                letter_index += segment_length
+                # The word must end exactly at the end of a segment.
+                if letter_index == last_index:
+                    return curr.frequency if curr.end_word else 0
+                curr = curr.middle
+        return 0
+
+    @instrumented('nodes visited', lambda self, word_frequency: self.nodes_visited(word_frequency.word))
+    def add_word_frequency(self, word_frequency: WordFrequency) -> bool:
+        """
+        add a word and its frequency to the dictionary
+        @param word_frequency: (word, frequency) to be added
+        :return: True whether succeeded, False when word is already in the dictionary
+        """
+        word = word_frequency.word
+        if word == '':
+            return False
+        parent, direction = None, None
+        curr = self.root_
+        letter_index = 0
+        while curr is not None:
+            letter = word[letter_index]
+            segment = curr.segment
+            if letter < segment[0]:
+                parent, direction, curr = curr, 'left', curr.left
+                continue
+            if letter > segment[0]:
+                parent, direction, curr = curr, 'right', curr.right
+                continue
+            shared = 1
+            while shared < len(segment) and letter_index + shared < len(word) \
+                    and segment[shared] == word[letter_index + shared]:
+                shared += 1
+            # The word leaves the segment part way, so the node is split where they part.
+            if shared < len(segment):
+                tail = RadixNode(segment[shared:], curr.frequency, curr.end_word)
+                tail.middle = curr.middle
+                curr.segment = segment[:shared]
+                curr.frequency, curr.end_word, curr.middle = None, False, tail
+            letter_index += shared
+            if letter_index == len(word):
+                if curr.end_word:
+                    return False
+                curr.frequency, curr.end_word = word_frequency.frequency, True
+                return True
+            parent, direction, curr = curr, 'middle', curr.middle
+        # The rest of the word becomes a single node.
+        self.link(parent, direction, RadixNode(word[letter_index:], word_frequency.frequency, True))
+        return True
+
+    @instrumented('nodes visited', lambda self, word, delta=1: self.nodes_visited(word))
+    def increment(self, word: str, delta: int = 1) -> int:
+        """
+        add delta to the frequency of a word, adding the word with frequency delta if it is not in the dictionary
+        @param word: the word to be updated
+        @param delta: change of the frequency, a word whose frequency drops to 0 or below is deleted
+        @return: the new frequency, 0 if the word is not (or no longer) in the dictionary
+        """
+        curr, node_word = self.find_node(word)
+        if curr is None or node_word != word or not curr.end_word:
+            # Not in the tree: only a positive delta adds it, which may split a segment.
+            if delta <= 0 or not self.add_word_frequency(WordFrequency(word, delta)):
+                return 0
+            return delta
+        frequency = curr.frequency + delta
+        if frequency <= 0:
+            self.delete_word(word)
+            return 0
+        curr.frequency = frequency
+        return frequency
+
+    @instrumented('nodes visited', lambda self, word_frequency: self.nodes_visited(word_frequency.word))
+    def upsert(self, word_frequency: WordFrequency) -> bool:
+        """
+        set the frequency of a word, adding the word if it is not in the dictionary
+        @param word_frequency: (word, frequency) to be stored
+        @return: True if the word was added, False if its frequency was updated (or the word is empty)
+        """
+        curr, node_word = self.find_node(word_frequency.word)
+        if curr is None or node_word != word_frequency.word or not curr.end_word:
+            return self.add_word_frequency(word_frequency)
+        curr.frequency = word_frequency.frequency
+        return False
+
+    def link(self, parent: RadixNode, direction: str, child: RadixNode) -> None:
+        """
+        point the 'direction' child of parent, or the root when parent is None, to child
+        """
+        if parent is None:
+            self.root_ = child
+        elif direction == 'left':
+            parent.left = child
+        elif direction == 'middle':
+            parent.middle = child
+        else:
+            parent.right = child
+
+    @instrumented('nodes visited', lambda self, word: self.nodes_visited(word))
+    def delete_word(self, word: str) -> bool:
+        """
+        delete a word from the dictionary
+        @param word: word to be deleted
+        @return: whether succeeded, e.g. return False when point not found
+        """
+        if word == '':
+            return False
+        # Walk the word once, recording the path as (node, parent, direction from the parent).
+        path = list()
+        parent, direction = None, None
+        curr = self.root_
+        letter_index = 0
+        while curr is not None:
+            path.append((curr, parent, direction))
+            letter = word[letter_index]
+            segment = curr.segment
+            if letter < segment[0]:
+                parent, direction, curr = curr, 'left', curr.left
+            elif letter > segment[0]:
+                parent, direction, curr = curr, 'right', curr.right
+            elif not word.startswith(segment, letter_index):
+                return False
+            else:
+                letter_index += len(segment)
+                if letter_index == len(word):
+                    break
+                parent, direction, curr = curr, 'middle', curr.middle
+        if curr is None or not curr.end_word:
+            return False
+        curr.end_word, curr.frequency = False, None
+
+        index = len(path) - 1
+        # A node still leading to words keeps its place, it may only absorb a lone middle child.
+        while curr.middle is None:
+            self.unlink(*path[index])
+            # The node above the sibling level just left may now be useless, or have a lone middle child.
+            while index > 0 and path[index][2] != 'middle':
+                index -= 1
+            if index == 0:
+                return True
+            index -= 1
+            curr = path[index][0]
+            if curr.end_word:
+                return True
+        self.merge_middle(curr)
+        return True
+
+    def unlink(self, node: RadixNode, parent: RadixNode, direction: str) -> None:
+        """
+        remove a node from its sibling subtree, as in a binary search tree
+        """
+        if node.left is None:
+            replacement = node.right
+        elif node.right is None:
+            replacement = node.left
+        else:
+            # Two siblings: the smallest node of the right subtree takes its place.
+            successor_parent, replacement = node, node.right
+            while replacement.left is not None:
+                successor_parent, replacement = replacement, replacement.left
+            if successor_parent is not node:
+                successor_parent.left = replacement.right
+                replacement.right = node.right
+            replacement.left = node.left
+        self.link(parent, direction, replacement)
+
+    @staticmethod
+    def merge_middle(node: RadixNode) -> None:
+        """
+        merge a node that ends no word with its middle child when that child has no siblings
+        """
+        child = node.middle
+        if node.end_word or child is None or child.left is not None or child.right is not None:
+            return
+        node.segment += child.segment
+        node.frequency, node.end_word, node.middle = child.frequency, child.end_word, child.middle
+
+    @instrumented('nodes visited', lambda self, word: self.nodes_visited(word, True))
+    def autocomplete(self, word: str) -> [WordFrequency]:
+        """
+        return a list of 3 most-frequent words in the dictionary that have 'word' as a prefix
+        @param word: word to be autocompleted
+        @return: a list (could be empty) of (at most) 3 most-frequent words with prefix 'word'
+        """
+        # Every word at or below the node holding the end of the prefix has the prefix.
+        curr, node_word = self.find_node(word)
+        if curr is None:
+            return []
+        candidates = self.subtree_items(curr.middle, node_word)
+        if curr.end_word:
+            candidates = [(node_word, curr.frequency), *candidates]
+        # Highest frequency first, ties in lexicographic order.
+        best = heapq.nsmallest(3, candidates, key=lambda item: (-item[1], item[0]))
+        return [WordFrequency(w, f) for w, f in best]
+
+    def subtree_items(self, root: RadixNode, prefix: str):
+        """
+        @param root: root of the subtree
+        @param prefix: word spelled by the nodes above the subtree
+        @return: iterator over the (word, frequency) pairs stored in the subtree, in lexicographic order
+        """
+        # Entries are (node, prefix) to expand, or (None, (word, frequency)) to emit.
+        stack = [(root, prefix)] if root is not None else []
+        while stack:
+            curr, value = stack.pop()
+            if curr is None:
+                yield value
+                continue
+            # In-order: left, the word ending here, middle, right.
+            node_word = value + curr.segment
+            if curr.right is not None:
+                stack.append((curr.right, value))
+            if curr.middle is not None:
+                stack.append((curr.middle, node_word))
+            if curr.end_word:
+                stack.append((None, (node_word, curr.frequency)))
+            if curr.left is not None:
+                stack.append((curr.left, value))
+
+    def items(self):
+        """
+        @return: iterator over the (word, frequency) pairs stored, in lexicographic order
+        """
+        return self.subtree_items(self.root_, '')
+
+    def node_count(self) -> int:
+        """
+        @return: number of nodes in the tree
+        """
+        count = 0
+        stack = [self.root_] if self.root_ is not None else []
+        while stack:
+            curr = stack.pop()
+            count += 1
+            stack.extend(child for child in (curr.left, curr.middle, curr.right) if child is not None)
+        return count
+
+    def nodes_visited(self, word: str, subtree: bool = False) -> int:
+        """
+        count the nodes visited by a walk down a word, the instrumentation probe of the tree operations
+        @param word: the word (or prefix) to be walked
+        @param subtree: also count the nodes below the end of the word, as autocomplete enumerates them; the
+                        count walks the subtree once more, so an instrumented autocomplete takes about twice as long
+        @return: number of nodes visited
+        """
+        visited = 0
+        curr = self.root_
+        letter_index = 0
+        while curr is not None and letter_index < len(word):
+            visited += 1
+            segment = curr.segment
+            if word[letter_index] < segment[0]:
+                curr = curr.left
+            elif word[letter_index] > segment[0]:
+                curr = curr.right
+            elif not (word.startswith(segment, letter_index) or segment.startswith(word[letter_index:])):
+                break
+            else:
+                letter_index += len(segment)
+                if letter_index >= len(word):
+                    stack = [curr.middle] if subtree else []
+                    while stack:
+                        node = stack.pop()
+                        if node is not None:
+                            visited += 1
+                            stack.extend((node.left, node.middle, node.right))
+                    break
+                curr = curr.middle
+        return visited
@@ -0,0 +1,316 @@
+import heapq
+import multiprocessing
+
+from dictionary.extended_dictionary import ExtendedDictionary
+from dictionary.word_frequency import WordFrequency
+
+
+# ------------------------------------------------------------------------
+# Dictionary partitioning its words into independent shards, each a dictionary of its own.
+# Partitions:
+#   'letter'  words go to the shard owning their first letter. Letters are spread over the shards when
+#             the dictionary is built, the most common first, each to the shard holding the fewest words;
+#             a letter first written later goes to the smallest shard, reads of it find nothing until then.
+#             A prefix lives in a single shard, so autocomplete asks that shard only, and fans out to every
+#             shard for the empty prefix.
+#   'hash'    words go to the shard given by their hash, which balances the shards whatever the letters,
+#             but autocomplete fans out to every shard.
+# A fan-out keeps the 3 most frequent of the shards' completions, ties in shard order.
+# With workers=True every shard lives in a forked worker process and is called through a pipe; batch
+# calls send their requests to every shard involved before waiting, so the shards answer in parallel.
+# ------------------------------------------------------------------------
+
+PARTITIONS = ('letter', 'hash')
+
+
+def serve_shard(connection, factory) -> None:
+    """
+    worker process loop: run the (method name, arguments) requests against a shard until None is received
+    """
+    shard = factory()
+    while True:
+        request = connection.recv()
+        if request is None:
+            break
+        name, args = request
+        try:
+            result = getattr(shard, name)(*args)
+            # Iterators cannot cross the pipe.
+            connection.send((True, list(result) if name == 'items' else result))
+        except Exception as exception:
+            connection.send((False, exception))
+    connection.close()
+
+
+class ShardProcess:
+    __slots__ = 'connection', 'process'
+
+    def __init__(self, factory):
+        context = multiprocessing.get_context('fork' if 'fork' in multiprocessing.get_all_start_methods()
+                                              else None)
+        self.connection, child_connection = context.Pipe()
+        self.process = context.Process(target=serve_shard, args=(child_connection, factory), daemon=True)
+        self.process.start()
+        child_connection.close()
+
+    def send(self, name: str, *args) -> None:
+        self.connection.send((name, args))
+
+    def receive(self):
+        succeeded, result = self.connection.recv()
+        if not succeeded:
+            raise result
+        return result
+
+    def close(self) -> None:
+        self.connection.send(None)
+        self.process.join()
+        self.connection.close()
+
+
+class ShardedDictionary(ExtendedDictionary):
+    __slots__ = 'shards', 'partition', 'owners', 'sizes', 'workers'
+
+    def __init__(self, factory, shards: int = 4, partition: str = 'letter', workers: bool = False):
+        """
+        @param factory: callable returning an empty dictionary, called once per shard
+        @param shards: number of shards
+        @param partition: one of PARTITIONS
+        @param workers: whether every shard lives in a worker process of its own
+        """
+        if partition not in PARTITIONS:
+            raise ValueError(f"unknown partition '{partition}'")
+        if shards < 1:
+            raise ValueError('at least one shard is needed')
+        self.partition = partition
+        self.workers = workers
+        self.shards = [ShardProcess(factory) if workers else factory() for _ in range(shards)]
+        self.owners = {}                # first letter -> index of its shard, 'letter' partition only
+        self.sizes = [0] * shards       # words added to and deleted from every shard, used to place letters
+
+    def owner_of(self, word: str) -> int:
+        """
+        @return: index of the shard a word belongs to, -1 if its first letter has no shard yet
+        """
+        if self.partition == 'hash':
+            return hash(word) % len(self.shards)
+        return self.owners.get(word[:1], -1)
+
+    def shard_of(self, word: str) -> int:
+        """
+        @return: index of the shard a word belongs to, placing its first letter if it is new; writes only, so
+                 that reads never decide where a letter goes
+        """
+        owner = self.owner_of(word)
+        if owner < 0:
+            owner = self.owners[word[:1]] = self.sizes.index(min(self.sizes))
+        return owner
+
+    def call(self, index: int, name: str, *args):
+        """
+        @return: result of a method called on one shard
+        """
+        shard = self.shards[index]
+        if not self.workers:
+            return getattr(shard, name)(*args)
+        shard.send(name, *args)
+        return shard.receive()
+
+    def call_all(self, calls: [(int, str, tuple)]) -> list:
+        """
+        call methods on several shards, in parallel when they live in workers
+        @param calls: (shard index, method name, arguments), at most one call per shard
+        @return: the results, in the order of the calls
+        """
+        if not self.workers:
+            return [getattr(self.shards[index], name)(*args) for index, name, args in calls]
+        for index, name, args in calls:
+            self.shards[index].send(name, *args)
+        return [self.shards[index].receive() for index, _, _ in calls]
+
+    def build_dictionary(self, words_frequencies: [WordFrequency]):
+        """
+        construct the data structure to store nodes
+        @param words_frequencies: list of (word, frequency) to be stored
+        """
+        words_frequencies = list(words_frequencies)
+        self.owners = {}
+        self.sizes = [0] * len(self.shards)
+        if self.partition == 'letter':
+            counts = {}
+            for word_frequency in words_frequencies:
+                letter = word_frequency.word[:1]
+                counts[letter] = counts.get(letter, 0) + 1
+            # Largest first onto the smallest shard keeps the shards within one letter of each other.
+            heap = [(0, index) for index in range(len(self.shards))]
+            for letter in sorted(counts, key=counts.get, reverse=True):
+                size, index = heapq.heappop(heap)
+                self.owners[letter] = index
+                heapq.heappush(heap, (size + counts[letter], index))
+        parts = [[] for _ in self.shards]
+        for word_frequency in words_frequencies:
+            parts[self.shard_of(word_frequency.word)].append(word_frequency)
+        self.sizes = [len(part) for part in parts]
+        self.call_all([(index, 'build_dictionary', (part,)) for index, part in enumerate(parts)])
+
+    def search(self, word: str) -> int:
+        """
+        search for a word
+        @param word: the word to be searched
+        @return: frequency > 0 if found and 0 if NOT found
+        """
+        index = self.owner_of(word)
+        return self.call(index, 'search', word) if index >= 0 else 0
+
+    def add_word_frequency(self, word_frequency: WordFrequency) -> bool:
+        """
+        add a word and its frequency to the dictionary
+        @param word_frequency: (word, frequency) to be added
+        :return: True whether succeeded, False when word is already in the dictionary
+        """
+        index = self.shard_of(word_frequency.word)
+        if self.call(index, 'add_word_frequency', word_frequency):
+            self.sizes[index] += 1
+            return True
+        return False
+
+    def delete_word(self, word: str) -> bool:
+        """
+        delete a word from the dictionary
+        @param word: word to be deleted
+        @return: whether succeeded, e.g. return False when point not found
+        """
+        index = self.owner_of(word)
+        if index >= 0 and self.call(index, 'delete_word', word):
+            self.sizes[index] -= 1
+            return True
+        return False
+
+    def increment(self, word: str, delta: int = 1) -> int:
+        """
+        add delta to the frequency of a word, adding the word with frequency delta if it is not in the dictionary
+        @param word: the word to be updated
+        @param delta: change of the frequency, a word whose frequency drops to 0 or below is deleted
+        @return: the new frequency, 0 if the word is not (or no longer) in the dictionary
+        """
+        if delta <= 0:
+            # Only removes a word, so a letter without a shard is not placed.
+            index = self.owner_of(word)
+            if index < 0 or self.call(index, 'search', word) == 0:
+                return 0
+            frequency = self.call(index, 'increment', word, delta)
+            if frequency == 0:
+                self.sizes[index] -= 1
+            return frequency
+        index = self.shard_of(word)
+        frequency = self.call(index, 'increment', word, delta)
+        # Stored frequencies are above 0, so only a new word ends up at delta.
+        if frequency == delta:
+            self.sizes[index] += 1
+        return frequency
+
+    def upsert(self, word_frequency: WordFrequency) -> bool:
+        """
+        set the frequency of a word, adding the word if it is not in the dictionary
+        @param word_frequency: (word, frequency) to be stored
+        @return: True if the word was added, False if its frequency was updated (or the word is empty)
+        """
+        index = self.shard_of(word_frequency.word)
+        if self.call(index, 'upsert', word_frequency):
+            self.sizes[index] += 1
+            return True
+        return False
+
+    def owner_of_prefix(self, prefix_word: str) -> int:
+        """
+        @return: index of the only shard that can hold words with the prefix, None if every shard can,
+                 -1 if none can
+        """
+        if self.partition == 'hash' or prefix_word == '':
+            return None
+        return self.owners.get(prefix_word[0], -1)
+
+    def autocomplete(self, prefix_word: str) -> [WordFrequency]:
+        """
+        return a list of 3 most-frequent words in the dictionary that have 'prefix_word' as a prefix
+        @param prefix_word: word to be autocompleted
+        @return: a list (could be empty) of (at most) 3 most-frequent words with prefix 'prefix_word'
+        """
+        owner = self.owner_of_prefix(prefix_word)
+        if owner is None:
+            return merge_completions(self.call_all([(index, 'autocomplete', (prefix_word,))
+                                                    for index in range(len(self.shards))]))
+        return self.call(owner, 'autocomplete', prefix_word) if owner >= 0 else []
+
+    def search_many(self, words: [str]) -> [int]:
+        """
+        search for a batch of words, each shard searching its own words in a single call
+        @param words: the words to be searched
+        @return: for each word, frequency > 0 if found and 0 if NOT found
+        """
+        parts = {}
+        found = {}
+        for word in dict.fromkeys(words):
+            index = self.owner_of(word)
+            if index >= 0:
+                parts.setdefault(index, []).append(word)
+            else:
+                found[word] = 0
+        for part, frequencies in zip(parts.values(),
+                                     self.call_all([(index, 'search_many', (part,)) for index, part in parts.items()])):
+            found.update(zip(part, frequencies))
+        return [found[word] for word in words]
+
+    def autocomplete_many(self, prefix_words: [str]) -> [[WordFrequency]]:
+        """
+        autocomplete a batch of prefixes, each shard autocompleting its own prefixes in a single call
+        @param prefix_words: words to be autocompleted
+        @return: for each prefix, the list autocomplete would return
+        """
+        parts = {index: [] for index in range(len(self.shards))}
+        fan_outs = []
+        completions = {}
+        for prefix_word in dict.fromkeys(prefix_words):
+            owner = self.owner_of_prefix(prefix_word)
+            if owner is None:
+                fan_outs.append(prefix_word)
+            elif owner >= 0:
+                parts[owner].append(prefix_word)
+            else:
+                completions[prefix_word] = []
+        # Every shard also autocompletes the fanned out prefixes, merged once all shards have answered.
+        calls = [(index, 'autocomplete_many', (part + fan_outs,)) for index, part in parts.items() if part or fan_outs]
+        results = self.call_all(calls)
+        for (index, _, _), lists_words in zip(calls, results):
+            completions.update(zip(parts[index], lists_words))
+        for position, prefix_word in enumerate(fan_outs):
+            completions[prefix_word] = merge_completions(
+                [lists_words[len(parts[index]) + position] for (index, _, _), lists_words in zip(calls, results)])
+        return [completions[prefix_word] for prefix_word in prefix_words]
+
+    def items(self):
+        """
+        @return: iterator over the (word, frequency) pairs stored, shard by shard
+        """
+        if not self.workers:
+            return (pair for shard in self.shards for pair in shard.items())
+        return (pair for pairs in self.call_all([(index, 'items', ()) for index in range(len(self.shards))])
+                for pair in pairs)
+
+    def close(self) -> None:
+        """
+        stop the worker processes, the dictionary cannot be used afterwards
+        """
+        if self.workers:
+            for shard in self.shards:
+                shard.close()
+            self.shards = []
+
+
+def merge_completions(lists_words: [[WordFrequency]]) -> [WordFrequency]:
+    """
+    @return: the 3 most frequent words of the completions of several shards, ties in shard order
+    """
+    # Stable, so equal frequencies keep the order of the shards and of their own lists.
+    return sorted((word_frequency for list_words in lists_words for word_frequency in list_words),
+                  key=lambda wf: wf.frequency, reverse=True)[:3]
@@ -0,0 +1,147 @@
+from array import array
+import struct
+import sys
+
+from dictionary.extended_dictionary import ExtendedDictionary
+from dictionary.word_frequency import WordFrequency
+from dictionary.node import Node
+from dictionary.loader import paused_gc
+from dictionary.ternarysearchtree_dictionary import TernarySearchTreeDictionary
+from dictionary.array_ternarysearchtree_dictionary import ArrayTernarySearchTreeDictionary
+
+
+# ------------------------------------------------------------------------
+# Binary snapshots of built dictionaries.
+# A snapshot is a fixed header followed by raw little-endian arrays:
+#   WORDS: frequencies ('q' per word), then the words joined by '\n' as UTF-8.
+#   NODES: letters ('I'), lefts, middles, rights ('i'), frequencies ('q') and end flags ('b') of every
+#          node, index 0 being the null sentinel, then the free node indices ('i') of an array TST.
+# Loading reads the file once and never re-inserts: arrays are filled straight from the bytes.
+# ------------------------------------------------------------------------
+
+MAGIC = b'DICTSNAP'
+VERSION = 1
+WORDS, NODES = 0, 1
+# magic, version, kind, number of words or nodes (sentinel included), root node index
+HEADER = struct.Struct('<8sBBxxQQ')
+
+
+def to_little_endian(values: array) -> bytes:
+    if sys.byteorder == 'big':
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def from_little_endian(typecode: str, data: memoryview) -> array:
+    values = array(typecode)
+    values.frombytes(data)
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return values
+
+
+def save_snapshot(dictionary: ExtendedDictionary, filename: str) -> None:
+    """
+    write a built dictionary to a snapshot file
+    @param dictionary: tst or array tst dictionary, saved as nodes, or any other dictionary, saved as a word list
+    @param filename: snapshot file to be written
+    """
+    if isinstance(dictionary, TernarySearchTreeDictionary):
+        arrays = flatten_tree(dictionary.root_)
+        # Breadth-first numbering puts the root at index 1.
+        write_snapshot(filename, NODES, len(arrays[0]), 1 if len(arrays[0]) > 1 else 0, arrays)
+    elif isinstance(dictionary, ArrayTernarySearchTreeDictionary):
+        arrays = [dictionary.letters, dictionary.lefts, dictionary.middles, dictionary.rights,
+                  dictionary.frequencies, dictionary.end_words, array('i', dictionary.free_nodes)]
+        write_snapshot(filename, NODES, len(arrays[0]), dictionary.root_, arrays)
+    else:
+        pairs = list(dictionary.items())
+        frequencies = array('q', [frequency for _, frequency in pairs])
+        words = '\n'.join(word for word, _ in pairs).encode()
+        write_snapshot(filename, WORDS, len(pairs), 0, [frequencies, words])
+
+
+def write_snapshot(filename: str, kind: int, count: int, root: int, chunks: list) -> None:
+    with open(filename, 'wb') as snapshot_file:
+        snapshot_file.write(HEADER.pack(MAGIC, VERSION, kind, count, root))
+        for chunk in chunks:
+            snapshot_file.write(to_little_endian(chunk) if isinstance(chunk, array) else chunk)
+
+
+def flatten_tree(root: Node) -> [array]:
+    """
+    number the nodes of a pointer tree breadth-first and lay them out as arrays
+    @return: letters, lefts, middles, rights, frequencies, end flags and an empty free list
+    """
+    letters, lefts, middles, rights = array('I', [0]), array('i', [0]), array('i', [0]), array('i', [0])
+    frequencies, end_words = array('q', [0]), array('b', [0])
+    nodes = [None, root] if root is not None else [None]
+    index = 1
+    while index < len(nodes):
+        curr = nodes[index]
+        index += 1
+        letters.append(ord(curr.letter))
+        frequencies.append(curr.frequency if curr.end_word else 0)
+        end_words.append(1 if curr.end_word else 0)
+        # Children get the next free numbers, so they are laid out after their parent.
+        for child, links in ((curr.left, lefts), (curr.middle, middles), (curr.right, rights)):
+            if child is None:
+                links.append(0)
+            else:
+                nodes.append(child)
+                links.append(len(nodes) - 1)
+    return [letters, lefts, middles, rights, frequencies, end_words, array('i')]
+
+
+def load_snapshot(dictionary: ExtendedDictionary, filename: str) -> ExtendedDictionary:
+    """
+    fill an empty dictionary from a snapshot file
+    @param dictionary: empty dictionary, configured as wanted (e.g. top_k or compact)
+    @param filename: snapshot file to be read
+    @return: the filled dictionary
+    """
+    with open(filename, 'rb') as snapshot_file:
+        data = memoryview(snapshot_file.read())
+    if len(data) < HEADER.size:
+        raise ValueError(f"'{filename}' is not a dictionary snapshot")
+    magic, version, kind, count, root = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"'{filename}' is not a dictionary snapshot")
+    offset = HEADER.size
+
+    if kind == WORDS:
+        frequencies = from_little_endian('q', data[offset:offset + 8 * count])
+        words = str(data[offset + 8 * count:], 'utf-8').split('\n') if count else []
+        if isinstance(dictionary, (TernarySearchTreeDictionary, ArrayTernarySearchTreeDictionary)):
+            raise ValueError(f"'{filename}' holds a word list, not a tree")
+        dictionary.build_dictionary(map(WordFrequency, words, frequencies))
+        return dictionary
+
+    arrays = list()
+    for typecode in ('I', 'i', 'i', 'i', 'q', 'b'):
+        size = array(typecode).itemsize * count
+        arrays.append(from_little_endian(typecode, data[offset:offset + size]))
+        offset += size
+    free_nodes = from_little_endian('i', data[offset:])
+    letters, lefts, middles, rights, frequencies, end_words = arrays
+
+    if isinstance(dictionary, ArrayTernarySearchTreeDictionary):
+        dictionary.root_ = root
+        dictionary.letters, dictionary.lefts, dictionary.middles, dictionary.rights = letters, lefts, middles, rights
+        dictionary.frequencies, dictionary.end_words = frequencies, end_words
+        dictionary.free_nodes = free_nodes.tolist()
+    elif isinstance(dictionary, TernarySearchTreeDictionary):
+        # Create every node, then link them by index; nodes[0] stands for a missing child.
+        with paused_gc():
+            nodes = [None] + [Node(chr(letters[i]), frequencies[i] if end_words[i] else None, end_words[i] == 1)
+                              for i in range(1, count)]
+            for i in range(1, count):
+                curr = nodes[i]
+                curr.left, curr.middle, curr.right = nodes[lefts[i]], nodes[middles[i]], nodes[rights[i]]
+        dictionary.root_ = nodes[root]
+        if dictionary.cache_k:
+            dictionary.rebuild_top_k()
+    else:
+        raise ValueError(f"'{filename}' holds a tree, not a word list")
+    return dictionary
@@ -1,11 +1,14 @@
 from treelib import Node, Tree
 from termcolor import colored as c, cprint
+import bisect
+import heapq
 import inspect
-import time
-
-from dictionary.base_dictionary import BaseDictionary
+from dictionary.extended_dictionary import ExtendedDictionary
 from dictionary.word_frequency import WordFrequency
 from dictionary.node import Node
+from dictionary.prefix_index import LAST_CHAR
+from dictionary.instrumentation import instrumented
+from dictionary.vocabulary_index import VocabularyIndex
 
 
 # ------------------------------------------------------------------------
@@ -15,88 +18,135 @@ from dictionary.node import Node
 # __copyright__ = 'Copyright 2022, RMIT University'
 # ------------------------------------------------------------------------
 
-def log_computation_time(func):
-    def wrapper(*args, **kwargs):
-        start = time.perf_counter()
-        result = func(*args, **kwargs)
-        end = time.perf_counter()
-        cprint(f"{c(' TST ', 'cyan', attrs=['bold', 'reverse'])} {c('Computation time', 'magenta')} of"
-               f" '{c(func.__name__, 'yellow')}': {c(str(end - start), 'green')}", attrs=['bold'])
-        return result
-    return wrapper
-
+class TernarySearchTreeDictionary(ExtendedDictionary):
+    __slots__ = 'root_', 'top_k', 'cache_k', 'vocabulary'
 
-class TernarySearchTreeDictionary(BaseDictionary):
-    __slots__ = 'root_'
-
-    def __init__(self):
+    def __init__(self, top_k: int = None):
         self.root_ = None
-
-    # @log_computation_time
+        # When set, every node caches the top_k best (word, frequency) pairs of its subtree so that
+        # autocomplete only walks the prefix. None keeps the original full subtree enumeration.
+        # autocomplete still answers 3 words, so the caches must hold at least that many.
+        if top_k is not None and top_k < 3:
+            raise ValueError(f'top_k must be at least 3, got {top_k}')
+        self.top_k = top_k
+        # Size of the per-node caches kept up to date by the writes, 0 while there are none: top_k, or 3 once
+        # fuzzy_autocomplete has built them in the default mode.
+        self.cache_k = top_k or 0
+        # Word ids and frequencies answering search_batch, None until the first batch.
+        self.vocabulary = None
+
+    @instrumented()
     def build_dictionary(self, words_frequencies: [WordFrequency]):
         """
         construct the data structure to store nodes
         @param words_frequencies: list of (word, frequency) to be stored
         """
+        # Words added to a tree that already holds words are inserted one by one.
+        if self.root_ is not None:
+            for word_frequency in words_frequencies:
+                self.add_word_frequency(word_frequency)
+            return
+        # Dedupe in a single pass, the first occurrence wins as it would with add_word_frequency.
+        frequencies = dict()
         for word_frequency in words_frequencies:
-            self.add_word_frequency(word_frequency)
+            if word_frequency.word != '':
+                frequencies.setdefault(word_frequency.word, word_frequency.frequency)
+        words = sorted(frequencies)
+        self.root_ = self.build_balanced(words, frequencies, 0, len(words), 0)
+        self.vocabulary = None
 
         # self.print_tree(self.root_)
 
-    # @log_computation_time
-    def search(self, word: str, return_node=False, return_parent=False) -> int:
+    def build_balanced(self, words: [str], frequencies: dict, start: int, end: int, depth: int) -> Node:
+        """
+        build a balanced subtree from sorted words sharing their first 'depth' letters
+        @param words: sorted unique words
+        @param frequencies: frequency of every word
+        @param start: first index of the words to be stored, inclusive
+        @param end: last index of the words to be stored, exclusive
+        @param depth: number of letters already consumed, every word in the range is longer than this
+        @return: root of the subtree, None if the range is empty
+        """
+        if start >= end:
+            return None
+        # The letter of the median word becomes the root, so both sides hold about half of the words.
+        prefix = words[(start + end) // 2][:depth + 1]
+        low = bisect.bisect_left(words, prefix, start, end)
+        high = bisect.bisect_left(words, prefix + LAST_CHAR, low, end)
+        curr = Node(prefix[-1])
+        # Empty ranges are skipped here rather than in the callee, most children are empty.
+        if start < low:
+            curr.left = self.build_balanced(words, frequencies, start, low, depth)
+        # The shortest word of the letter's range may end right here.
+        if words[low] == prefix:
+            curr.frequency = frequencies[prefix]
+            curr.end_word = True
+            low += 1
+        if low < high:
+            curr.middle = self.build_balanced(words, frequencies, low, high, depth + 1)
+        if high < end:
+            curr.right = self.build_balanced(words, frequencies, high, end, depth)
+        if self.cache_k:
+            self.merge_top_k(curr, prefix)
+        return curr
+
+    @instrumented('nodes visited', lambda self, word: self.nodes_visited(word))
+    def search(self, word: str) -> int:
         """
         search for a word
         @param word: the word to be searched
         @return: frequency > 0 if found and 0 if NOT found
         """
+        curr = self.find_node(word)
+        if curr is not None and curr.end_word:
+            return curr.frequency
+        return 0
+
+    def find_node(self, word: str) -> Node:
+        """
+        find the node holding the last letter of a word, whether or not a word ends there
+        @param word: the word (or prefix) to be searched
+        @return: the node, None if the tree has no such path
+        """
+        if word == '':
+            return None
         curr = self.root_
-        parent = None
-        # Return 0 if the tree or word is empty.
-        if self.root_ is None or word == '':
-            return 0
-        dict_word = ''
+        last_index = len(word) - 1
         letter_index = 0
-        letter = word[letter_index]
-
-        # Search for the word.
+        letter = word[0]
+        # Walk by letter index only, the word itself is never rebuilt.
         while curr is not None:
-            # If the current letter is the same as the word, add it to the dictionary word and explore middle.
-            if letter == curr.letter:
-                dict_word += letter
-                # If the word has been built, return the frequency.
-                if dict_word == word and (curr.end_word if not return_node else True):
-                    return curr.frequency if not return_node else (curr.frequency, curr) \
-                        if not return_parent else (curr.frequency, curr, parent)
-                letter_index += 1
-                try:
-                    letter = word[letter_index]
-                except IndexError:
-                    return 0
-                parent = curr
-                curr = curr.middle
-            # If the letter is smaller than the current letter, go left.
-            elif letter < curr.letter:
-                parent = curr
+            if letter < curr.letter:
                 curr = curr.left
-            # If the letter is greater than the current letter, go right.
             elif letter > curr.letter:
-                parent = curr
                 curr = curr.right
+            elif letter_index == last_index:
+                return curr
+            else:
+                letter_index += 1
+                letter = word[letter_index]
+                curr = curr.middle
+        return None
 
-        return 0
-
+    @instrumented('nodes visited', lambda self, word_frequency: self.nodes_visited(word_frequency.word))
     def add_word_frequency(self, word_frequency: WordFrequency) -> bool:
         """
         add a word and its frequency to the dictionary
         @param word_frequency: (word, frequency) to be added
         :return: True whether succeeded, False when word is already in the dictionary
         """
-        word = word_frequency.word
-        frequency = word_frequency.frequency
         # Return False if the word is already in the tree.
         if self.search(word_frequency.word) > 0:
             return False
+        self.insert_word(word_frequency.word, word_frequency.frequency)
+        return True
+
+    def insert_word(self, word: str, frequency: int) -> None:
+        """
+        insert a word that is not in the tree, creating the nodes missing from its path
+        @param word: the word to be inserted
+        @param frequency: its frequency
+        """
         letter_index = 0
         # If the tree is empty; else if the tree is not empty.
         if self.root_ is None:
@@ -144,80 +194,153 @@ class TernarySearchTreeDictionary(BaseDictionary):
             current = Node(letter) if i < (len(word) - 1) else Node(letter=letter, frequency=frequency, end_word=True)
             parent.middle = current
             parent = current
-        return True
-
-    # @log_computation_time
-    def delete_word(self, word: str) -> bool:
+        # Offer the new word to the cached top-k of every node on its path.
+        if self.cache_k:
+            self.offer_top_k(word, frequency)
+        if self.vocabulary is not None:
+            self.vocabulary.set(word, frequency)
+
+    @instrumented('nodes visited', lambda self, word, delta=1: self.nodes_visited(word))
+    def increment(self, word: str, delta: int = 1) -> int:
         """
-        delete a word from the dictionary
-        @param word: word to be deleted
-        @return: whether succeeded, e.g. return False when point not found
+        add delta to the frequency of a word, adding the word with frequency delta if it is not in the dictionary
+        @param word: the word to be updated
+        @param delta: change of the frequency, a word whose frequency drops to 0 or below is deleted
+        @return: the new frequency, 0 if the word is not (or no longer) in the dictionary
         """
-        # Recursive Implementation. We need to delete end nodes that are not part of another word.
-        # We will begin at the start of the word, and recursively look for the correct child node.
-        # We cull this node if the child recursive call returns True, and this node has no other children.
+        if word == '':
+            return 0
+        curr, path = self.word_path(word)
+        if curr is None or not curr.end_word:
+            # Not in the tree: only a positive delta adds it.
+            if delta <= 0:
+                return 0
+            self.insert_word(word, delta)
+            return delta
+        frequency = curr.frequency + delta
+        if frequency <= 0:
+            self.delete_word(word)
+            return 0
+        self.update_frequency(path, word, frequency)
+        return frequency
 
-        return_value = False
+    @instrumented('nodes visited', lambda self, word_frequency: self.nodes_visited(word_frequency.word))
+    def upsert(self, word_frequency: WordFrequency) -> bool:
+        """
+        set the frequency of a word, adding the word if it is not in the dictionary
+        @param word_frequency: (word, frequency) to be stored
+        @return: True if the word was added, False if its frequency was updated (or the word is empty)
+        """
+        word = word_frequency.word
         if word == '':
             return False
-
-        def _delete_word(curr: Node, parent: Node, letters) -> bool:
-            nonlocal return_value
-            # If this node is empty, it counts as deleted.
-            if curr is None:
-                return True
-            # If node is not empty and string is empty, not deleted.
-            if letters == "":
-                return False
-                # If this node is valid to be deleted
-            valid = True
-            # if this node is th next part of the word
-            if curr.letter == letters[0]:
-                if len(letters) == 1:
-                    curr.end_word = False
-                    return_value = True
-                    valid = _delete_word(curr.middle, curr, "")
-                else:
-                    # Try to delete middle
-                    valid = _delete_word(curr.middle, curr, letters[1:])
-                if valid:
-                    curr.middle = None
+        curr, path = self.word_path(word)
+        if curr is None or not curr.end_word:
+            self.insert_word(word, word_frequency.frequency)
+            return True
+        self.update_frequency(path, word, word_frequency.frequency)
+        return False
+
+    def word_path(self, word: str) -> (Node, [(Node, Node, int)]):
+        """
+        walk a non-empty word from the root
+        @param word: the word to be walked
+        @return: (node holding the last letter of the word or None if the tree has no such path,
+                  visited (node, parent, index of the node's letter in the word) from the root down)
+        """
+        path = list()
+        parent = None
+        curr = self.root_
+        last_index = len(word) - 1
+        letter_index = 0
+        letter = word[0]
+        while curr is not None:
+            path.append((curr, parent, letter_index))
+            if letter < curr.letter:
+                parent, curr = curr, curr.left
+            elif letter > curr.letter:
+                parent, curr = curr, curr.right
+            elif letter_index == last_index:
+                break
             else:
-                valid = False
+                letter_index += 1
+                letter = word[letter_index]
+                parent, curr = curr, curr.middle
+        return curr, path
 
-            if _delete_word(curr.left, curr, letters):
-                curr.left = None
-            else:
-                valid = False
-            if _delete_word(curr.right, curr, letters):
-                curr.right = None
-            else:
-                valid = False
-
-            # if L,M,R all deleted or None and this is part of word
-            if valid:
-                if parent.middle == curr:
-                    parent.middle = None
-                elif parent.left == curr:
-                    parent.left = None
-                elif parent.right == curr:
-                    parent.right = None
-                # set global success to True
-                return_value = True
-                return True
+    def update_frequency(self, path: [(Node, Node, int)], word: str, frequency: int) -> None:
+        """
+        change the frequency of a word in place, keeping the cached top-k of its path up to date
+        @param path: path of the word as returned by word_path
+        @param word: word stored at the last node of the path
+        @param frequency: its new frequency
+        """
+        curr = path[-1][0]
+        entry = (-curr.frequency, word)
+        curr.frequency = frequency
+        if self.vocabulary is not None:
+            self.vocabulary.set(word, frequency)
+        if not self.cache_k:
+            return
+        new_entry = (-frequency, word)
+        # Bottom-up; a node whose cache neither holds nor admits the word has ancestors in the same situation.
+        for node, _, letter_index in reversed(path):
+            best = node.best
+            if entry in best:
+                if new_entry < entry or len(best) < self.cache_k:
+                    # Higher frequency, or every word below fits: the word stays in, at a new place.
+                    best[best.index(entry)] = new_entry
+                    best.sort()
+                else:
+                    # Lower frequency: a word that did not make it may now rank before it.
+                    self.merge_top_k(node, word[:letter_index] + node.letter)
+            elif new_entry < best[-1]:
+                bisect.insort(best, new_entry)
+                del best[self.cache_k:]
             else:
-                return False
+                break
 
-        try:
-            _, start_node, start_parent = self.search(word[0], return_node=True, return_parent=True)
-        except TypeError:
+    @instrumented('nodes visited', lambda self, word: self.nodes_visited(word))
+    def delete_word(self, word: str) -> bool:
+        """
+        delete a word from the dictionary
+        @param word: word to be deleted
+        @return: whether succeeded, e.g. return False when point not found
+        """
+        if word == '':
             return False
-        if start_node is None:
+        # Walk the word once, recording the path.
+        curr, path = self.word_path(word)
+        if curr is None or not curr.end_word:
             return False
-        _delete_word(start_node, start_parent, word)
-        return return_value
+        entry = (-curr.frequency, word)
+        curr.end_word = False
+        curr.frequency = None
+        if self.vocabulary is not None:
+            self.vocabulary.remove(word)
+
+        # Prune bottom-up along the path only; stop at the first node that is still needed.
+        while path:
+            node, parent, _ = path[-1]
+            if node.end_word or node.middle is not None or (node.left is not None and node.right is not None):
+                break
+            # A node without a word below it is replaced by its only sibling subtree, if any.
+            replacement = node.left if node.left is not None else node.right
+            if parent is None:
+                self.root_ = replacement
+            elif parent.left is node:
+                parent.left = replacement
+            elif parent.middle is node:
+                parent.middle = replacement
+            else:
+                parent.right = replacement
+            path.pop()
+        # Drop the word from the cached top-k of the nodes left on its path.
+        if self.cache_k:
+            self.discard_top_k(path, word, entry)
+        return True
 
-    # @log_computation_time
+    @instrumented('nodes visited', lambda self, word: self.nodes_visited(word, self.top_k is None))
     def autocomplete(self, word: str) -> [WordFrequency]:
         """
         return a list of 3 most-frequent words in the dictionary that have 'word' as a prefix
@@ -228,12 +351,16 @@ class TernarySearchTreeDictionary(BaseDictionary):
         # Return if word is empty.
         if word == str():
             return return_list
-        # Search for the prefix
-        try:
-            _, prefixes_suffix = self.search(word, return_node=True)
-        # Return if prefix not found.
-        except TypeError:
+        # Search for the prefix, return if it is not found.
+        prefixes_suffix = self.find_node(word)
+        if prefixes_suffix is None:
             return return_list
+        # Read the cached top-k of the prefix node instead of enumerating its subtree.
+        if self.top_k:
+            candidates = list(prefixes_suffix.middle.best) if prefixes_suffix.middle is not None else []
+            if prefixes_suffix.end_word:
+                candidates.append((-prefixes_suffix.frequency, word))
+            return [WordFrequency(w, -f) for f, w in heapq.nsmallest(3, candidates)]
         # If prefix is a word itself, add it to the list.
         if prefixes_suffix.end_word:
             return_list.append(WordFrequency(word, prefixes_suffix.frequency))
@@ -256,9 +383,281 @@ class TernarySearchTreeDictionary(BaseDictionary):
         return_list.sort(key=lambda x: x.frequency, reverse=True)
         return return_list[:3]
 
+    @instrumented()
+    def search_batch(self, words: [str]):
+        """
+        search for a batch of words with NumPy
+        @param words: sequence of words to be searched
+        @return: numpy.ndarray of int64, for each word frequency > 0 if found and 0 if NOT found
+        """
+        # The vocabulary index is built by the first batch, then kept up to date by every write.
+        if self.vocabulary is None:
+            self.vocabulary = VocabularyIndex(self.items())
+        return self.vocabulary.search_batch(words)
+
+    def fuzzy_autocomplete(self, prefix_word: str, max_edits: int = 1) -> [WordFrequency]:
+        """
+        return the most-frequent words that start with a prefix within 'max_edits' edits of 'prefix_word'
+        @param prefix_word: possibly mistyped word to be autocompleted
+        @param max_edits: maximum Levenshtein distance between 'prefix_word' and a prefix of the returned words
+        @return: a list (could be empty) of (at most) 3, or top_k, words ranked by edit distance, then frequency
+        """
+        if prefix_word == '' or self.root_ is None:
+            return []
+        # The cached best words bound the frequencies below a node. Without top-k mode the first fuzzy query
+        # builds them, and the writes keep them up to date from then on.
+        if not self.cache_k:
+            self.cache_k = 3
+            self.rebuild_top_k()
+        k = self.top_k or 3
+        # A word is ranked by (distance, -frequency, word), its distance being the smallest over all its prefixes.
+        keys = dict()
+        top = list()  # the k best keys found so far, sorted
+
+        def offer(word: str, frequency: int, distance: int) -> None:
+            key = (distance, -frequency, word)
+            old_key = keys.get(word)
+            if old_key is not None and old_key <= key:
+                return
+            keys[word] = key
+            if old_key in top:
+                top.remove(old_key)
+            if len(top) < k or key < top[-1]:
+                bisect.insort(top, key)
+                del top[k:]
+
+        def highest_frequency(node: Node):
+            return -node.best[0][0] if node.best else 0
+
+        # Best-first search over entries (bound, counter, node, prefix above the node, Levenshtein row of that
+        # prefix, distance of that prefix), where row[i] is the edit distance between prefix_word[:i] and the
+        # prefix. An entry stands for the node and its left and right siblings, which all extend the same prefix.
+        # No word below an entry ranks better than its bound (lowest distance, -highest frequency).
+        # Distances beyond max_edits all behave alike, so they are capped, and only the cells within max_edits
+        # of the diagonal are computed, the others being over the bound anyway.
+        cap = max_edits + 1
+        last_index = len(prefix_word)
+        first_row = [min(i, cap) for i in range(last_index + 1)]
+        counter = 0
+        heap = [((0, -highest_frequency(self.root_)), counter, self.root_, '', first_row, first_row[-1])]
+        while heap:
+            bound, _, curr, prefix, row, distance = heapq.heappop(heap)
+            # Once k words are found, the remaining entries can only hold words ranking after them.
+            if len(top) == k and bound > top[-1][:2]:
+                break
+            if bound[0] < max_edits:
+                # An edit is still available for any letter, so every sibling is visited.
+                for sibling in (curr.left, curr.right):
+                    if sibling is not None:
+                        counter += 1
+                        heapq.heappush(heap, ((bound[0], -highest_frequency(sibling)), counter,
+                                              sibling, prefix, row, distance))
+                level = (curr,)
+            else:
+                # Every edit is spent: only letters extending an exact match along the diagonal stay within
+                # the bound, and they are looked up among the siblings instead of visiting all of them.
+                level = list()
+                for letter in {prefix_word[i] for i in range(last_index) if row[i] == max_edits}:
+                    node = curr
+                    while node is not None and node.letter != letter:
+                        node = node.left if letter < node.letter else node.right
+                    if node is not None:
+                        level.append(node)
+            depth = len(prefix) + 1
+            for node in level:
+                letter = node.letter
+                node_row = [cap] * (last_index + 1)
+                if depth <= max_edits:
+                    node_row[0] = depth
+                for i in range(max(1, depth - max_edits), min(last_index, depth + max_edits) + 1):
+                    node_row[i] = min(node_row[i - 1] + 1, row[i] + 1, row[i - 1] + (prefix_word[i - 1] != letter),
+                                      cap)
+                node_distance = min(distance, node_row[-1])
+                if node.end_word and node_distance <= max_edits:
+                    offer(prefix + letter, node.frequency, node_distance)
+                if node.middle is None:
+                    continue
+                # Rows only grow with longer prefixes, so their distance never drops below the row minimum.
+                lowest = min(node_distance, min(node_row))
+                if lowest > max_edits:
+                    continue
+                if lowest == node_distance:
+                    # No longer prefix gets closer, every word below is at this distance: the cached best words
+                    # of the subtree are enough, as any other word ranks after k of them.
+                    for negative_frequency, word in node.middle.best:
+                        offer(word, -negative_frequency, node_distance)
+                    continue
+                counter += 1
+                heapq.heappush(heap, ((lowest, -highest_frequency(node.middle)), counter,
+                                      node.middle, prefix + letter, node_row, node_distance))
+        return [WordFrequency(word, -negative_frequency) for _, negative_frequency, word in top]
+
+    def offer_top_k(self, word: str, frequency: int) -> None:
+        """
+        insert a word into the cached top-k of every node on its path
+        @param word: word that has been added to the tree
+        @param frequency: frequency of the word
+        """
+        entry = (-frequency, word)
+        curr = self.root_
+        letter_index = 0
+        while curr is not None:
+            best = curr.best
+            # Entries are kept sorted, highest frequency first and ties broken alphabetically.
+            if best is None:
+                curr.best = [entry]
+            elif len(best) < self.cache_k or entry < best[-1]:
+                bisect.insort(best, entry)
+                del best[self.cache_k:]
+            letter = word[letter_index]
+            if letter < curr.letter:
+                curr = curr.left
+            elif letter > curr.letter:
+                curr = curr.right
+            else:
+                letter_index += 1
+                if letter_index == len(word):
+                    return
+                curr = curr.middle
+
+    def discard_top_k(self, path: [(Node, Node, int)], word: str, entry: (int, str)) -> None:
+        """
+        remove a deleted word from the cached top-k of the nodes on its path
+        @param path: surviving (node, parent, letter index) of the word path, from the root down
+        @param word: word that has been deleted
+        @param entry: cached (-frequency, word) pair of the deleted word
+        """
+        # A node caching the word lies below every node on the path that does not, so the caches are
+        # recomputed bottom-up, children first, until the first node that never held the word.
+        for node, _, letter_index in reversed(path):
+            if node.best is None or entry not in node.best:
+                break
+            self.merge_top_k(node, word[:letter_index] + node.letter)
+
+    def merge_top_k(self, n: Node, node_word: str) -> None:
+        """
+        recompute the cached top-k of a node from its children's caches
+        @param n: node to recompute
+        @param node_word: word that ends at this node
+        """
+        candidates = list()
+        for child in (n.left, n.middle, n.right):
+            if child is not None and child.best:
+                candidates.extend(child.best)
+        if n.end_word:
+            candidates.append((-n.frequency, node_word))
+        n.best = heapq.nsmallest(self.cache_k, candidates)
+
+    def rebuild_top_k(self) -> None:
+        """
+        recompute the cached top-k of every node, e.g. after the tree was loaded from a snapshot
+        """
+        # Breadth-first order puts every child after its parent, so walking it backwards merges children first.
+        order = [(self.root_, '')] if self.root_ is not None else []
+        for curr, prefix in order:
+            if curr.left is not None:
+                order.append((curr.left, prefix))
+            if curr.middle is not None:
+                order.append((curr.middle, prefix + curr.letter))
+            if curr.right is not None:
+                order.append((curr.right, prefix))
+        for curr, prefix in reversed(order):
+            self.merge_top_k(curr, prefix + curr.letter)
+
+    def items(self):
+        """
+        @return: iterator over the (word, frequency) pairs stored, in lexicographic order
+        """
+        return self.subtree_items(self.root_, '')
+
+    def subtree_items(self, root: Node, prefix: str):
+        """
+        @param root: root of the subtree
+        @param prefix: word spelled by the nodes above the subtree
+        @return: iterator over the (word, frequency) pairs stored in the subtree, in lexicographic order
+        """
+        # Entries are (node, prefix) to expand, or (None, (word, frequency)) to emit.
+        stack = [(root, prefix)] if root is not None else []
+        while stack:
+            curr, value = stack.pop()
+            if curr is None:
+                yield value
+                continue
+            # In-order: left, the word ending here, middle, right.
+            if curr.right is not None:
+                stack.append((curr.right, value))
+            if curr.middle is not None:
+                stack.append((curr.middle, value + curr.letter))
+            if curr.end_word:
+                stack.append((None, (value + curr.letter, curr.frequency)))
+            if curr.left is not None:
+                stack.append((curr.left, value))
+
+    def nodes_visited(self, word: str, subtree: bool = False) -> int:
+        """
+        count the nodes visited by a walk down a word, the instrumentation probe of the tree operations
+        @param word: the word (or prefix) to be walked
+        @param subtree: also count the nodes below the end of the word, as enumerating its completions does; the
+                        count walks the subtree once more, so an instrumented enumerating autocomplete takes about
+                        twice as long (the probe is outside the timing, the recorded latency is unaffected)
+        @return: number of nodes visited
+        """
+        visited = 0
+        curr = self.root_
+        letter_index = 0
+        while curr is not None and letter_index < len(word):
+            visited += 1
+            letter = word[letter_index]
+            if letter < curr.letter:
+                curr = curr.left
+            elif letter > curr.letter:
+                curr = curr.right
+            elif letter_index == len(word) - 1:
+                if subtree:
+                    visited += sum(1 for _ in self.subtree_nodes(curr.middle))
+                break
+            else:
+                letter_index += 1
+                curr = curr.middle
+        return visited
+
     @staticmethod
-    def dead_child(n: Node) -> bool:
-        return n.left is None and n.right is None and n.middle is None and n.frequency is None and n.end_word is False
+    def subtree_nodes(root: Node):
+        """
+        @return: iterator over the nodes of a subtree, in no particular order
+        """
+        stack = [root] if root is not None else []
+        while stack:
+            curr = stack.pop()
+            yield curr
+            stack.extend(child for child in (curr.left, curr.middle, curr.right) if child is not None)
+
+    def shape_statistics(self) -> dict:
+        """
+        measure the shape of the tree
+        @return: node count, word count, height and the number of nodes visited to reach each word
+        """
+        nodes, words, height, total_search_depth, max_search_depth = 0, 0, 0, 0, 0
+        stack = [(self.root_, 1)] if self.root_ is not None else []
+        while stack:
+            curr, depth = stack.pop()
+            nodes += 1
+            height = max(height, depth)
+            # Reaching a word visits every node from the root down to its last letter.
+            if curr.end_word:
+                words += 1
+                total_search_depth += depth
+                max_search_depth = max(max_search_depth, depth)
+            for child in (curr.left, curr.middle, curr.right):
+                if child is not None:
+                    stack.append((child, depth + 1))
+        return {
+            'nodes': nodes,
+            'words': words,
+            'height': height,
+            'mean_search_depth': total_search_depth / words if words else 0.0,
+            'max_search_depth': max_search_depth,
+        }
 
     @staticmethod
     def grab_parent_node(w: str, f: int, i: int) -> Node:
@@ -0,0 +1,58 @@
+import itertools
+
+
+# ------------------------------------------------------------------------
+# Secondary index answering batches of searches with NumPy.
+# Every word ever stored gets an integer id, and frequencies[id] holds its current frequency, 0 once deleted.
+# A batch is interned to ids with a single map over the vocabulary, unknown words getting id 0 whose
+# frequency is always 0, then resolved with one fancy-indexing gather. Ids are never reused by another word,
+# so writes only set a frequency or append an id.
+# NumPy is only imported when an index is built, the dictionaries work without it.
+# ------------------------------------------------------------------------
+
+class VocabularyIndex:
+    __slots__ = 'ids', 'frequencies', 'size'
+
+    def __init__(self, words_frequencies):
+        """
+        @param words_frequencies: (word, frequency) tuples of the words stored, the first occurrence of a
+                                  word is the one searches find
+        """
+        import numpy
+        self.ids = {}           # word -> id, ids start at 1
+        self.size = 1           # next unused id, id 0 stands for unknown words
+        entries = list(words_frequencies)
+        self.frequencies = numpy.zeros(max(16, 2 * (len(entries) + 1)), dtype=numpy.int64)
+        for word, frequency in entries:
+            if word not in self.ids:
+                self.set(word, frequency)
+
+    def set(self, word: str, frequency: int) -> None:
+        """
+        record the frequency of a word added or updated
+        """
+        word_id = self.ids.get(word)
+        if word_id is None:
+            word_id = self.ids[word] = self.size
+            self.size += 1
+            # Doubling keeps appends amortized O(1).
+            if word_id == len(self.frequencies):
+                self.frequencies.resize(2 * word_id, refcheck=False)
+        self.frequencies[word_id] = frequency
+
+    def remove(self, word: str) -> None:
+        """
+        record the deletion of a word, its id is kept for when it is added again
+        """
+        word_id = self.ids.get(word)
+        if word_id is not None:
+            self.frequencies[word_id] = 0
+
+    def search_batch(self, words):
+        """
+        @param words: sequence of words to be searched
+        @return: numpy.ndarray of int64, for each word its frequency, 0 if NOT found
+        """
+        import numpy
+        word_ids = numpy.fromiter(map(self.ids.get, words, itertools.repeat(0)), dtype=numpy.intp, count=len(words))
+        return self.frequencies[word_ids]
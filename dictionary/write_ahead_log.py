@@ -0,0 +1,333 @@
+import math
+import os
+import struct
+import threading
+import time
+import zlib
+
+from dictionary.extended_dictionary import ExtendedDictionary
+from dictionary.word_frequency import WordFrequency
+from dictionary.snapshot import save_snapshot
+
+
+# ------------------------------------------------------------------------
+# Append-only binary log of the writes made to a dictionary, replayed on top of its base (data file or
+# snapshot) at startup.
+# A log is a header followed by records:
+#   crc32 ('I') of the rest of the record, operation ('B'), word length in bytes ('I'), frequency ('q'),
+#   then the word as UTF-8.
+# Writes are logged by their outcome: SET word frequency for anything leaving the word stored, DELETE word
+# for anything removing it. Replaying such records in order gives the same dictionary from the base or from
+# any later state it went through, so a log folded into a new base can be replayed again safely.
+# Group commit: records are buffered and written with a single fsync once group_size records are pending
+# or sync_interval seconds have passed since the first of them was appended; a timer thread syncs a group
+# that stays short when the writes stop, so no record waits longer than that. A crash loses at most the
+# pending group. close() syncs whatever is left.
+# Replay stops at the first torn or corrupted record and cuts the log there.
+# ------------------------------------------------------------------------
+
+MAGIC = b'DICTWAL\0'
+VERSION = 1
+SET, DELETE = 1, 2
+# magic, version
+HEADER = struct.Struct('<8sBxxxxxxx')
+# crc32 of the entry and the word that follow it
+CHECKSUM = struct.Struct('<I')
+# operation, word length, frequency
+ENTRY = struct.Struct('<BIq')
+
+
+class WriteAheadLog:
+    __slots__ = 'filename', 'log_file', 'group_size', 'sync_interval', 'pending', 'pending_count', 'last_sync', \
+        'records', 'syncs', 'lock', 'timer'
+
+    def __init__(self, filename: str, group_size: int = 64, sync_interval: float = 0.05, records: int = 0):
+        """
+        open a log for appending, creating it if needed
+        @param filename: log file, replayed beforehand if it exists
+        @param group_size: records written per fsync, 1 syncs every record
+        @param sync_interval: seconds after which pending records are synced whatever their number, math.inf
+        only syncs full groups and on close
+        @param records: number of records already in the log, as returned by replay_log
+        """
+        self.filename = filename
+        self.group_size = group_size
+        self.sync_interval = sync_interval
+        self.pending = bytearray()      # encoded records not yet written
+        self.pending_count = 0          # number of records in pending
+        self.last_sync = time.monotonic()
+        self.records = records          # records in the log, counted from its last reset
+        self.syncs = 0                  # fsync calls made
+        self.lock = threading.RLock()   # the timer thread syncs concurrently with the writer
+        self.timer = None               # pending sync of a group that is not full yet
+        self.log_file = open(filename, 'ab')
+        # A new log, or one whose creation was cut short.
+        if self.log_file.tell() < HEADER.size:
+            self.log_file.truncate(0)
+            self.log_file.write(HEADER.pack(MAGIC, VERSION))
+            self.sync_file()
+
+    def append(self, operation: int, word: str, frequency: int = 0) -> None:
+        """
+        log a write, synced with its group
+        """
+        encoded = word.encode()
+        body = ENTRY.pack(operation, len(encoded), frequency) + encoded
+        with self.lock:
+            self.pending += CHECKSUM.pack(zlib.crc32(body)) + body
+            self.pending_count += 1
+            self.records += 1
+            if self.pending_count >= self.group_size or time.monotonic() - self.last_sync >= self.sync_interval:
+                self.sync()
+            elif self.timer is None and math.isfinite(self.sync_interval):
+                self.timer = threading.Timer(self.sync_interval, self.sync)
+                self.timer.daemon = True
+                self.timer.start()
+
+    def sync(self) -> None:
+        """
+        write and fsync the pending records
+        """
+        with self.lock:
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+            if self.pending_count:
+                self.log_file.write(self.pending)
+                self.pending.clear()
+                self.pending_count = 0
+                self.sync_file()
+            self.last_sync = time.monotonic()
+
+    def sync_file(self) -> None:
+        self.log_file.flush()
+        os.fsync(self.log_file.fileno())
+        self.syncs += 1
+
+    def reset(self) -> None:
+        """
+        empty the log, once its records are folded into a new base
+        """
+        with self.lock:
+            self.sync()
+            self.log_file.close()
+            write_durably(self.filename, HEADER.pack(MAGIC, VERSION))
+            self.log_file = open(self.filename, 'ab')
+            self.records = 0
+
+    def close(self) -> None:
+        with self.lock:
+            self.sync()
+            self.log_file.close()
+
+
+def read_log(filename: str) -> ([(int, str, int)], int):
+    """
+    decode the valid records of a log
+    @param filename: log file to be read
+    @return: ((operation, word, frequency) records in log order, size in bytes of the valid part of the file)
+    """
+    with open(filename, 'rb') as log_file:
+        data = memoryview(log_file.read())
+    if len(data) < HEADER.size:
+        return [], 0
+    magic, version = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"'{filename}' is not a dictionary log")
+    records = list()
+    offset = HEADER.size
+    record_size = CHECKSUM.size + ENTRY.size
+    while offset + record_size <= len(data):
+        checksum, = CHECKSUM.unpack_from(data, offset)
+        operation, length, frequency = ENTRY.unpack_from(data, offset + CHECKSUM.size)
+        end = offset + record_size + length
+        if end > len(data) or zlib.crc32(data[offset + CHECKSUM.size:end]) != checksum:
+            break
+        records.append((operation, str(data[offset + record_size:end], 'utf-8'), frequency))
+        offset = end
+    return records, offset
+
+
+def replay_log(dictionary: ExtendedDictionary, filename: str) -> int:
+    """
+    apply the records of a log to a dictionary holding its base, cutting off a torn or corrupted tail
+    @param dictionary: dictionary built from the base the log was written on top of
+    @param filename: log file, nothing is replayed if it does not exist
+    @return: number of records replayed
+    """
+    if not os.path.exists(filename):
+        return 0
+    records, valid_size = read_log(filename)
+    for operation, word, frequency in records:
+        if operation == SET:
+            dictionary.upsert(WordFrequency(word, frequency))
+        else:
+            dictionary.delete_word(word)
+    # Later appends must follow the last valid record, not the garbage after it.
+    if valid_size and valid_size < os.path.getsize(filename):
+        with open(filename, 'r+b') as log_file:
+            log_file.truncate(valid_size)
+    return len(records)
+
+
+def write_durably(filename: str, data: bytes) -> None:
+    """
+    replace a file by new contents, which are on disk before the old ones disappear
+    """
+    temporary_filename = filename + '.tmp'
+    with open(temporary_filename, 'wb') as output_file:
+        output_file.write(data)
+        output_file.flush()
+        os.fsync(output_file.fileno())
+    os.replace(temporary_filename, filename)
+    sync_directory(filename)
+
+
+def sync_directory(filename: str) -> None:
+    """
+    fsync the directory of a file, so that a rename into it survives a crash
+    """
+    directory = os.open(os.path.dirname(os.path.abspath(filename)), os.O_RDONLY)
+    try:
+        os.fsync(directory)
+    finally:
+        os.close(directory)
+
+
+class LoggedDictionary(ExtendedDictionary):
+    __slots__ = 'dictionary', 'log', 'base_filename', 'compact_every', 'compactions'
+
+    def __init__(self, dictionary: ExtendedDictionary, log: WriteAheadLog, base_filename: str = None,
+                 compact_every: int = 0):
+        """
+        @param dictionary: dictionary holding its base with the log already replayed on top
+        @param log: log the writes are appended to
+        @param base_filename: snapshot file the log is folded into by compaction
+        @param compact_every: fold the log into a new base once it holds this many records, 0 never does
+        """
+        self.dictionary = dictionary
+        self.log = log
+        self.base_filename = base_filename
+        self.compact_every = compact_every if base_filename is not None else 0
+        self.compactions = 0
+
+    def build_dictionary(self, words_frequencies: [WordFrequency]):
+        """
+        construct the data structure to store nodes
+        @param words_frequencies: list of (word, frequency) to be stored
+        """
+        self.dictionary.build_dictionary(words_frequencies)
+
+    def search(self, word: str) -> int:
+        """
+        search for a word
+        @param word: the word to be searched
+        @return: frequency > 0 if found and 0 if NOT found
+        """
+        return self.dictionary.search(word)
+
+    def search_many(self, words: [str]) -> [int]:
+        """
+        search for a batch of words
+        @param words: the words to be searched
+        @return: for each word, frequency > 0 if found and 0 if NOT found
+        """
+        return self.dictionary.search_many(words)
+
+    def add_word_frequency(self, word_frequency: WordFrequency) -> bool:
+        """
+        add a word and its frequency to the dictionary
+        @param word_frequency: (word, frequency) to be added
+        :return: True whether succeeded, False when word is already in the dictionary
+        """
+        if self.dictionary.add_word_frequency(word_frequency):
+            self.logged(SET, word_frequency.word, word_frequency.frequency)
+            return True
+        return False
+
+    def delete_word(self, word: str) -> bool:
+        """
+        delete a word from the dictionary
+        @param word: word to be deleted
+        @return: whether succeeded, e.g. return False when point not found
+        """
+        if self.dictionary.delete_word(word):
+            self.logged(DELETE, word)
+            return True
+        return False
+
+    def increment(self, word: str, delta: int = 1) -> int:
+        """
+        add delta to the frequency of a word, adding the word with frequency delta if it is not in the dictionary
+        @param word: the word to be updated
+        @param delta: change of the frequency, a word whose frequency drops to 0 or below is deleted
+        @return: the new frequency, 0 if the word is not (or no longer) in the dictionary
+        """
+        # A decrement of a missing word changes nothing, so it is not logged.
+        found = delta > 0 or self.dictionary.search(word) > 0
+        frequency = self.dictionary.increment(word, delta)
+        if frequency > 0:
+            self.logged(SET, word, frequency)
+        elif found and word != '':
+            self.logged(DELETE, word)
+        return frequency
+
+    def upsert(self, word_frequency: WordFrequency) -> bool:
+        """
+        set the frequency of a word, adding the word if it is not in the dictionary
+        @param word_frequency: (word, frequency) to be stored
+        @return: True if the word was added, False if its frequency was updated (or the word is empty)
+        """
+        added = self.dictionary.upsert(word_frequency)
+        if word_frequency.word != '':
+            self.logged(SET, word_frequency.word, word_frequency.frequency)
+        return added
+
+    def autocomplete(self, prefix_word: str) -> [WordFrequency]:
+        """
+        return a list of 3 most-frequent words in the dictionary that have 'prefix_word' as a prefix
+        @param prefix_word: word to be autocompleted
+        @return: a list (could be empty) of (at most) 3 most-frequent words with prefix 'prefix_word'
+        """
+        return self.dictionary.autocomplete(prefix_word)
+
+    def autocomplete_many(self, prefix_words: [str]) -> [[WordFrequency]]:
+        """
+        autocomplete a batch of prefixes
+        @param prefix_words: words to be autocompleted
+        @return: for each prefix, the list autocomplete would return
+        """
+        return self.dictionary.autocomplete_many(prefix_words)
+
+    def items(self):
+        """
+        @return: iterator over the (word, frequency) pairs stored by the wrapped dictionary
+        """
+        return self.dictionary.items()
+
+    def logged(self, operation: int, word: str, frequency: int = 0) -> None:
+        self.log.append(operation, word, frequency)
+        if self.compact_every and self.log.records >= self.compact_every:
+            self.compact()
+
+    def compact(self) -> None:
+        """
+        fold the log into a new base snapshot and empty it
+        """
+        # The new base, renamed in place with its directory synced, is on disk before the log is emptied; a
+        # crash in between replays the log on the new base, which gives the same dictionary.
+        self.log.sync()
+        temporary_filename = self.base_filename + '.tmp'
+        save_snapshot(self.dictionary, temporary_filename)
+        with open(temporary_filename, 'rb+') as snapshot_file:
+            os.fsync(snapshot_file.fileno())
+        os.replace(temporary_filename, self.base_filename)
+        sync_directory(self.base_filename)
+        self.log.reset()
+        self.compactions += 1
+
+    def close(self) -> None:
+        """
+        sync the pending records and close the log
+        """
+        self.log.close()
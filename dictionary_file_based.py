@@ -1,10 +1,16 @@
+import os
 import sys
 from dictionary.node import Node
 from dictionary.word_frequency import WordFrequency
+from dictionary.loader import iter_word_frequencies
+from dictionary.snapshot import save_snapshot, load_snapshot
+from dictionary.write_ahead_log import WriteAheadLog, LoggedDictionary, replay_log
+from dictionary import instrumentation
+from command_engine import run_command_file
+from approaches import DRIVER_APPROACHES, create_dictionary
 from dictionary.base_dictionary import BaseDictionary
-from dictionary.list_dictionary import ListDictionary
-from dictionary.hashtable_dictionary import HashTableDictionary
-from dictionary.ternarysearchtree_dictionary import TernarySearchTreeDictionary
+from dictionary.cached_dictionary import CachedDictionary
+from dictionary.filtered_dictionary import FilteredDictionary
 
 
 # -------------------------------------------------------------------
@@ -22,14 +28,69 @@ def usage():
     """
     Print help/usage message.
     """
-    print('python3 dictionary_file_based.py', '<approach> [data fileName] [command fileName] [output fileName]')
-    print('<approach> = <list | hashtable | tst>')
+    print('python3 dictionary_file_based.py', '<approach> [data fileName] [command fileName] [output fileName]',
+          '[--snapshot fileName] [--engine <batched | serial>] [--workers N] [--cache N] [--report fileName]',
+          '[--wal fileName] [--wal-group N] [--compact-every N] [--bloom rate]')
+    print(f"<approach> = <{' | '.join(DRIVER_APPROACHES)}>")
+    print('--snapshot: load the dictionary from this snapshot, or build it from the data file and save it there')
+    print('--engine: answer runs of S/AC commands in batches (default) or one command at a time')
+    print('--workers: fork N processes sharing the dictionary to answer batches of S/AC commands (default 1)')
+    print('--cache: keep the autocomplete results of the N most recently used prefixes (default 0, no cache)')
+    print('--report: time the dictionary operations and write a report to this file, - for the standard output;')
+    print('          the operations answered by forked workers are not included')
+    print('--wal: replay this log of adds and deletes on top of the data file or snapshot, then log the new ones')
+    print('--wal-group: log records written per fsync (default 64, 1 syncs every add and delete)')
+    print('--compact-every: fold the log into the snapshot once it holds N records (default 0, never);')
+    print('                 needs --snapshot')
+    print('--bloom: answer searches for missing words from a Bloom filter with this false positive rate,')
+    print('         e.g. 0.01 (default: no filter)')
     sys.exit(1)
 
 
+def pop_option(args: [str], name: str):
+    """
+    Remove an optional '<name> <value>' pair from the command line arguments.
+    @return: the value, None when the option is not given
+    """
+    if name not in args:
+        return None
+    index = args.index(name)
+    if index + 1 >= len(args):
+        print(f'Missing value for {name}.')
+        usage()
+    value = args[index + 1]
+    del args[index:index + 2]
+    return value
+
+
 if __name__ == '__main__':
     # Fetch the command line arguments
     args = sys.argv
+    snapshot_filename = pop_option(args, '--snapshot')
+    engine = pop_option(args, '--engine') or 'batched'
+    if engine not in ('batched', 'serial'):
+        print('Incorrect argument value.')
+        usage()
+    workers = pop_option(args, '--workers') or '1'
+    if not workers.isdigit() or int(workers) < 1:
+        print('Incorrect argument value.')
+        usage()
+    cache_capacity = pop_option(args, '--cache') or '0'
+    if not cache_capacity.isdigit():
+        print('Incorrect argument value.')
+        usage()
+    report_filename = pop_option(args, '--report')
+    wal_filename = pop_option(args, '--wal')
+    wal_group = pop_option(args, '--wal-group') or '64'
+    compact_every = pop_option(args, '--compact-every') or '0'
+    if not wal_group.isdigit() or int(wal_group) < 1 or not compact_every.isdigit() or \
+            (int(compact_every) > 0 and snapshot_filename is None):
+        print('Incorrect argument value.')
+        usage()
+    bloom_rate = pop_option(args, '--bloom')
+    if bloom_rate is not None and not (bloom_rate.replace('.', '', 1).isdigit() and 0 < float(bloom_rate) < 1):
+        print('Incorrect argument value.')
+        usage()
 
     if len(args) != 5:
         print('Incorrect number of arguments.')
@@ -37,85 +98,66 @@ if __name__ == '__main__':
 
     # initialise search agent
     agent: BaseDictionary = None
-    if args[1] == 'list':
-        agent = ListDictionary()
-    elif args[1] == 'hashtable':
-        agent = HashTableDictionary()
-    elif args[1] == 'tst':
-        agent = TernarySearchTreeDictionary()
+    if args[1] in DRIVER_APPROACHES:
+        agent = create_dictionary(args[1])
     else:
         print('Incorrect argument value.')
         usage()
 
+    # instrumentation is switched on before the dictionary is built, so building is measured too
+    if report_filename is not None:
+        instrumentation.enable()
+
     # read from data file to populate the initial set of points
     data_filename = args[2]
-    words_frequencies_from_file = []
     try:
-        data_file = open(data_filename, 'r')
-        for line in data_file:
-            values = line.split()
-            word = values[0]
-            frequency = int(values[1])
-            word_frequency = WordFrequency(word, frequency)  # each line contains a word and its frequency
-            words_frequencies_from_file.append(word_frequency)
-        data_file.close()
-        agent.build_dictionary(words_frequencies_from_file)
+        if snapshot_filename is not None and os.path.exists(snapshot_filename):
+            load_snapshot(agent, snapshot_filename)
+        else:
+            # each line contains a word and its frequency, parsed lazily while the dictionary is built
+            agent.build_dictionary(iter_word_frequencies(data_filename))
+            if snapshot_filename is not None:
+                save_snapshot(agent, snapshot_filename)
     except FileNotFoundError as e:
         print("Data file doesn't exist.")
         usage()
+    except ValueError as e:
+        # a snapshot of another kind of dictionary (list vs tree), or not a snapshot at all
+        print(f"Snapshot can't be loaded: {e}.")
+        usage()
+
+    # the log is replayed on top of the base, then records every add and delete made from here on
+    logged_agent = None
+    if wal_filename is not None:
+        replayed = replay_log(agent, wal_filename)
+        agent = logged_agent = LoggedDictionary(agent, WriteAheadLog(wal_filename, int(wal_group), records=replayed),
+                                                snapshot_filename, int(compact_every))
+
+    # the filter sits behind the cache; the cache only short-circuits autocomplete, every search reaches the filter
+    if bloom_rate is not None:
+        agent = FilteredDictionary(agent, float(bloom_rate))
+
+    # the cache wraps the built dictionary, so loading and saving snapshots see the dictionary itself
+    if int(cache_capacity) > 0:
+        agent = CachedDictionary(agent, int(cache_capacity))
 
     command_filename = args[3]
     output_filename = args[4]
-    # Parse the commands in command file
+    # Parse the commands in command file, read-only commands are answered in batches unless --engine serial,
+    # by forked worker processes with --workers
     try:
-        command_file = open(command_filename, 'r')
-        output_file = open(output_filename, 'w')
-
-        for line in command_file:
-            command_values = line.split()
-            command = command_values[0]
-            # search
-            if command == 'S':
-                word = command_values[1]
-                search_result = agent.search(word)
-                if search_result > 0:
-                    output_file.write(f"Found '{word}' with frequency {search_result}\n")
-                else:
-                    output_file.write(f"NOT Found '{word}'\n")
-
-            # add
-            elif command == 'A':
-                word = command_values[1]
-                frequency = int(command_values[2])
-                word_frequency = WordFrequency(word, frequency)
-                if not agent.add_word_frequency(word_frequency):
-                    output_file.write(f"Add '{word}' failed\n")
-                else:
-                    output_file.write(f"Add '{word}' succeeded\n")
-
-            # delete
-            elif command == 'D':
-                word = command_values[1]
-                if not agent.delete_word(word):
-                    output_file.write(f"Delete '{word}' failed\n")
-                else:
-                    output_file.write(f"Delete '{word}' succeeded\n")
-
-            # check
-            elif command == 'AC':
-                word = command_values[1]
-                list_words = agent.autocomplete(word)
-                line = "Autocomplete for '" + word + "': [ "
-                for item in list_words:
-                    line = line + item.word + ": " + str(item.frequency) + "  "
-                output_file.write(line + ']\n')
-
-            else:
-                print('Unknown command.')
-                print(line)
-
-        output_file.close()
-        command_file.close()
+        run_command_file(agent, command_filename, output_filename, batched=(engine != 'serial'),
+                         workers=int(workers))
     except FileNotFoundError as e:
         print("Command file doesn't exist.")
         usage()
+
+    # the last group of log records is synced before exiting
+    if logged_agent is not None:
+        logged_agent.close()
+
+    if report_filename == '-':
+        print(instrumentation.report(), end='')
+    elif report_filename is not None:
+        with open(report_filename, 'w') as report_file:
+            report_file.write(instrumentation.report())
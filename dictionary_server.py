@@ -0,0 +1,208 @@
+import argparse
+import asyncio
+import os
+
+from dictionary.word_frequency import WordFrequency
+from dictionary.loader import iter_word_frequencies
+from dictionary.snapshot import save_snapshot, load_snapshot
+from command_engine import format_search, format_add, format_delete, format_autocomplete
+from approaches import DRIVER_APPROACHES, create_dictionary
+from dictionary.extended_dictionary import ExtendedDictionary
+from dictionary.cached_dictionary import CachedDictionary
+
+
+# -------------------------------------------------------------------
+# Asyncio TCP query server in front of any dictionary.
+# The line protocol is the one of the command files: a client sends 'S word', 'A word frequency',
+# 'D word' or 'AC word' lines and gets back, in order, one line per command, formatted as in the output
+# files ('Unknown command.' for anything else, 'Invalid encoding.' for a line that is not UTF-8, and an
+# 'Error: ...' line for a command the dictionary failed on). Clients may pipeline any number of commands.
+# Reads received from every connection within one event loop iteration are answered together with
+# search_many / autocomplete_many, and identical AC prefixes waiting for the same batch share a single
+# computation. A write first answers the pending reads, then runs on its own, so every command sees the
+# writes received before it and none received after it.
+# The dictionary only ever runs on the event loop thread, which is what keeps reads and writes apart.
+# -------------------------------------------------------------------
+
+UNKNOWN_COMMAND = 'Unknown command.\n'
+INVALID_ENCODING = 'Invalid encoding.\n'
+
+
+class QueryServer:
+    __slots__ = 'agent', 'searches', 'completions', 'flush_scheduled', 'requests', 'computations'
+
+    def __init__(self, agent: ExtendedDictionary):
+        self.agent = agent
+        self.searches = []              # (future, word) of the pending S commands
+        self.completions = {}           # prefix -> future shared by the pending AC commands on it
+        self.flush_scheduled = False    # True while a flush of the pending reads is scheduled
+        self.requests = 0               # commands received
+        self.computations = 0           # commands answered by the dictionary, coalesced ones counted once
+
+    def submit(self, line: str) -> asyncio.Future:
+        """
+        take a command line from a client
+        @param line: the command line
+        @return: future of the output line
+        """
+        self.requests += 1
+        loop = asyncio.get_running_loop()
+        command_values = line.split()
+        command = command_values[0] if command_values else None
+        if command == 'S' and len(command_values) == 2:
+            future = loop.create_future()
+            self.searches.append((future, command_values[1]))
+        elif command == 'AC' and len(command_values) == 2:
+            # Coalesced with the pending AC on the same prefix, if any.
+            future = self.completions.get(command_values[1])
+            if future is not None:
+                return future
+            future = self.completions[command_values[1]] = loop.create_future()
+        else:
+            # Writes must see every earlier read answered first.
+            self.flush()
+            future = loop.create_future()
+            try:
+                future.set_result(self.execute(command, command_values))
+            except Exception as exception:
+                future.set_result(format_error(exception))
+            return future
+        if not self.flush_scheduled:
+            # Lets the reads received during this loop iteration join the batch.
+            self.flush_scheduled = True
+            loop.call_soon(self.flush)
+        return future
+
+    def execute(self, command: str, command_values: [str]) -> str:
+        """
+        run a write, or answer an unknown command
+        @return: the output line
+        """
+        if command == 'A' and len(command_values) == 3 and command_values[2].lstrip('-').isdigit():
+            self.computations += 1
+            word = command_values[1]
+            return format_add(word, self.agent.add_word_frequency(WordFrequency(word, int(command_values[2]))))
+        if command == 'D' and len(command_values) == 2:
+            self.computations += 1
+            return format_delete(command_values[1], self.agent.delete_word(command_values[1]))
+        return UNKNOWN_COMMAND
+
+    def flush(self) -> None:
+        """
+        answer the pending reads
+        """
+        self.flush_scheduled = False
+        searches, self.searches = self.searches, []
+        completions, self.completions = self.completions, {}
+        # A failed batch answers each of its commands with the error, so that no client waits forever.
+        if searches:
+            self.computations += len(searches)
+            try:
+                frequencies = self.agent.search_many([word for _, word in searches])
+                outputs = [format_search(word, frequency) for (_, word), frequency in zip(searches, frequencies)]
+            except Exception as exception:
+                outputs = [format_error(exception)] * len(searches)
+            for (future, _), output in zip(searches, outputs):
+                future.set_result(output)
+        if completions:
+            self.computations += len(completions)
+            try:
+                lists_words = self.agent.autocomplete_many(list(completions))
+                outputs = [format_autocomplete(prefix_word, list_words)
+                           for prefix_word, list_words in zip(completions, lists_words)]
+            except Exception as exception:
+                outputs = [format_error(exception)] * len(completions)
+            for future, output in zip(completions.values(), outputs):
+                future.set_result(output)
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """
+        serve one client: commands are read as they arrive, the output lines are written back in order
+        """
+        responses = asyncio.Queue()
+        sender = asyncio.create_task(self.send_responses(responses, writer))
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    line = line.decode()
+                except UnicodeDecodeError:
+                    future = asyncio.get_running_loop().create_future()
+                    future.set_result(INVALID_ENCODING)
+                    responses.put_nowait(future)
+                    continue
+                if line.strip():
+                    responses.put_nowait(self.submit(line))
+        except ConnectionError:
+            pass
+        finally:
+            responses.put_nowait(None)
+            await sender
+            writer.close()
+
+    @staticmethod
+    async def send_responses(responses: asyncio.Queue, writer: asyncio.StreamWriter) -> None:
+        """
+        write the output lines in the order of the commands, until None is queued
+        """
+        try:
+            while True:
+                future = await responses.get()
+                if future is None:
+                    break
+                writer.write((await future).encode())
+                # Only wait for the socket once the ready output is written, so pipelined lines go out together.
+                if responses.empty():
+                    await writer.drain()
+        except ConnectionError:
+            pass
+
+    async def serve(self, host: str, port: int) -> None:
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        addresses = ', '.join(str(socket.getsockname()) for socket in server.sockets)
+        print(f'Serving on {addresses}', flush=True)
+        async with server:
+            await server.serve_forever()
+
+
+def format_error(exception: Exception) -> str:
+    """
+    @return: output line of a command the dictionary failed on, on a single line whatever the message
+    """
+    return ' '.join(f'Error: {type(exception).__name__}: {exception}'.split()) + '\n'
+
+
+def build_agent(approach: str, data_filename: str, snapshot_filename: str = None,
+                cache_capacity: int = 0) -> ExtendedDictionary:
+    """
+    @return: the dictionary of an approach, loaded from the snapshot if it exists or built from the data file
+    """
+    agent = create_dictionary(approach)
+    if snapshot_filename is not None and os.path.exists(snapshot_filename):
+        load_snapshot(agent, snapshot_filename)
+    else:
+        agent.build_dictionary(iter_word_frequencies(data_filename))
+        if snapshot_filename is not None:
+            save_snapshot(agent, snapshot_filename)
+    if cache_capacity > 0:
+        agent = CachedDictionary(agent, cache_capacity)
+    return agent
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Serve dictionary queries over TCP.')
+    parser.add_argument('approach', choices=DRIVER_APPROACHES)
+    parser.add_argument('data', help='data file the dictionary is built from')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=7878)
+    parser.add_argument('--snapshot', help='load the dictionary from this snapshot, or build it and save it there')
+    parser.add_argument('--cache', type=int, default=0,
+                        help='keep the autocomplete results of the N most recently used prefixes')
+    args = parser.parse_args()
+    query_server = QueryServer(build_agent(args.approach, args.data, args.snapshot, args.cache))
+    try:
+        asyncio.run(query_server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        print(f'{query_server.requests} commands, {query_server.computations} answered by the dictionary')
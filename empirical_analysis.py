@@ -1,8 +1,249 @@
+import argparse
+import gc
+import json
+import math
+import platform
+import random
+import sys
+import time
 
+from benchmarks.common import sample_prefixes, print_table
+from approaches import select_approaches
+from dictionary.word_frequency import WordFrequency
+from dictionary.loader import read_word_frequencies, paused_gc
 
-zxsSqxc zSASA
 
+# -------------------------------------------------------------------
+# Benchmark harness replacing the empirical_analysis notebook.
+#
+#   python3 empirical_analysis.py run [--approaches ...] [--scenarios ...] [--sizes ...] [--output results.json]
+#   python3 empirical_analysis.py compare baseline.json candidate.json [--threshold 0.1]
+#
+# 'run' times every scenario for every approach and dictionary size: dictionaries of size n hold the first
+# n words of the data file, as in the notebook. Each repetition is preceded by warmup repetitions that are
+# discarded, the cyclic garbage collector is paused while timing and every operation is timed on its own,
+# so the summaries (median, p95, p99) describe single operations. Workloads are drawn from a seeded random
+# generator and are identical for every approach.
+# 'compare' matches two result files and fails when a timing got slower than the threshold allows.
+# -------------------------------------------------------------------
+
+APPROACHES = select_approaches(['list', 'list_index', 'hashtable', 'hashtable_index', 'hashtable_compact', 'tst',
+                                'tst_topk', 'array_tst', 'radix_tst', 'dawg'])
+
+SCENARIOS = ('build', 'search', 'add', 'delete', 'autocomplete')
+
+
+# -------------------------------------------------------------------
+# Workloads
+# -------------------------------------------------------------------
+
+def generate_workload(scenario: str, data: [WordFrequency], size: int, operations: int, seed: int) -> list:
+    """
+    draw the operations of a scenario for dictionaries holding data[:size]
+    @return: words to search or delete, WordFrequency to add, or prefixes to autocomplete; [] for build
+    """
+    rng = random.Random(f'{seed}-{scenario}-{size}')
+    words = [wf.word for wf in data[:size]]
+    if scenario == 'search':
+        # Half hits, half misses sharing most of their path with a stored word.
+        hits = [rng.choice(words) for _ in range(operations)]
+        return [word if i % 2 == 0 else word + '#' for i, word in enumerate(hits)]
+    if scenario == 'add':
+        # Words of the data file that are not in the dictionary yet, each once, made-up ones once they run out.
+        stored = set(words)
+        fresh = list({wf.word: wf for wf in data[size:] if wf.word not in stored}.values())[:operations]
+        while len(fresh) < operations:
+            fresh.append(WordFrequency(f'{rng.choice(words)}#{len(fresh)}', rng.randint(1, 10 ** 6)))
+        return fresh
+    if scenario == 'delete':
+        unique_words = list(dict.fromkeys(words))
+        return rng.sample(unique_words, min(operations, len(unique_words)))
+    if scenario == 'autocomplete':
+        return sample_prefixes(data[:size], operations, seed)
+    return []
+
+
+def time_operations(operation, inputs: list) -> [int]:
+    """
+    @return: nanoseconds taken by each call of operation on the inputs
+    """
+    timings = list()
+    with paused_gc():
+        for value in inputs:
+            start_time = time.perf_counter_ns()
+            operation(value)
+            timings.append(time.perf_counter_ns() - start_time)
+    return timings
+
+
+def run_scenario(approach: str, scenario: str, data: [WordFrequency], size: int, workload: list,
+                 repetitions: int, warmup: int) -> [int]:
+    """
+    run warmup then timed repetitions of a scenario
+    @return: nanoseconds of every timed operation, or of every build for the build scenario
+    """
+    samples = list()
+    shared = None
+    for repetition in range(warmup + repetitions):
+        gc.collect()
+        if scenario == 'build':
+            dictionary = APPROACHES[approach]()
+            timings = time_operations(dictionary.build_dictionary, [data[:size]])
+        elif scenario in ('add', 'delete'):
+            # Writes change the dictionary, so every repetition starts from a fresh one.
+            dictionary = APPROACHES[approach]()
+            dictionary.build_dictionary(data[:size])
+            operation = dictionary.add_word_frequency if scenario == 'add' else dictionary.delete_word
+            timings = time_operations(operation, workload)
+        else:
+            # Read-only scenarios share one dictionary; the warmup also builds lazily built structures.
+            if shared is None:
+                shared = APPROACHES[approach]()
+                shared.build_dictionary(data[:size])
+            operation = shared.search if scenario == 'search' else shared.autocomplete
+            timings = time_operations(operation, workload)
+        if repetition >= warmup:
+            samples.extend(timings)
+    return samples
+
+
+# -------------------------------------------------------------------
+# Statistics
+# -------------------------------------------------------------------
+
+def percentile(sorted_values: [int], fraction: float) -> float:
+    """
+    @param sorted_values: non-empty sorted samples
+    @param fraction: between 0 and 1
+    @return: the percentile, interpolated linearly between the closest ranks
+    """
+    position = (len(sorted_values) - 1) * fraction
+    lower = math.floor(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
 
-if __name__ == '__main__':
-    run_analysis()
 
+def summarise(samples: [int]) -> dict:
+    """
+    @return: summary statistics of non-empty samples, in nanoseconds
+    """
+    ordered = sorted(samples)
+    return {
+        'samples': len(ordered),
+        'min': ordered[0],
+        'median': percentile(ordered, 0.5),
+        'mean': sum(ordered) / len(ordered),
+        'p95': percentile(ordered, 0.95),
+        'p99': percentile(ordered, 0.99),
+        'max': ordered[-1],
+    }
+
+
+# -------------------------------------------------------------------
+# Commands
+# -------------------------------------------------------------------
+
+def run(args) -> int:
+    data = read_word_frequencies(args.data)
+    sizes = [size for size in args.sizes if size <= len(data)] or [len(data)]
+    results = list()
+    for size in sizes:
+        for scenario in args.scenarios:
+            workload = generate_workload(scenario, data, size, args.operations, args.seed)
+            for approach in args.approaches:
+                samples = run_scenario(approach, scenario, data, size, workload, args.repetitions, args.warmup)
+                if not samples:
+                    continue
+                result = {'approach': approach, 'scenario': scenario, 'size': size, 'unit': 'ns'}
+                result.update(summarise(samples))
+                results.append(result)
+                print(f"{approach:>17} {scenario:>12} {size:>7}: median {result['median'] / 1e3:.1f} us, "
+                      f"p95 {result['p95'] / 1e3:.1f} us, p99 {result['p99'] / 1e3:.1f} us", file=sys.stderr)
+
+    report = {
+        'metadata': {
+            'data': args.data,
+            'sizes': sizes,
+            'operations': args.operations,
+            'repetitions': args.repetitions,
+            'warmup': args.warmup,
+            'seed': args.seed,
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'machine': platform.machine(),
+            'platform': platform.platform(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        },
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            json.dump(report, output_file, indent=2)
+    print_table(['Approach', 'Scenario', 'Size', 'Samples', 'Median (us)', 'p95 (us)', 'p99 (us)'],
+                [[r['approach'], r['scenario'], r['size'], r['samples'], r['median'] / 1e3, r['p95'] / 1e3,
+                  r['p99'] / 1e3] for r in results])
+    return 0
+
+
+def compare(args) -> int:
+    """
+    diff two result files on one statistic
+    @return: exit status, 1 when a timing regressed beyond the threshold
+    """
+    with open(args.baseline, 'r') as baseline_file, open(args.candidate, 'r') as candidate_file:
+        baseline, candidate = json.load(baseline_file), json.load(candidate_file)
+    key = lambda result: (result['approach'], result['scenario'], result['size'])
+    baseline_results = {key(result): result for result in baseline['results']}
+    rows = list()
+    regressions = 0
+    for result in candidate['results']:
+        before = baseline_results.pop(key(result), None)
+        if before is None:
+            rows.append([*key(result), '-', result[args.statistic] / 1e3, '-', 'new'])
+            continue
+        ratio = result[args.statistic] / before[args.statistic] if before[args.statistic] else math.inf
+        if ratio > 1 + args.threshold:
+            verdict = 'REGRESSION'
+            regressions += 1
+        elif ratio < 1 - args.threshold:
+            verdict = 'improved'
+        else:
+            verdict = 'same'
+        rows.append([*key(result), before[args.statistic] / 1e3, result[args.statistic] / 1e3, f'{ratio:.2f}',
+                     verdict])
+    for missing in baseline_results:
+        rows.append([*missing, baseline_results[missing][args.statistic] / 1e3, '-', '-', 'missing'])
+    print(f'{args.statistic} per operation, threshold {args.threshold:.0%}')
+    print_table(['Approach', 'Scenario', 'Size', 'Baseline (us)', 'Candidate (us)', 'Ratio', 'Verdict'], rows)
+    print(f'{regressions} regression(s)')
+    return 1 if regressions else 0
+
+
+def parse_arguments(argv: [str]):
+    parser = argparse.ArgumentParser(description='Benchmark the dictionary approaches.')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help='run the scenarios and report per-operation timings')
+    run_parser.add_argument('--data', default='sampleData200k.txt')
+    run_parser.add_argument('--approaches', nargs='+', choices=APPROACHES, default=list(APPROACHES))
+    run_parser.add_argument('--scenarios', nargs='+', choices=SCENARIOS, default=list(SCENARIOS))
+    run_parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    run_parser.add_argument('--operations', type=int, default=500, help='operations per repetition')
+    run_parser.add_argument('--repetitions', type=int, default=3)
+    run_parser.add_argument('--warmup', type=int, default=1)
+    run_parser.add_argument('--seed', type=int, default=0)
+    run_parser.add_argument('--output', help='JSON file the results are written to')
+
+    compare_parser = commands.add_parser('compare', help='diff two result files, failing on regressions')
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('candidate')
+    compare_parser.add_argument('--statistic', choices=('min', 'median', 'mean', 'p95', 'p99', 'max'),
+                                default='median')
+    compare_parser.add_argument('--threshold', type=float, default=0.1,
+                                help='relative slowdown tolerated before a timing counts as a regression')
+    return parser.parse_args(argv)
+
+
+if __name__ == '__main__':
+    arguments = parse_arguments(sys.argv[1:])
+    sys.exit(run(arguments) if arguments.command == 'run' else compare(arguments))